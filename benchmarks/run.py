@@ -0,0 +1,257 @@
+"""Micro-benchmark suite for indicator, backtest, storage and plotting hot paths.
+
+All inputs come from the deterministic synthetic generator, so runs need no
+network and are comparable across commits on the same machine:
+
+    python -m benchmarks.run                              # 1k, 100k, 1M bars
+    python -m benchmarks.run --sizes 1000 100000 --only calc_lines backtest
+    python -m benchmarks.run --compare benchmarks/results/<older>.json
+
+Each run writes a JSON file (machine/version metadata plus one record per
+case and size) under benchmarks/results/ unless --output is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from src.data import storage  # noqa: E402
+from src.data.synthetic import generate_ohlcv  # noqa: E402
+from src.portfolio.manager import run_backtest, run_backtest_vectorized  # noqa: E402
+from src.portfolio.panel import run_panel_backtest  # noqa: E402
+from src.strategy import calc_lines as cl  # noqa: E402
+from src.strategy.yahan_strategies import PanelSMAStrategy, SMAStrategy  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+GROUPS = ('calc_lines', 'backtest', 'storage', 'plot')
+# plot_kline draws one patch per candle (~6 s per 1k bars); larger sizes take
+# minutes to hours, so they are skipped unless --plot-max-bars is raised
+DEFAULT_PLOT_MAX_BARS = 1_000
+PANEL_SYMBOLS = 10
+# windows for the multi-window kernels and their one-call-per-window baselines
+MULTI_WINDOWS = list(range(5, 55))
+
+
+def _calc_lines_cases(df: pd.DataFrame) -> Dict[str, Callable[[], object]]:
+    close, high, low = df['Close'], df['High'], df['Low']
+    return {
+        'CLOSE': lambda: cl.CLOSE(df),
+        'OPEN': lambda: cl.OPEN(df),
+        'HIGH': lambda: cl.HIGH(df),
+        'LOW': lambda: cl.LOW(df),
+        'VOLUME': lambda: cl.VOLUME(df),
+        'LAG': lambda: cl.LAG(close, 1),
+        'DIFF': lambda: cl.DIFF(close, 1),
+        'ROLLING_MAX': lambda: cl.ROLLING_MAX(close, 20),
+        'ROLLING_MIN': lambda: cl.ROLLING_MIN(close, 20),
+        'STD': lambda: cl.STD(close, 20),
+        'ZSCORE': lambda: cl.ZSCORE(close, 20),
+        'MA': lambda: cl.MA(close, 20),
+        'EMA': lambda: cl.EMA(close, 20),
+        'RSI': lambda: cl.RSI(close, 14),
+        'MACD': lambda: cl.MACD(close),
+        'BOLL': lambda: cl.BOLL(close),
+        'ATR': lambda: cl.ATR(high, low, close),
+        'RESAMPLE_OHLC': lambda: cl.RESAMPLE_OHLC(df, 'W'),
+        'RESAMPLE': lambda: cl.RESAMPLE(close, 'W'),
+        f'MA.{len(MULTI_WINDOWS)}w': lambda: [cl.MA(close, w) for w in MULTI_WINDOWS],
+        f'MA_MULTI.{len(MULTI_WINDOWS)}w': lambda: cl.MA_MULTI(close, MULTI_WINDOWS),
+        f'STD.{len(MULTI_WINDOWS)}w': lambda: [cl.STD(close, w) for w in MULTI_WINDOWS],
+        f'STD_MULTI.{len(MULTI_WINDOWS)}w': lambda: cl.STD_MULTI(close, MULTI_WINDOWS),
+        f'ZSCORE_MULTI.{len(MULTI_WINDOWS)}w': lambda: cl.ZSCORE_MULTI(close, MULTI_WINDOWS),
+        f'BOLL_MULTI.{len(MULTI_WINDOWS)}w': lambda: cl.BOLL_MULTI(close, MULTI_WINDOWS),
+    }
+
+
+def _backtest_cases(df: pd.DataFrame, n: int, seed: int) -> Dict[str, Callable[[], object]]:
+    def strategy():
+        return SMAStrategy('SYN', short_window=5, long_window=20, qty=100)
+
+    panel_frames = generate_ohlcv(max(n // PANEL_SYMBOLS, 1), symbols=PANEL_SYMBOLS, seed=seed)
+    symbols = list(panel_frames)
+    return {
+        'run_backtest.on_bar': lambda: run_backtest(strategy(), df, commission=0.0005, slippage=0.0005),
+        'run_backtest.compact': lambda: run_backtest(strategy(), df, commission=0.0005, slippage=0.0005, compact=True),
+        'run_backtest.decide': lambda: run_backtest(strategy(), df, commission=0.0005, slippage=0.0005, decide=True),
+        'run_backtest_vectorized': lambda: run_backtest_vectorized(strategy(), df, commission=0.0005, slippage=0.0005),
+        f'run_panel_backtest.{PANEL_SYMBOLS}sym': lambda: run_panel_backtest(
+            PanelSMAStrategy(symbols, short_window=5, long_window=20, qty=100), panel_frames,
+            commission=0.0005, slippage=0.0005,
+        ),
+    }
+
+
+def _storage_cases(df: pd.DataFrame, tmp: Path) -> Dict[str, Callable[[], object]]:
+    storage.CACHE_DIR = str(tmp)
+    symbol = f"BENCH{len(df)}"
+    storage.write_cache(symbol, df)
+    cases = {
+        'storage.write_cache': lambda: storage.write_cache(symbol, df),
+        'storage.read_cached': lambda: storage.read_cached(symbol),
+        'storage.read_cached.slice': lambda: storage.read_cached(symbol, df.index[len(df) // 4], df.index[len(df) // 2]),
+    }
+    try:
+        storage.write_partitions(symbol, df, interval='1d')
+    except ImportError:
+        # the partitioned store needs pyarrow
+        return cases
+    cases.update({
+        'storage.partitions.read': lambda: storage.read_cached(symbol, interval='1d'),
+        'storage.partitions.read_slice': lambda: storage.read_cached(symbol, df.index[len(df) // 4], df.index[len(df) // 2], interval='1d'),
+        'storage.partitions.append_tail': lambda: storage.update_cache(symbol, df.iloc[-5:], (df.index[0], df.index[-1]), interval='1d'),
+    })
+    return cases
+
+
+def _plot_cases(df: pd.DataFrame, tmp: Path) -> Dict[str, Callable[[], object]]:
+    from src.ploter.ploter import plot_kline
+
+    out = str(tmp / 'bench_plot.png')
+    return {
+        'plot_kline': lambda: plot_kline(df, 'SYN', output=out),
+        'plot_kline.indicators': lambda: plot_kline(df, 'SYN', output=out, ma=[5, 20], boll=(20, 2.0), rsi=[14], macd=(12, 26, 9)),
+    }
+
+
+def _repeat_for(n: int, group: str, requested: int | None) -> int:
+    if requested:
+        return requested
+    if group == 'plot':
+        return 1
+    return 5 if n <= 10_000 else 3 if n <= 100_000 else 1
+
+
+def _time(fn: Callable[[], object], repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def _git_info() -> Dict[str, object]:
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+        except Exception:
+            return ''
+
+    return {'commit': git('rev-parse', 'HEAD') or None, 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def run_suite(sizes: List[int], groups: List[str], repeat: int | None = None, seed: int = 0,
+              plot_max_bars: int = DEFAULT_PLOT_MAX_BARS, verbose: bool = True) -> Dict[str, object]:
+    """Run the selected benchmark groups at each size and return the JSON-able report."""
+    records = []
+    with tempfile.TemporaryDirectory(prefix='ft-bench-') as tmpdir:
+        tmp = Path(tmpdir)
+        old_cache_dir = storage.CACHE_DIR
+        try:
+            for n in sizes:
+                df = generate_ohlcv(n, freq='1min' if n > 100_000 else '1d', seed=seed)
+                cases: Dict[str, tuple] = {}
+                if 'calc_lines' in groups:
+                    cases.update({f'calc_lines.{k}': ('calc_lines', v) for k, v in _calc_lines_cases(df).items()})
+                if 'backtest' in groups:
+                    cases.update({k: ('backtest', v) for k, v in _backtest_cases(df, n, seed).items()})
+                if 'storage' in groups:
+                    cases.update({k: ('storage', v) for k, v in _storage_cases(df, tmp).items()})
+                if 'plot' in groups:
+                    cases.update({k: ('plot', v) for k, v in _plot_cases(df, tmp).items()})
+
+                for name, (group, fn) in cases.items():
+                    reps = _repeat_for(n, group, repeat)
+                    record = {'name': name, 'group': group, 'bars': n}
+                    if group == 'plot' and n > plot_max_bars:
+                        record['skipped'] = f'bars > plot_max_bars ({plot_max_bars})'
+                    else:
+                        times = _time(fn, reps)
+                        record.update(
+                            repeat=reps,
+                            best_s=min(times),
+                            mean_s=float(np.mean(times)),
+                            ns_per_bar=min(times) / n * 1e9,
+                        )
+                    records.append(record)
+                    if verbose:
+                        shown = record.get('skipped') or f"{record['best_s'] * 1e3:10.3f} ms"
+                        print(f"{n:>9} {name:<36} {shown}", flush=True)
+        finally:
+            storage.CACHE_DIR = old_cache_dir
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            **_git_info(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'sizes': sizes,
+            'seed': seed,
+        },
+        'results': records,
+    }
+
+
+def compare(base: Dict[str, object], new: Dict[str, object]) -> pd.DataFrame:
+    """Side-by-side best times of two reports; ratio < 1 means `new` is faster."""
+    def frame(report):
+        rows = [r for r in report['results'] if 'best_s' in r]
+        return pd.DataFrame(rows, columns=['name', 'bars', 'best_s']).set_index(['name', 'bars'])['best_s']
+
+    table = pd.concat({'base_s': frame(base), 'new_s': frame(new)}, axis=1).dropna()
+    table['ratio'] = table['new_s'] / table['base_s']
+    return table
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--only', nargs='+', choices=GROUPS, default=list(GROUPS))
+    parser.add_argument('--repeat', type=int, default=None, help='runs per case (default depends on size)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--plot-max-bars', type=int, default=DEFAULT_PLOT_MAX_BARS)
+    parser.add_argument('--output', type=Path, default=None)
+    parser.add_argument('--compare', type=Path, default=None, help='earlier report to compare against')
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.sizes, args.only, repeat=args.repeat, seed=args.seed, plot_max_bars=args.plot_max_bars)
+    output = args.output
+    if output is None:
+        commit = (report['meta']['commit'] or 'nogit')[:10]
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output = ROOT / 'benchmarks' / 'results' / f'{stamp}_{commit}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"Saved benchmark report to {output}")
+
+    if args.compare:
+        base = json.loads(args.compare.read_text(encoding='utf-8'))
+        with pd.option_context('display.width', 120, 'display.max_rows', None):
+            print(compare(base, report).to_string(float_format=lambda v: f'{v:.4g}'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
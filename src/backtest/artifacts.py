@@ -0,0 +1,210 @@
+"""Background writer for run artifacts (equity CSV, plot, trades log, leaderboard).
+
+A single worker thread drains a bounded queue, so `run_task` can return as soon
+as the simulation finishes while the files are written behind it. Writes run in
+submission order, which keeps appends to the shared leaderboard serialized.
+Each submission returns a `concurrent.futures.Future`; `write_run_artifacts`
+groups them into an `ArtifactHandle` that callers can wait on.
+"""
+
+from __future__ import annotations
+
+import atexit
+import csv
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from src.system.log import get_logger
+from src.system import profiling
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class ArtifactWriter:
+	"""One background thread fed by a bounded queue.
+
+	max_pending: queue size; `submit` blocks once this many writes are waiting,
+	which caps the memory held by queued frames.
+	"""
+
+	def __init__(self, max_pending: int = 16) -> None:
+		self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+		self._lock = threading.Lock()
+		self._thread: threading.Thread | None = None
+		self._closed = False
+
+	def _ensure_thread(self) -> None:
+		with self._lock:
+			if self._thread is None or not self._thread.is_alive():
+				self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+				self._thread.start()
+
+	def _run(self) -> None:
+		while True:
+			item = self._queue.get()
+			try:
+				if item is _STOP:
+					return
+				name, fn, args, kwargs, fut = item
+				if not fut.set_running_or_notify_cancel():
+					continue
+				try:
+					fut.set_result(fn(*args, **kwargs))
+				except BaseException as e:
+					logger.exception("Artifact write failed: %s: %s", name, e)
+					fut.set_exception(e)
+			finally:
+				self._queue.task_done()
+
+	def submit(self, fn: Callable[..., Any], *args, name: str | None = None, **kwargs) -> Future:
+		"""Queue `fn(*args, **kwargs)`; blocks while the queue is full."""
+		if self._closed:
+			raise RuntimeError("ArtifactWriter is closed")
+		self._ensure_thread()
+		fut: Future = Future()
+		self._queue.put((name or getattr(fn, '__name__', 'artifact'), fn, args, kwargs, fut))
+		return fut
+
+	def flush(self) -> None:
+		"""Block until every queued write has finished."""
+		if self._thread is not None:
+			self._queue.join()
+
+	def close(self) -> None:
+		"""Finish pending writes and stop the worker thread."""
+		if self._closed:
+			return
+		self._closed = True
+		if self._thread is not None and self._thread.is_alive():
+			self._queue.put(_STOP)
+			self._thread.join()
+
+
+class ArtifactHandle:
+	"""Completion handle for the artifacts of one run (name -> Future)."""
+
+	def __init__(self, run_dir: Path, futures: Dict[str, Future]) -> None:
+		self.run_dir = run_dir
+		self.futures = futures
+
+	def done(self) -> bool:
+		return all(f.done() for f in self.futures.values())
+
+	def wait(self, timeout: float | None = None) -> Dict[str, BaseException]:
+		"""Wait for all writes; return name -> exception for the ones that failed."""
+		errors: Dict[str, BaseException] = {}
+		for name, fut in self.futures.items():
+			exc = fut.exception(timeout=timeout)
+			if exc is not None:
+				errors[name] = exc
+		return errors
+
+	def result(self, timeout: float | None = None) -> Dict[str, Any]:
+		"""Wait for all writes and re-raise the first failure; return name -> written path."""
+		return {name: fut.result(timeout=timeout) for name, fut in self.futures.items()}
+
+
+@profiling.timed('artifacts.equity_curve')
+def write_equity_curve(path: Path, curve: pd.DataFrame) -> Path:
+	curve.to_csv(path)
+	logger.info("Saved equity curve to %s", path)
+	return path
+
+
+@profiling.timed('ploter.equity_plot')
+def write_equity_plot(path: Path, curve: pd.DataFrame, label: str) -> Path:
+	# Figure without pyplot: no global figure manager, safe off the main thread
+	fig = Figure(figsize=(10, 5))
+	ax = fig.subplots()
+	curve[['equity', 'cash', 'position_value']].plot(ax=ax)
+	ax.set_title(f"Equity/Cash/Position for {label}")
+	ax.set_ylabel("Value")
+	ax.grid(True, alpha=0.3)
+	ax.legend()
+	fig.savefig(path, dpi=120, bbox_inches='tight')
+	logger.info("Saved equity plot to %s", path)
+	return path
+
+
+def format_trades(trades: pd.DataFrame) -> pd.Series:
+	"""One 'date: side symbol qty=.. price=.. fee=..' line per fill (date only)."""
+	dates = pd.to_datetime(trades['date']).dt.date.astype(str)
+	return (
+		dates + ": " + trades['side'].astype(str) + " " + trades['symbol'].astype(str)
+		+ " qty=" + trades['qty'].astype(str)
+		+ " price=" + trades['price'].map('{:.4f}'.format)
+		+ " fee=" + trades['fee'].map('{:.2f}'.format)
+	)
+
+
+@profiling.timed('artifacts.trades_txt')
+def write_trades_txt(path: Path, trades: pd.DataFrame) -> Path:
+	lines = format_trades(trades)
+	with path.open('w', encoding='utf-8') as f:
+		f.write("\n".join(lines.tolist()) + "\n")
+	logger.info("Saved trades to %s", path)
+	return path
+
+
+@profiling.timed('artifacts.leaderboard')
+def append_leaderboard(path: Path, row: Dict[str, Any]) -> Path:
+	header = list(row.keys())
+	write_header = not path.exists()
+	with path.open('a', newline='', encoding='utf-8') as f:
+		w = csv.DictWriter(f, fieldnames=header)
+		if write_header:
+			w.writeheader()
+		w.writerow(row)
+	logger.info("Appended leaderboard row to %s", path)
+	return path
+
+
+def write_run_artifacts(run_dir: Path, curve: pd.DataFrame, trades, label: str, leaderboard_row: Dict[str, Any],
+						writer: ArtifactWriter | None = None) -> ArtifactHandle:
+	"""Queue every artifact of one run and return its completion handle."""
+	writer = writer or default_writer()
+	futures = {
+		"equity_curve": writer.submit(write_equity_curve, run_dir / "equity_curve.csv", curve, name="equity_curve"),
+		"equity_plot": writer.submit(write_equity_plot, run_dir / "equity_plot.png", curve, label, name="equity_plot"),
+	}
+	if trades is not None and not trades.empty:
+		futures["trades"] = writer.submit(write_trades_txt, run_dir / "trades.txt", trades, name="trades")
+	futures["leaderboard"] = writer.submit(
+		append_leaderboard, run_dir.parent / "leaderboard.csv", leaderboard_row, name="leaderboard"
+	)
+	return ArtifactHandle(run_dir, futures)
+
+
+_DEFAULT: ArtifactWriter | None = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_writer() -> ArtifactWriter:
+	"""Process-wide writer; pending writes are flushed at interpreter exit."""
+	global _DEFAULT
+	with _DEFAULT_LOCK:
+		if _DEFAULT is None:
+			_DEFAULT = ArtifactWriter()
+			atexit.register(_DEFAULT.close)
+		return _DEFAULT
+
+
+__all__ = [
+	"ArtifactWriter",
+	"ArtifactHandle",
+	"append_leaderboard",
+	"default_writer",
+	"format_trades",
+	"write_equity_curve",
+	"write_equity_plot",
+	"write_run_artifacts",
+	"write_trades_txt",
+]
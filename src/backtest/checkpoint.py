@@ -0,0 +1,155 @@
+"""Checkpoint files for resuming long `run_backtest` replays.
+
+A `Checkpointer` owns one file per run (named after the result cache key by
+the engine). The bar loop asks `due(bar)` after every bar and, when it is,
+saves the portfolio, the partial equity/fill buffers and the strategy state
+into a pickle written atomically (temp file renamed into place), so a crash
+mid-write leaves the previous checkpoint intact. A finished run deletes its
+file.
+
+Strategy state comes from `strategy.state()` / `load_state(state)` when the
+strategy defines them; otherwise from its attributes: a `TriggerSet` keeps
+its rising-edge flags (see `TriggerSet.state`), callables are treated as
+configuration and skipped, and everything else (streaming indicators, order
+dicts, flags) is pickled as is.
+
+Layout: result/checkpoints/<key>.ckpt
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from src.strategy.support import TriggerSet
+from src.system.log import get_logger
+from src.system import profiling
+
+logger = get_logger(__name__)
+
+# Bump when the saved layout changes; older files are ignored
+CHECKPOINT_VERSION = 1
+DEFAULT_EVERY = 10_000
+DEFAULT_SECONDS = 300.0
+
+_TRIGGERS = 'triggers'
+_VALUE = 'value'
+
+
+class CheckpointError(RuntimeError):
+	"""Raised when a run's state cannot be saved or restored."""
+
+
+def default_checkpoint_dir(root: Path | None = None) -> Path:
+	if root is None:
+		root = Path(__file__).resolve().parents[2]
+	return root / "result" / "checkpoints"
+
+
+def capture_state(strategy: Any) -> Dict[str, Any]:
+	"""Snapshot of a strategy's mutable state (pickled by `Checkpointer.save`)."""
+	custom = getattr(strategy, 'state', None)
+	if callable(custom):
+		return {'custom': custom()}
+	attrs = {}
+	for name, value in vars(strategy).items():
+		if isinstance(value, TriggerSet):
+			attrs[name] = (_TRIGGERS, value.state())
+		elif not callable(value):
+			attrs[name] = (_VALUE, value)
+	return {'attrs': attrs}
+
+
+def restore_state(strategy: Any, state: Dict[str, Any]) -> None:
+	"""Apply a `capture_state` snapshot to a freshly constructed strategy."""
+	if 'custom' in state:
+		strategy.load_state(state['custom'])
+		return
+	for name, (kind, value) in state['attrs'].items():
+		if kind == _TRIGGERS:
+			getattr(strategy, name).load_state(value)
+		else:
+			setattr(strategy, name, value)
+
+
+class Checkpointer:
+	"""Periodic checkpoint file for one run.
+
+	every: save after this many bars since the last save.
+	seconds: also save when this much wall time has passed (None: bars only).
+	resume: load an existing file on `load()`; False starts over and
+	overwrites it.
+	"""
+
+	def __init__(self, path: Path | str, every: int = DEFAULT_EVERY, seconds: float | None = DEFAULT_SECONDS,
+				 resume: bool = True) -> None:
+		if every < 1:
+			raise ValueError("checkpoint every must be >= 1")
+		self.path = Path(path)
+		self.every = int(every)
+		self.seconds = seconds
+		self.resume = resume
+		self.saves = 0
+		self._last_bar = 0
+		self._last_time = time.monotonic()
+
+	def due(self, bar: int) -> bool:
+		"""True when a checkpoint should be written after `bar` bars are done."""
+		if bar - self._last_bar >= self.every:
+			return True
+		return self.seconds is not None and time.monotonic() - self._last_time >= self.seconds
+
+	def load(self) -> Dict[str, Any] | None:
+		"""Saved state, or None when resuming is off or no usable file exists."""
+		if not self.resume or not self.path.exists():
+			return None
+		try:
+			with self.path.open('rb') as f:
+				state = pickle.load(f)
+		except Exception as e:
+			logger.warning("Ignoring unreadable checkpoint %s: %s", self.path, e)
+			return None
+		if state.get('version') != CHECKPOINT_VERSION:
+			logger.warning("Ignoring checkpoint %s with version %s", self.path, state.get('version'))
+			return None
+		self._last_bar = state['bar']
+		logger.info("Resuming from checkpoint %s at bar %s", self.path, state['bar'])
+		return state
+
+	def save(self, state: Dict[str, Any]) -> None:
+		"""Write `state` (which must include `bar`) atomically."""
+		state = {'version': CHECKPOINT_VERSION, **state}
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		with profiling.phase('checkpoint.save'):
+			fd, tmp = tempfile.mkstemp(prefix=f".{self.path.name}-", dir=self.path.parent)
+			try:
+				with os.fdopen(fd, 'wb') as f:
+					pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+				os.replace(tmp, self.path)
+			except Exception as e:
+				Path(tmp).unlink(missing_ok=True)
+				if isinstance(e, (pickle.PicklingError, TypeError, AttributeError)):
+					raise CheckpointError(f"Run state cannot be pickled ({e}); give the strategy state()/load_state()") from e
+				raise
+		self.saves += 1
+		self._last_bar = state['bar']
+		self._last_time = time.monotonic()
+		logger.info("Checkpoint saved: %s bar=%s", self.path, state['bar'])
+
+	def clear(self) -> None:
+		"""Remove the file once the run has finished."""
+		self.path.unlink(missing_ok=True)
+
+
+__all__ = [
+	"CHECKPOINT_VERSION",
+	"CheckpointError",
+	"Checkpointer",
+	"capture_state",
+	"default_checkpoint_dir",
+	"restore_state",
+]
@@ -4,19 +4,34 @@ from __future__ import annotations
 
 import importlib
 import json
+from contextlib import nullcontext
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict
 
 import pandas as pd
 
 from src.data import fetcher
-from src.portfolio.manager import run_backtest
+from src.portfolio.manager import run_backtest, run_backtest_vectorized
+from src.portfolio.panel import run_panel_backtest
+from src.backtest.artifacts import ArtifactHandle, ArtifactWriter, write_run_artifacts
+from src.backtest.checkpoint import DEFAULT_EVERY, DEFAULT_SECONDS, Checkpointer, default_checkpoint_dir
+from src.backtest.result_cache import data_fingerprint, load_result, prune_cache, result_key, store_result
+from src.strategy.backends import resolve_backend, use_backend
+from src.strategy.indicator_cache import indicator_cache
 from src.system.startup import new_result_run_dir
 from src.system.log import get_logger
-import matplotlib.pyplot as plt
+from src.system import profiling
 
 logger = get_logger(__name__)
 
+# task["engine"]["mode"] -> simulation function
+ENGINE_MODES = {
+	'loop': run_backtest,
+	'vectorized': run_backtest_vectorized,
+	'panel': run_panel_backtest,
+}
+
 
 def load_task(task_name: str) -> Dict[str, Any]:
 	task_path = Path(__file__).resolve().parents[2] / 'tasks' / f'{task_name}.json'
@@ -32,84 +47,181 @@ def load_strategy(module_path: str, class_name: str, params: Dict[str, Any]):
 	return cls(**params)
 
 
-def run_task(task_name: str):
-	task = load_task(task_name)
-	logger.info("Loaded task %s", task_name)
+def resolve_engine(task: Dict[str, Any]):
+	"""Return (mode, extra kwargs for the simulation function) from task["engine"]."""
+	engine_cfg = task.get('engine', {})
+	mode = engine_cfg.get('mode', 'panel' if task['data'].get('symbols') else 'loop')
+	if mode not in ENGINE_MODES:
+		raise ValueError(f"Unknown engine mode: {mode} (expected one of {sorted(ENGINE_MODES)})")
+	kwargs: Dict[str, Any] = {}
+	if mode == 'loop' and engine_cfg.get('compact'):
+		kwargs['compact'] = True
+	if mode == 'loop' and engine_cfg.get('decide'):
+		kwargs['decide'] = True
+	return mode, kwargs
 
-	strat_cfg = task['strategy']
-	port_cfg = task['portfolio']
-	data_cfg = task['data']
 
-	strategy = load_strategy(strat_cfg['module'], strat_cfg['class'], strat_cfg['params'])
-	logger.info("Strategy instantiated: %s.%s params=%s", strat_cfg['module'], strat_cfg['class'], strat_cfg['params'])
+def _ensure_close(df: pd.DataFrame) -> pd.DataFrame:
+	if 'Close' not in df.columns:
+		# try to infer from common names
+		if 'close' in df.columns:
+			df = df.rename(columns={'close': 'Close'})
+		else:
+			raise ValueError('DataFrame must contain Close column')
+	return df
+
 
-	df = fetcher.get_history(
-		symbol=data_cfg['symbol'],
+def fetch_task_data(data_cfg: Dict[str, Any], port_cfg: Dict[str, Any]):
+	"""Fetch market data for a task.
+
+	Returns one DataFrame for `data.symbol`, or a dict symbol -> DataFrame
+	when the task lists `data.symbols` (panel mode).
+	"""
+	symbols = data_cfg.get('symbols')
+	targets = list(symbols) if symbols else [data_cfg['symbol']]
+	# panel symbols are fetched concurrently under the source's shared rate limit
+	fetched, errors = fetcher.get_history_many(
+		targets,
 		start=data_cfg.get('start', port_cfg.get('start')),
 		end=data_cfg.get('end', port_cfg.get('end')),
 		source=data_cfg.get('source', 'akshare'),
+		max_workers=data_cfg.get('max_workers', 8),
 		interval=data_cfg.get('interval', '1d'),
 		cache=data_cfg.get('cache', True),
 		refresh=data_cfg.get('refresh', False),
 	)
-	logger.info("Data fetched: symbol=%s rows=%s start=%s end=%s", data_cfg['symbol'], len(df), df.index.min(), df.index.max())
+	for sym in targets:
+		if sym in errors:
+			raise errors[sym]
+	frames = {}
+	for sym in targets:
+		df = fetched[sym]
+		logger.info("Data fetched: symbol=%s rows=%s start=%s end=%s", sym, len(df), df.index.min(), df.index.max())
+		frames[sym] = _ensure_close(df)
+	return frames if symbols else frames[targets[0]]
+
+
+@dataclass
+class TaskResult:
+	"""Outcome of `execute_task`; `run_dir` and `artifacts` are None for cached results."""
+
+	curve: pd.DataFrame
+	trades: pd.DataFrame | None
+	run_dir: Path | None = None
+	artifacts: ArtifactHandle | None = None
+	cached: bool = False
+
+
+def execute_task(task_name: str, recompute: bool = False, writer: ArtifactWriter | None = None,
+				 profile: bool | Dict[str, Any] | None = None, resume: bool = False) -> TaskResult:
+	"""Run a task file; artifact files are written in the background.
+
+	With task["engine"]["cache"] = true, results are cached by task settings,
+	simulation source and a data fingerprint; a hit returns only the curve and
+	trades (no run dir or artifacts). `recompute=True` ignores a cached result
+	and overwrites it. Wait on `result.artifacts` when the files are needed.
+
+	profile: overrides task["engine"]["profile"] (true, or {"cprofile": true});
+	when on, phase timings go to profile.json (and profile.prof) in the run dir.
+
+	resume: continue a loop-mode run from its last checkpoint (and keep
+	checkpointing); task["engine"]["checkpoint"] (true, or {"every": bars,
+	"seconds": s}) turns checkpointing on for a fresh run.
+	"""
+	task = load_task(task_name)
+	logger.info("Loaded task %s", task_name)
 
-	# ensure Close exists
-	if 'Close' not in df.columns:
-		# try to infer from common names
-		if 'close' in df.columns:
-			df = df.rename(columns={'close': 'Close'})
+	prof_cfg = task.get('engine', {}).get('profile', False) if profile is None else profile
+	want_cprofile = isinstance(prof_cfg, dict) and bool(prof_cfg.get('cprofile', False))
+	with profiling.profiling(bool(prof_cfg), cprofile=want_cprofile) as prof:
+		result = _execute_task(task_name, task, recompute, writer, resume)
+		if prof is not None and result.artifacts is not None:
+			# keep the profiler active until the background writes are timed
+			result.artifacts.wait()
+	if prof is not None:
+		if result.run_dir is not None:
+			prof.write(result.run_dir / "profile.json")
+			prof.write_cprofile(result.run_dir / "profile.prof")
 		else:
-			raise ValueError('DataFrame must contain Close column')
+			logger.info("Profile (cached result, no run dir): %s", json.dumps(prof.report()))
+	return result
+
+
+def make_checkpointer(cfg: Any, key: str, resume: bool) -> Checkpointer:
+	"""Checkpointer for result key `key` from task["engine"]["checkpoint"]."""
+	opts = cfg if isinstance(cfg, dict) else {}
+	return Checkpointer(default_checkpoint_dir() / f"{key}.ckpt", every=opts.get('every', DEFAULT_EVERY),
+						seconds=opts.get('seconds', DEFAULT_SECONDS), resume=resume)
+
+
+def _execute_task(task_name: str, task: Dict[str, Any], recompute: bool, writer: ArtifactWriter | None,
+				  resume: bool = False) -> TaskResult:
+	strat_cfg = task['strategy']
+	port_cfg = task['portfolio']
+	data_cfg = task['data']
+	mode, engine_kwargs = resolve_engine(task)
+	backend = resolve_backend(task.get('engine', {}).get('backend'))
+	label = ','.join(data_cfg['symbols']) if data_cfg.get('symbols') else data_cfg['symbol']
+
+	with profiling.phase('task.load_strategy'):
+		strategy = load_strategy(strat_cfg['module'], strat_cfg['class'], strat_cfg['params'])
+	logger.info("Strategy instantiated: %s.%s params=%s", strat_cfg['module'], strat_cfg['class'], strat_cfg['params'])
+
+	with profiling.phase('task.fetch_data'):
+		data = fetch_task_data(data_cfg, port_cfg)
 
 	commission = port_cfg.get('commission', 0.0)
 	slippage = port_cfg.get('slippage', 0.0)
 	initial_cash = port_cfg.get('cash', 1_000_000.0)
 
-	logger.info("Running backtest: cash=%.2f commission=%.4f slippage=%.4f", initial_cash, commission, slippage)
+	# off by default; a hit returns curve and trades only (no run dir, plots or leaderboard row)
+	use_cache = task.get('engine', {}).get('cache', False)
+	with profiling.phase('task.cache_lookup'):
+		key = result_key(strat_cfg, port_cfg, mode, engine_kwargs, data_fingerprint(data), backend) if use_cache else None
+		cached = load_result(key) if use_cache and not recompute else None
+	if cached is not None:
+		logger.info("Returning cached result for task %s (key=%s)", task_name, key)
+		return TaskResult(curve=cached[0], trades=cached[1], cached=True)
+
+	sim_kwargs = dict(engine_kwargs)
+	ckpt_cfg = task.get('engine', {}).get('checkpoint', False)
+	if ckpt_cfg or resume:
+		if mode == 'loop':
+			ckpt_key = key or result_key(strat_cfg, port_cfg, mode, engine_kwargs, data_fingerprint(data), backend)
+			sim_kwargs['checkpoint'] = make_checkpointer(ckpt_cfg, ckpt_key, resume)
+		else:
+			logger.warning("Checkpoints are only supported in loop mode; running %s mode without them", mode)
+
+	logger.info("Running backtest: mode=%s options=%s backend=%s cash=%.2f commission=%.4f slippage=%.4f", mode, engine_kwargs, backend, initial_cash, commission, slippage)
 	# Prepare result directory
 	run_dir = new_result_run_dir()
-	curve, trades = run_backtest(strategy, df, commission=commission, slippage=slippage, initial_cash=initial_cash)
+	# memoize calc_lines indicators for this run when task["engine"]["indicator_cache"] is set
+	use_indicators = task.get('engine', {}).get('indicator_cache', False)
+	# task["engine"]["backend"] picks the calc_lines / bar loop compute backend (pandas by default)
+	with profiling.phase('task.simulate'), use_backend(backend), (indicator_cache() if use_indicators else nullcontext()) as indicators:
+		curve, trades = ENGINE_MODES[mode](strategy, data, commission=commission, slippage=slippage, initial_cash=initial_cash, **sim_kwargs)
+	if indicators is not None:
+		stats = indicators.stats()
+		profiling.count('indicators.hits', stats['hits'])
+		profiling.count('indicators.misses', stats['misses'])
+		logger.info("Indicator cache: hits=%s misses=%s evictions=%s bytes=%s", stats['hits'], stats['misses'], stats['evictions'], stats['bytes'])
 	final = curve.iloc[-1]
 	logger.info(
 		"Backtest finished: start=%s end=%s final_equity=%.2f cash=%.2f position_value=%.2f stock_return=%.4f",
-		df.index.min(), df.index.max(), final['equity'], final['cash'], final['position_value'], final['stock_return_pct']
+		curve.index.min(), curve.index.max(), final['equity'], final['cash'], final['position_value'], final['stock_return_pct']
 	)
-	# Persist equity curve
-	curve_path = run_dir / "equity_curve.csv"
-	curve.to_csv(curve_path)
-	logger.info("Saved equity curve to %s", curve_path)
-
-	# Plot equity/cash/position_value curves
-	try:
-		fig, ax = plt.subplots(figsize=(10, 5))
-		curve[['equity', 'cash', 'position_value']].plot(ax=ax)
-		ax.set_title(f"Equity/Cash/Position for {data_cfg['symbol']}")
-		ax.set_ylabel("Value")
-		ax.grid(True, alpha=0.3)
-		ax.legend()
-		plot_path = run_dir / "equity_plot.png"
-		fig.savefig(plot_path, dpi=120, bbox_inches='tight')
-		plt.close(fig)
-		logger.info("Saved equity plot to %s", plot_path)
-	except Exception as e:
-		logger.exception("Failed to save equity plot: %s", e)
-
-	# Persist trades log (txt only, date only)
-	if trades is not None and not trades.empty:
-		trades_txt = run_dir / "trades.txt"
-		with trades_txt.open('w', encoding='utf-8') as f:
-			for _, r in trades.iterrows():
-				date_str = pd.to_datetime(r['date']).date()
-				f.write(f"{date_str}: {r['side']} {r['symbol']} qty={r['qty']} price={r['price']:.4f} fee={r['fee']:.2f}\n")
-		logger.info("Saved trades to %s", trades_txt)
-
-	# Append leaderboard
-	leaderboard_path = run_dir.parent / "leaderboard.csv"
+	if use_cache:
+		try:
+			with profiling.phase('task.cache_store'):
+				store_result(key, curve, trades, meta={"task": task_name, "mode": mode})
+				prune_cache()
+		except Exception as e:
+			logger.exception("Failed to store result in cache: %s", e)
+
 	row = {
-		"symbol": data_cfg['symbol'],
-		"start": str(df.index.min()),
-		"end": str(df.index.max()),
+		"symbol": label,
+		"start": str(curve.index.min()),
+		"end": str(curve.index.max()),
 		"strategy_module": strat_cfg['module'],
 		"strategy_class": strat_cfg['class'],
 		"strategy_params": json.dumps(strat_cfg.get('params', {}), ensure_ascii=False),
@@ -117,17 +229,20 @@ def run_task(task_name: str):
 		"final_equity": float(final['equity']),
 		"return_pct": (float(final['equity']) / float(initial_cash)) - 1.0,
 	}
-	import csv
-	header = list(row.keys())
-	write_header = not leaderboard_path.exists()
-	with leaderboard_path.open('a', newline='', encoding='utf-8') as f:
-		w = csv.DictWriter(f, fieldnames=header)
-		if write_header:
-			w.writeheader()
-		w.writerow(row)
-	logger.info("Appended leaderboard row to %s", leaderboard_path)
+	# equity_curve.csv, equity_plot.png, trades.txt and the leaderboard row
+	with profiling.phase('task.submit_artifacts'):
+		artifacts = write_run_artifacts(run_dir, curve, trades, label, row, writer=writer)
+	return TaskResult(curve=curve, trades=trades, run_dir=run_dir, artifacts=artifacts)
+
 
-	return curve
+def run_task(task_name: str, recompute: bool = False, wait_artifacts: bool = False, profile: bool | None = None,
+			 resume: bool = False):
+	"""Run a task file and return its equity curve (see `execute_task`)."""
+	result = execute_task(task_name, recompute=recompute, profile=profile, resume=resume)
+	if wait_artifacts and result.artifacts is not None:
+		for name, exc in result.artifacts.wait().items():
+			logger.error("Artifact %s failed for task %s: %s", name, task_name, exc)
+	return result.curve
 
 
-__all__ = ["run_task"]
+__all__ = ["TaskResult", "execute_task", "run_task"]
@@ -0,0 +1,217 @@
+"""Content-addressed cache of backtest results.
+
+The key hashes everything that determines a run: strategy module (and its
+source file), class and params, the source of the simulation code
+(`src.strategy` indicators and `src.portfolio` engines), the portfolio
+settings, the engine options and a fingerprint of the input OHLCV data. A
+hit returns the stored equity curve and trades without re-running the
+simulation, so it writes no run directory or artifacts.
+
+The cache is bounded: `prune_cache` drops the least recently used entries
+beyond `DEFAULT_MAX_ENTRIES` / `DEFAULT_MAX_BYTES` (a hit refreshes an
+entry's timestamp).
+
+Layout: result/cache/<key>/{curve.pkl, trades.pkl, meta.json}
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+import pandas as pd
+
+from src.system.log import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the stored layout or simulation semantics change
+CACHE_VERSION = 2
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 512 << 20
+
+# packages whose source determines simulation results besides the strategy module
+SIMULATION_PACKAGES = ("src.strategy", "src.portfolio")
+
+
+def default_cache_dir(root: Path | None = None) -> Path:
+	if root is None:
+		root = Path(__file__).resolve().parents[2]
+	return root / "result" / "cache"
+
+
+def _frame_digest(df: pd.DataFrame) -> str:
+	h = hashlib.sha256()
+	h.update(repr(list(map(str, df.columns))).encode())
+	h.update(repr([str(t) for t in df.dtypes]).encode())
+	h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+	return h.hexdigest()
+
+
+def data_fingerprint(data) -> str:
+	"""Hash of an OHLCV frame, or of a symbol -> frame dict (panel mode)."""
+	if isinstance(data, Mapping):
+		h = hashlib.sha256()
+		for sym in data:
+			h.update(str(sym).encode())
+			h.update(_frame_digest(data[sym]).encode())
+		return h.hexdigest()
+	return _frame_digest(data)
+
+
+def _module_digest(module_path: str) -> str | None:
+	"""Hash of the strategy module source, so code edits invalidate results."""
+	try:
+		source = importlib.import_module(module_path).__file__
+		with open(source, 'rb') as f:
+			return hashlib.sha256(f.read()).hexdigest()
+	except Exception:
+		logger.debug("Could not hash strategy module source: %s", module_path)
+		return None
+
+
+@functools.lru_cache(maxsize=None)
+def _package_digest(package: str) -> str | None:
+	"""Hash of every .py file in a package, so engine/indicator edits invalidate results."""
+	try:
+		directory = Path(importlib.import_module(package).__file__).parent
+		h = hashlib.sha256()
+		for path in sorted(directory.rglob('*.py')):
+			h.update(str(path.relative_to(directory)).encode())
+			h.update(path.read_bytes())
+		return h.hexdigest()
+	except Exception:
+		logger.debug("Could not hash package source: %s", package)
+		return None
+
+
+def result_key(strat_cfg: Dict[str, Any], port_cfg: Dict[str, Any], mode: str,
+			   engine_kwargs: Dict[str, Any], fingerprint: str, backend: str = 'pandas') -> str:
+	engine = {"mode": mode, **engine_kwargs}
+	if backend != 'pandas':
+		# numpy/numba indicators agree with pandas only to float rounding
+		engine["backend"] = backend
+	payload = {
+		"version": CACHE_VERSION,
+		"strategy": {
+			"module": strat_cfg['module'],
+			"class": strat_cfg['class'],
+			"params": strat_cfg.get('params', {}),
+			"source": _module_digest(strat_cfg['module']),
+		},
+		"portfolio": {
+			"cash": port_cfg.get('cash', 1_000_000.0),
+			"commission": port_cfg.get('commission', 0.0),
+			"slippage": port_cfg.get('slippage', 0.0),
+		},
+		"engine": engine,
+		"code": {package: _package_digest(package) for package in SIMULATION_PACKAGES},
+		"data": fingerprint,
+	}
+	blob = json.dumps(payload, sort_keys=True, default=str).encode()
+	return hashlib.sha256(blob).hexdigest()
+
+
+def load_result(key: str, cache_dir: Path | None = None):
+	"""Return (curve, trades) for `key`, or None on a miss or unreadable entry."""
+	entry = (cache_dir or default_cache_dir()) / key
+	curve_path = entry / "curve.pkl"
+	if not curve_path.exists():
+		return None
+	try:
+		curve = pd.read_pickle(curve_path)
+		trades_path = entry / "trades.pkl"
+		trades = pd.read_pickle(trades_path) if trades_path.exists() else None
+	except Exception as e:
+		logger.warning("Failed reading cached result %s: %s", key, e)
+		return None
+	try:
+		# mark as recently used for prune_cache
+		os.utime(entry)
+	except OSError:
+		pass
+	logger.info("Result cache hit: %s", key)
+	return curve, trades
+
+
+def store_result(key: str, curve: pd.DataFrame, trades, meta: Dict[str, Any] | None = None,
+				 cache_dir: Path | None = None) -> Path:
+	"""Write a result entry atomically (a temp dir renamed into place)."""
+	cache_dir = cache_dir or default_cache_dir()
+	cache_dir.mkdir(parents=True, exist_ok=True)
+	entry = cache_dir / key
+	tmp = Path(tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=cache_dir))
+	try:
+		curve.to_pickle(tmp / "curve.pkl")
+		if trades is not None:
+			trades.to_pickle(tmp / "trades.pkl")
+		info = {"key": key, "created": datetime.now().isoformat(timespec='seconds'), **(meta or {})}
+		with (tmp / "meta.json").open('w', encoding='utf-8') as f:
+			json.dump(info, f, ensure_ascii=False, indent=2, default=str)
+		if entry.exists():
+			shutil.rmtree(entry, ignore_errors=True)
+		try:
+			os.replace(tmp, entry)
+		except OSError:
+			if not (entry / "curve.pkl").exists():
+				raise
+			# another process stored the same key first; its content is identical
+			shutil.rmtree(tmp, ignore_errors=True)
+	except Exception:
+		shutil.rmtree(tmp, ignore_errors=True)
+		raise
+	logger.info("Stored result in cache: %s", entry)
+	return entry
+
+
+def _entry_size(entry: Path) -> int:
+	return sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+
+
+def prune_cache(cache_dir: Path | None = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+				max_bytes: int = DEFAULT_MAX_BYTES) -> int:
+	"""Remove least recently used entries until both limits hold; returns how many were removed."""
+	cache_dir = cache_dir or default_cache_dir()
+	if not cache_dir.is_dir():
+		return 0
+	entries = []
+	for entry in cache_dir.iterdir():
+		if not entry.is_dir() or entry.name.startswith('.'):
+			continue
+		try:
+			entries.append((entry.stat().st_mtime, _entry_size(entry), entry))
+		except OSError:
+			continue  # removed concurrently
+	entries.sort(key=lambda e: e[0])
+	total = sum(size for _, size, _ in entries)
+	removed = 0
+	while entries and (len(entries) > max_entries or total > max_bytes):
+		_, size, entry = entries.pop(0)
+		shutil.rmtree(entry, ignore_errors=True)
+		total -= size
+		removed += 1
+	if removed:
+		logger.info("Pruned %d result cache entries from %s", removed, cache_dir)
+	return removed
+
+
+__all__ = [
+	"CACHE_VERSION",
+	"DEFAULT_MAX_BYTES",
+	"DEFAULT_MAX_ENTRIES",
+	"data_fingerprint",
+	"default_cache_dir",
+	"load_result",
+	"prune_cache",
+	"result_key",
+	"store_result",
+]
@@ -0,0 +1,219 @@
+"""Parameter sweep runner: fan a task's parameter grid out over a process pool.
+
+Market data is fetched once in the parent process and handed to each worker
+through the pool initializer, so workers only receive small parameter dicts
+per job. Each worker can keep an indicator cache across its jobs, so
+combinations sharing a window reuse the same moving averages.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import time
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from src.backtest.engine import ENGINE_MODES, fetch_task_data, load_strategy, load_task, make_checkpointer, resolve_engine
+from src.backtest.result_cache import data_fingerprint, default_cache_dir, load_result, prune_cache, result_key, store_result
+from src.strategy.backends import resolve_backend, use_backend
+from src.strategy.indicator_cache import IndicatorCache, indicator_cache
+from src.system.startup import new_result_run_dir
+from src.system.log import get_logger
+
+logger = get_logger(__name__)
+
+# Per-worker state installed by _init_worker
+_WORKER: Dict[str, Any] = {}
+
+
+def _expand_values(spec: Any) -> List[Any]:
+	"""A list, a scalar, or an inclusive {"start", "stop", "step"} range."""
+	if isinstance(spec, dict):
+		start, stop, step = spec['start'], spec['stop'], spec.get('step', 1)
+		if step == 0:
+			raise ValueError(f"Sweep range step must be non-zero: {spec}")
+		values = []
+		v = start
+		while (step > 0 and v <= stop) or (step < 0 and v >= stop):
+			values.append(v)
+			v += step
+		return values
+	if isinstance(spec, (list, tuple)):
+		return list(spec)
+	return [spec]
+
+
+def expand_grid(grid: Dict[str, Any]) -> List[Dict[str, Any]]:
+	"""Cartesian product of the grid values, one params dict per combination."""
+	keys = list(grid.keys())
+	values = [_expand_values(grid[k]) for k in keys]
+	return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def _init_worker(strat_cfg: Dict[str, Any], port_cfg: Dict[str, Any], mode: str, engine_kwargs: Dict[str, Any], data,
+				 cache: Dict[str, Any] | None = None, indicators: bool = False, checkpoint: Dict[str, Any] | None = None,
+				 backend: str = 'pandas') -> None:
+	_WORKER.update(strat_cfg=strat_cfg, port_cfg=port_cfg, mode=mode, engine_kwargs=engine_kwargs, data=data, cache=cache,
+				   indicators=IndicatorCache() if indicators else None, checkpoint=checkpoint, backend=backend)
+
+
+def _run_combo(job_id: int, overrides: Dict[str, Any]) -> Dict[str, Any]:
+	strat_cfg = _WORKER['strat_cfg']
+	port_cfg = _WORKER['port_cfg']
+	params = {**strat_cfg.get('params', {}), **overrides}
+	initial_cash = port_cfg.get('cash', 1_000_000.0)
+	t0 = time.perf_counter()
+	row: Dict[str, Any] = {"job": job_id, **overrides}
+	cache = _WORKER.get('cache')
+	checkpoint = _WORKER.get('checkpoint')
+	try:
+		key = cached = None
+		if cache is not None or checkpoint is not None:
+			fingerprint = cache['fingerprint'] if cache is not None else checkpoint['fingerprint']
+			key = result_key({**strat_cfg, 'params': params}, port_cfg, _WORKER['mode'], _WORKER['engine_kwargs'], fingerprint,
+							 _WORKER['backend'])
+		if cache is not None and not cache['recompute']:
+			cached = load_result(key, cache['dir'])
+		if cached is not None:
+			curve, trades = cached
+		else:
+			strategy = load_strategy(strat_cfg['module'], strat_cfg['class'], params)
+			sim_kwargs = dict(_WORKER['engine_kwargs'])
+			if checkpoint is not None:
+				sim_kwargs['checkpoint'] = make_checkpointer(checkpoint['cfg'], key, checkpoint['resume'])
+			indicators = _WORKER.get('indicators')
+			with use_backend(_WORKER['backend']), indicator_cache(cache=indicators) if indicators is not None else nullcontext():
+				curve, trades = ENGINE_MODES[_WORKER['mode']](
+					strategy,
+					_WORKER['data'],
+					commission=port_cfg.get('commission', 0.0),
+					slippage=port_cfg.get('slippage', 0.0),
+					initial_cash=initial_cash,
+					**sim_kwargs,
+				)
+			if cache is not None:
+				try:
+					store_result(key, curve, trades, meta={"sweep_params": overrides, "mode": _WORKER['mode']}, cache_dir=cache['dir'])
+				except Exception as e:
+					logger.exception("Failed to cache sweep job %s: %s", job_id, e)
+		row['cached'] = cached is not None
+		equity = curve['equity']
+		row.update(
+			final_equity=float(equity.iloc[-1]),
+			return_pct=float(equity.iloc[-1]) / float(initial_cash) - 1.0,
+			max_drawdown=float((equity / equity.cummax() - 1.0).min()),
+			n_trades=0 if trades is None else len(trades),
+			error=None,
+		)
+	except Exception as e:
+		logger.exception("Sweep job %s failed params=%s: %s", job_id, overrides, e)
+		row.update(final_equity=None, return_pct=None, max_drawdown=None, n_trades=None, cached=False, error=f"{type(e).__name__}: {e}")
+	row.update(elapsed_s=time.perf_counter() - t0, worker_pid=os.getpid())
+	return row
+
+
+def sweep_on_data(strat_cfg: Dict[str, Any], port_cfg: Dict[str, Any], data, grid: Dict[str, Any],
+				  mode: str = 'loop', processes: int | None = None, engine_kwargs: Dict[str, Any] | None = None,
+				  cache_dir: Path | None = None, recompute: bool = False, indicators: bool = False,
+				  checkpoint: Any = None, resume: bool = False, backend: str | None = None) -> pd.DataFrame:
+	"""Run every grid combination against already fetched `data`.
+
+	processes: pool size (default: os.cpu_count()); 1 runs inline without a pool.
+	engine_kwargs: extra options for the simulation function (see resolve_engine).
+	cache_dir: result cache to read/write per combination (None disables it);
+	`recompute=True` reruns every combination and refreshes its entry.
+	indicators: give each worker an indicator cache shared by its jobs.
+	checkpoint: checkpoint each loop-mode combination (true, or {"every",
+	"seconds"} as in task["engine"]["checkpoint"]); `resume=True` (which
+	implies it) continues interrupted combinations from their files.
+	backend: compute backend for every combination (see
+	`src.strategy.backends`; default pandas).
+	Returns one row per combination with metrics, elapsed_s and worker_pid.
+	"""
+	if mode not in ENGINE_MODES:
+		raise ValueError(f"Unknown engine mode: {mode} (expected one of {sorted(ENGINE_MODES)})")
+	engine_kwargs = engine_kwargs or {}
+	backend = resolve_backend(backend)
+	combos = expand_grid(grid)
+	cache = None
+	if cache_dir is not None:
+		# fingerprint the data once here instead of in every job
+		cache = {'dir': Path(cache_dir), 'fingerprint': data_fingerprint(data), 'recompute': recompute}
+	ckpt = None
+	if checkpoint or resume:
+		if mode == 'loop':
+			fingerprint = cache['fingerprint'] if cache is not None else data_fingerprint(data)
+			ckpt = {'cfg': checkpoint, 'resume': resume, 'fingerprint': fingerprint}
+		else:
+			logger.warning("Checkpoints are only supported in loop mode; sweeping %s mode without them", mode)
+	logger.info("Sweep start: combinations=%s processes=%s mode=%s backend=%s", len(combos), processes, mode, backend)
+	t0 = time.perf_counter()
+	if processes == 1:
+		_init_worker(strat_cfg, port_cfg, mode, engine_kwargs, data, cache, indicators, ckpt, backend)
+		rows = [_run_combo(i, combo) for i, combo in enumerate(combos)]
+	else:
+		with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+								 initargs=(strat_cfg, port_cfg, mode, engine_kwargs, data, cache, indicators, ckpt, backend)) as pool:
+			rows = list(pool.map(_run_combo, range(len(combos)), combos))
+	wall = time.perf_counter() - t0
+	if cache is not None:
+		prune_cache(cache['dir'])
+
+	results = pd.DataFrame(rows)
+	results.attrs['wall_s'] = wall
+	busy = float(results['elapsed_s'].sum()) if not results.empty else 0.0
+	logger.info("Sweep finished: combinations=%s wall=%.2fs busy=%.2fs speedup=%.2fx", len(combos), wall, busy, busy / wall if wall else 0.0)
+	return results
+
+
+def summarize_workers(results: pd.DataFrame) -> pd.DataFrame:
+	"""Per-worker job counts and busy time, to judge scaling across cores."""
+	summary = results.groupby('worker_pid')['elapsed_s'].agg(jobs='count', busy_s='sum', mean_job_s='mean')
+	wall = results.attrs.get('wall_s')
+	if wall:
+		summary['utilization'] = summary['busy_s'] / wall
+	return summary.reset_index()
+
+
+def run_sweep(task_name: str, grid: Dict[str, Any] | None = None, processes: int | None = None,
+			  recompute: bool = False, resume: bool = False) -> pd.DataFrame:
+	"""Sweep a task's strategy params; `grid` defaults to the task's "sweep" block.
+
+	With task["engine"]["cache"] = true, combinations already in the result
+	cache are not rerun unless `recompute`, so rerunning an interrupted sweep
+	only runs the missing ones; `resume` also continues loop-mode
+	combinations from their checkpoints.
+
+	Saves sweep_results.csv and sweep_workers.csv into a new result run dir.
+	"""
+	task = load_task(task_name)
+	grid = grid if grid is not None else task.get('sweep')
+	if not grid:
+		raise ValueError(f"Task {task_name} has no sweep grid (add a \"sweep\" block or pass grid)")
+	mode, engine_kwargs = resolve_engine(task)
+
+	data = fetch_task_data(task['data'], task['portfolio'])
+	engine_cfg = task.get('engine', {})
+	cache_dir = default_cache_dir() if engine_cfg.get('cache', False) else None
+	# per-bar loop strategies see a new history slice every bar, so memoizing only helps whole-series modes
+	indicators = engine_cfg.get('indicator_cache', mode != 'loop')
+	results = sweep_on_data(task['strategy'], task['portfolio'], data, grid, mode=mode, processes=processes,
+							engine_kwargs=engine_kwargs, cache_dir=cache_dir, recompute=recompute, indicators=indicators,
+							checkpoint=engine_cfg.get('checkpoint', False), resume=resume, backend=engine_cfg.get('backend'))
+	results = results.sort_values('return_pct', ascending=False, na_position='last')
+
+	run_dir = new_result_run_dir()
+	results_path = run_dir / "sweep_results.csv"
+	results.to_csv(results_path, index=False)
+	workers_path = run_dir / "sweep_workers.csv"
+	summarize_workers(results).to_csv(workers_path, index=False)
+	logger.info("Saved sweep results to %s and worker timing to %s", results_path, workers_path)
+	return results
+
+
+__all__ = ["expand_grid", "sweep_on_data", "summarize_workers", "run_sweep"]
@@ -8,8 +8,8 @@ __all__ = []
 
 try:
     # Import common modules if available to provide package-level access
-    from . import fetcher, storage, exceptions, adapters  # type: ignore
-    __all__ = ["fetcher", "storage", "exceptions", "adapters"]
+    from . import fetcher, async_fetcher, storage, frame_cache, ratelimit, exceptions, adapters  # type: ignore
+    __all__ = ["fetcher", "async_fetcher", "storage", "frame_cache", "ratelimit", "exceptions", "adapters"]
 except Exception:
     # ignore import-time errors during early development
     pass
\ No newline at end of file
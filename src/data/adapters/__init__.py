@@ -1,6 +1,6 @@
 """
 Adapters package for data sources (csv, yfinance, etc.).
 """
-__all__ = ["csv_adapter", "yfinance_adapter"]
+__all__ = ["csv_adapter", "yfinance_adapter", "synthetic_adapter"]
 # adapters 包初始化
-__all__ = ["csv_adapter", "yfinance_adapter"]
\ No newline at end of file
+__all__ = ["csv_adapter", "yfinance_adapter", "synthetic_adapter"]
\ No newline at end of file
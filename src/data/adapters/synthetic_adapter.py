@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import pandas as pd
+from src.system.log import get_logger
+from src.data.synthetic import INTERVAL_FREQ, random_walk_ohlcv
+
+logger = get_logger(__name__)
+
+# bars are generated from this date on, so a given date has the same price
+# whatever start/end is requested
+DEFAULT_ANCHOR = '2000-01-03'
+DEFAULT_BARS = 1000
+_INTRADAY = {'min', '5min', '15min', '30min', 'h'}
+
+
+def fetch(symbol, start, end, interval='1d', adjusted=True, **kwargs):
+    """Deterministic random-walk OHLCV for offline runs (no network).
+
+    Optional kwargs: seed (default 0), volatility, drift, start_price, anchor
+    (first generated bar; daily data defaults to 2000-01-03, intraday data to
+    the start date), n_bars (length when `end` is not given) and latency
+    (seconds each call waits, standing in for a network round trip).
+    """
+    latency = kwargs.get('latency')
+    if latency:
+        time.sleep(latency)
+    return _generate(symbol, start, end, interval, **kwargs)
+
+
+async def afetch(symbol, start, end, interval='1d', adjusted=True, **kwargs):
+    """Native async `fetch`: the latency is awaited, so calls overlap on one event loop."""
+    latency = kwargs.get('latency')
+    if latency:
+        await asyncio.sleep(latency)
+    return _generate(symbol, start, end, interval, **kwargs)
+
+
+def _generate(symbol, start, end, interval, **kwargs):
+    freq = INTERVAL_FREQ.get(interval, interval)
+    start_ts = pd.to_datetime(start) if start else pd.Timestamp(DEFAULT_ANCHOR)
+    anchor = kwargs.get('anchor')
+    if anchor is None:
+        anchor = start_ts.normalize() if freq in _INTRADAY else pd.Timestamp(DEFAULT_ANCHOR)
+    anchor = min(pd.Timestamp(anchor), start_ts)
+    if end:
+        index = pd.date_range(anchor, pd.to_datetime(end), freq=freq)
+    else:
+        lead = int((pd.date_range(anchor, start_ts, freq=freq) < start_ts).sum())
+        index = pd.date_range(anchor, periods=lead + int(kwargs.get('n_bars', DEFAULT_BARS)), freq=freq)
+
+    df = random_walk_ohlcv(
+        index,
+        symbol=symbol,
+        seed=kwargs.get('seed', 0),
+        start_price=kwargs.get('start_price', 100.0),
+        drift=kwargs.get('drift', 0.0),
+        volatility=kwargs.get('volatility', 0.01),
+    )
+    df = df[df.index >= start_ts]
+    logger.info("Synthetic adapter: generated %s rows for %s interval=%s", len(df), symbol, interval)
+    return df
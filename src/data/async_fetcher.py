@@ -0,0 +1,145 @@
+"""Asyncio front end of the data layer.
+
+Adapters are modules with a blocking `fetch(symbol, start, end, interval=...,
+adjusted=..., **kwargs)`. An adapter may also define a coroutine
+`afetch` with the same signature; `afetch(adapter, ...)` below awaits it
+when present and otherwise runs the blocking `fetch` in a worker thread
+(`asyncio.to_thread`), so every adapter can be awaited.
+
+`get_history` here is the coroutine counterpart of `fetcher.get_history`
+and shares its cache logic (in-memory frame cache, coverage-aware parquet
+cache, missing head/tail ranges, merge and write-back). Cache file I/O runs
+in worker threads, the missing ranges of one symbol are fetched
+concurrently, and rate-limited sources take their tokens from the same
+shared buckets as the threaded fetches (see `ratelimit`) without blocking
+the event loop:
+
+    results, errors = asyncio.run(get_history_many(symbols, start, end, source='akshare'))
+"""
+
+import asyncio
+
+from src.system import profiling
+from src.system.log import get_logger
+
+from . import fetcher
+from .exceptions import DataNotFoundError, RateLimitError
+from .frame_cache import get_frame_cache
+from .ratelimit import get_rate_limiter
+
+logger = get_logger(__name__)
+
+
+async def afetch(adapter, symbol, start, end, interval='1d', adjusted=True, **kwargs):
+    """Await the adapter's own `afetch`, or run its blocking `fetch` in a thread."""
+    native = getattr(adapter, 'afetch', None)
+    if native is not None:
+        return await native(symbol, start, end, interval=interval, adjusted=adjusted, **kwargs)
+    return await asyncio.to_thread(adapter.fetch, symbol, start, end, interval=interval, adjusted=adjusted, **kwargs)
+
+
+async def _fetch_range(adapter, symbol, source, start, end, interval, adjusted, max_retries, backoff_factor, **kwargs):
+    """Coroutine version of `fetcher._fetch_range`: same retries, non-blocking waits."""
+    limiter = get_rate_limiter(source)
+    last_exc = None
+    for attempt in range(max_retries):
+        try:
+            if limiter is not None:
+                await limiter.acquire_async()
+            logger.debug("Attempt %d fetching %s from %s (%s - %s)", attempt + 1, symbol, source, start, end)
+            return await afetch(adapter, symbol, start, end, interval=interval, adjusted=adjusted, **kwargs)
+        except RateLimitError as e:
+            last_exc = e
+            wait = (2 ** attempt) * backoff_factor
+            profiling.count('data.rate_limit_retries')
+            logger.warning("Rate limit when fetching %s (attempt=%d), waiting %s seconds", symbol, attempt + 1, wait)
+            if limiter is not None:
+                limiter.backoff(wait)
+            else:
+                await asyncio.sleep(wait)
+        except DataNotFoundError:
+            raise
+        except Exception as e:
+            last_exc = e
+            logger.exception("Error fetching %s from %s: %s", symbol, source, e)
+            break
+
+    logger.error("Failed to fetch %s after attempts=%s", symbol, max_retries)
+    raise last_exc if last_exc is not None else RuntimeError('Failed to fetch data')
+
+
+async def get_history(symbol, start, end, source='yfinance', interval='1d', adjusted=True,
+                      cache=True, max_retries=3, backoff_factor=1, refresh=False, memory_cache=True, **kwargs):
+    """Coroutine `fetcher.get_history`: same arguments, caching and result."""
+    memory = get_frame_cache() if cache and memory_cache else None
+    key = fetcher._frame_key(symbol, source, interval, adjusted, kwargs) if memory is not None else None
+    if key is not None and not refresh:
+        df = memory.get(key, start, end)
+        if df is not None:
+            logger.info("memory cache hit for %s rows=%s", symbol, len(df))
+            profiling.count('data.memory_hits')
+            return df
+
+    logger.info("async get_history called: symbol=%s source=%s start=%s end=%s interval=%s cache=%s refresh=%s",
+                symbol, source, start, end, interval, cache, refresh)
+    cached, coverage, ranges = await asyncio.to_thread(fetcher._cache_plan, symbol, start, end, interval, cache, refresh)
+    if coverage is not None and not ranges:
+        df = cached
+    else:
+        adapter = fetcher._require_adapter(source)
+
+        async def fetch_one(lo, hi):
+            lo_arg, hi_arg = fetcher._range_args(lo, hi, start, end)
+            try:
+                df = await _fetch_range(adapter, symbol, source, lo_arg, hi_arg, interval, adjusted,
+                                        max_retries, backoff_factor, **kwargs)
+            except DataNotFoundError:
+                if coverage is None:
+                    logger.error("Data not found for %s from %s", symbol, source)
+                    raise
+                df = None
+            profiling.count('data.fetched_ranges')
+            return df
+
+        frames = await asyncio.gather(*(fetch_one(lo, hi) for lo, hi in ranges))
+        pieces = [df for df in frames if df is not None and not df.empty]
+        df = await asyncio.to_thread(fetcher._merge_fetched, symbol, start, end, source, interval, cache,
+                                     cached, coverage, pieces)
+    if key is not None:
+        fetcher._remember(memory, key, df, start, end)
+    return df
+
+
+async def get_history_many(symbols, start, end, source='yfinance', max_concurrency=32, **kwargs):
+    """Coroutine `fetcher.get_history_many`: at most `max_concurrency` symbols in flight.
+
+    Returns `(results, errors)` dicts keyed by symbol; one failing symbol
+    does not stop the rest.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    gate = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def one(symbol):
+        async with gate:
+            return await get_history(symbol, start, end, source=source, **kwargs)
+
+    outcomes = await asyncio.gather(*(one(symbol) for symbol in symbols), return_exceptions=True)
+    results, errors = {}, {}
+    for symbol, outcome in zip(symbols, outcomes):
+        if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+            # cancellation and interrupts are not per-symbol failures
+            raise outcome
+        if isinstance(outcome, Exception):
+            logger.warning("Fetching %s from %s failed: %s", symbol, source, outcome)
+            errors[symbol] = outcome
+        else:
+            results[symbol] = outcome
+    logger.info("async get_history_many: %d symbols from %s, %d failed", len(symbols), source, len(errors))
+    return results, errors
+
+
+__all__ = [
+    "afetch",
+    "get_history",
+    "get_history_many",
+]
@@ -1,8 +1,14 @@
 import time
 import importlib
-from .storage import read_cached, write_cache
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from . import storage
+from .frame_cache import get_frame_cache
+from .ratelimit import get_rate_limiter
+from .storage import last_cached_bar, merge_frames, read_cached, read_coverage, update_cache
 from .exceptions import RateLimitError, DataNotFoundError
 from src.system.log import get_logger
+from src.system import profiling
 
 logger = get_logger(__name__)
 
@@ -13,6 +19,7 @@ ADAPTER_MODULES = {
     'csv': 'src.data.adapters.csv_adapter',
     'yfinance': 'src.data.adapters.yfinance_adapter',
     'akshare': 'src.data.adapters.akshare_adapter',
+    'synthetic': 'src.data.adapters.synthetic_adapter',
 }
 
 
@@ -27,51 +34,109 @@ def select_adapter(name):
         raise
 
 
-def get_history(symbol, start, end, source='yfinance', interval='1d', adjusted=True,
-                cache=True, max_retries=3, backoff_factor=1, refresh=False, **kwargs):
-    """Unified external interface: prefer cached data first, otherwise fetch from the adapter and write to cache.
+def _ts(value):
+    return pd.Timestamp(value) if value else None
+
+
+def _format_like(ts, sample):
+    """Render a range boundary in the caller's date style (adapters pass them through)."""
+    if ts.hour or ts.minute or ts.second:
+        return ts.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(sample, str) and len(sample) == 8 and sample.isdigit():
+        return ts.strftime('%Y%m%d')
+    return ts.strftime('%Y-%m-%d')
+
+
+def _coverage_end(end, merged):
+    """How far a fetch up to `end` makes the cache complete.
 
-    Implements a simple retry policy: on RateLimitError, retry with exponential backoff.
+    A range ending in the past is complete up to `end`; an open or
+    still-running range only up to the last bar received, so the next call
+    asks for the bars after it.
     """
-    logger.info("get_history called: symbol=%s source=%s start=%s end=%s interval=%s cache=%s refresh=%s",
-                symbol, source, start, end, interval, cache, refresh)
+    end = _ts(end)
+    if end is not None and end < pd.Timestamp.now().normalize():
+        return end
+    last = merged.index.max() if merged is not None and not merged.empty else None
+    if end is None:
+        return last
+    return end if last is None else min(end, last)
 
-    if cache and not refresh:
-        df = read_cached(symbol, start, end)
-        if df is not None and not df.empty:
-            logger.info("cache hit for %s rows=%s", symbol, len(df))
-            return df
-        logger.info("cache miss for %s", symbol)
 
-    adapter = select_adapter(source)
-    if adapter is None:
-        logger.error("Unknown data source requested: %s", source)
-        raise ValueError(f"Unknown data source: {source}")
+def _remember(memory, key, df, start, end):
+    """Keep `df` in the frame cache for the range it is known complete for.
+
+    A range ending in the past is kept up to `end`. An open or still-running
+    range is only kept up to its last bar, so a later call asking past that
+    bar misses and fetches the new bars, and is marked as reaching the
+    latest bar so a repeated open-ended call hits. An empty one is not kept.
+    """
+    end = _ts(end)
+    latest = end is None or end >= pd.Timestamp.now().normalize()
+    if latest:
+        if df is None or df.empty:
+            return
+        end = df.index.max()
+    memory.put(key, df, start, end, latest=latest)
+
 
+def missing_ranges(coverage, start, end, refresh=False, last_bar=None):
+    """Date ranges to download so the cache covers `[start, end]`.
+
+    coverage: (start, end) the cache is complete for (see
+    `storage.read_coverage`), or None for no cache. Only the head before
+    and the tail after the covered range are returned, each overlapping it
+    by one boundary bar; a request past either end bridges the gap so the
+    covered range stays contiguous. `refresh` re-fetches from the last
+    cached bar `last_bar` instead of everything. Without `end` the tail is
+    only fetched on refresh. Returns a list of (start, end) Timestamps,
+    None meaning open.
+    """
+    start, end = _ts(start), _ts(end)
+    if coverage is None:
+        return [(start, end)]
+    cov_start, cov_end = coverage
+    ranges = []
+    if cov_start is not None and (start is None or start < cov_start):
+        ranges.append((start, cov_start))
+    if refresh:
+        tail_start = last_bar if last_bar is not None else cov_end
+        if end is None or tail_start is None or end >= tail_start:
+            ranges.append((tail_start, end))
+    elif end is not None and (cov_end is None or end > cov_end):
+        ranges.append((cov_end, end))
+    return ranges
+
+
+def _fetch_range(adapter, symbol, source, start, end, interval, adjusted, max_retries, backoff_factor, **kwargs):
+    """One adapter call with retries: on RateLimitError, retry with exponential backoff.
+
+    Calls to a rate-limited source first take a token from its shared
+    bucket (see `ratelimit`), and a rate limit pauses that bucket for every
+    thread instead of only sleeping this one.
+    """
+    limiter = get_rate_limiter(source)
     last_exc = None
     for attempt in range(max_retries):
         try:
-            logger.debug("Attempt %d fetching %s from %s", attempt + 1, symbol, source)
-            df = adapter.fetch(symbol, start, end, interval=interval, adjusted=adjusted, **kwargs)
-            if df is None or df.empty:
-                # adapter returned empty -> treat as not found
-                logger.warning("Adapter returned empty for %s from %s", symbol, source)
-                raise DataNotFoundError(f"No data for {symbol} from {source}")
-            if cache:
-                try:
-                    write_cache(symbol, df)
-                except Exception:
-                    logger.exception("Failed to write cache for %s", symbol)
-            logger.info("Fetched data for %s rows=%s", symbol, len(df))
-            return df
+            if limiter is not None:
+                with profiling.phase('data.rate_limit_wait'):
+                    limiter.acquire()
+            logger.debug("Attempt %d fetching %s from %s (%s - %s)", attempt + 1, symbol, source, start, end)
+            with profiling.phase('data.adapter_fetch'):
+                return adapter.fetch(symbol, start, end, interval=interval, adjusted=adjusted, **kwargs)
         except RateLimitError as e:
             last_exc = e
             wait = (2 ** attempt) * backoff_factor
-            logger.warning("Rate limit when fetching %s (attempt=%d), sleeping %s seconds", symbol, attempt + 1, wait)
-            time.sleep(wait)
+            profiling.count('data.rate_limit_retries')
+            if limiter is not None:
+                logger.warning("Rate limit when fetching %s (attempt=%d), pausing %s for %s seconds", symbol, attempt + 1, source, wait)
+                limiter.backoff(wait)
+            else:
+                logger.warning("Rate limit when fetching %s (attempt=%d), sleeping %s seconds", symbol, attempt + 1, wait)
+                time.sleep(wait)
             continue
         except DataNotFoundError:
-            logger.error("Data not found for %s from %s", symbol, source)
             raise
         except Exception as e:
             # other exceptions: break and rethrow later
@@ -82,6 +147,182 @@ def get_history(symbol, start, end, source='yfinance', interval='1d', adjusted=T
     logger.error("Failed to fetch %s after attempts=%s", symbol, max_retries)
     raise last_exc if last_exc is not None else RuntimeError('Failed to fetch data')
 
+
+def _slice(df, start, end):
+    if start:
+        df = df[df.index >= pd.to_datetime(start)]
+    if end:
+        df = df[df.index <= pd.to_datetime(end)]
+    return df
+
+
+def _frame_key(symbol, source, interval, adjusted, kwargs):
+    """Key of a request in the in-memory frame cache, or None when `kwargs` is unhashable."""
+    key = (symbol, source, interval, adjusted, storage.CACHE_DIR, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+@profiling.timed('data.get_history')
+def get_history(symbol, start, end, source='yfinance', interval='1d', adjusted=True,
+                cache=True, max_retries=3, backoff_factor=1, refresh=False, memory_cache=True, **kwargs):
+    """Unified external interface: serve from the cache, fetching only what it lacks.
+
+    The cache records the date range each symbol is complete for. Missing
+    head/tail ranges of `[start, end]` are fetched from the adapter, merged
+    into the cached frame (fetched bars win, duplicates dropped) and
+    written back only when something changed; `refresh=True` re-fetches
+    from the last cached bar rather than the whole history. Each adapter
+    call retries on RateLimitError with exponential backoff.
+
+    In front of the disk cache, frames already returned in this process are
+    kept in the `frame_cache` LRU and requests inside a loaded range are
+    sliced from memory (`memory_cache=False` or `cache=False` skips it;
+    `refresh=True` reloads and replaces the entry). Open or still-running
+    ranges are only served from memory up to the last bar loaded; a repeated
+    open-ended request (end=None) gets those bars from memory.
+    """
+    memory = get_frame_cache() if cache and memory_cache else None
+    key = _frame_key(symbol, source, interval, adjusted, kwargs) if memory is not None else None
+    if key is not None and not refresh:
+        df = memory.get(key, start, end)
+        if df is not None:
+            logger.info("memory cache hit for %s rows=%s", symbol, len(df))
+            profiling.count('data.memory_hits')
+            return df
+    df = _load_history(symbol, start, end, source, interval, adjusted, cache, max_retries, backoff_factor, refresh, **kwargs)
+    if key is not None:
+        _remember(memory, key, df, start, end)
+    return df
+
+
+def _cache_plan(symbol, start, end, interval, cache, refresh):
+    """Read the cache state of a request: (cached slice, coverage, ranges to fetch).
+
+    coverage is None when nothing usable is cached; no ranges with a
+    coverage means the cache answers the request alone.
+    """
+    cached = coverage = None
+    if cache:
+        with profiling.phase('data.read_cache'):
+            coverage = read_coverage(symbol, interval)
+            if coverage is None:
+                # cache written before coverage was tracked: trust its own span
+                full = read_cached(symbol, interval=interval)
+                if full is not None and not full.empty:
+                    coverage = (full.index.min(), full.index.max())
+                    cached = _slice(full, start, end)
+            else:
+                cached = read_cached(symbol, start, end, interval=interval)
+                if cached is None:
+                    # metadata without bars (files removed): start over
+                    coverage = None
+    last_bar = last_cached_bar(symbol, interval) if coverage is not None and refresh else None
+    ranges = missing_ranges(coverage, start, end, refresh=refresh, last_bar=last_bar)
+    if coverage is not None and not ranges:
+        logger.info("cache hit for %s rows=%s", symbol, len(cached))
+        profiling.count('data.cache_hits')
+    elif coverage is None:
+        logger.info("cache miss for %s", symbol)
+        profiling.count('data.cache_misses')
+    else:
+        logger.info("partial cache hit for %s: fetching %s", symbol, ranges)
+        profiling.count('data.cache_partial')
+    return cached, coverage, ranges
+
+
+def _require_adapter(source):
+    adapter = select_adapter(source)
+    if adapter is None:
+        logger.error("Unknown data source requested: %s", source)
+        raise ValueError(f"Unknown data source: {source}")
+    return adapter
+
+
+def _range_args(lo, hi, start, end):
+    """Adapter start/end for a missing range, in the caller's own style where they coincide."""
+    lo_arg = start if lo is None or lo == _ts(start) else _format_like(lo, start)
+    hi_arg = end if hi is None or hi == _ts(end) else _format_like(hi, end if end else start)
+    return lo_arg, hi_arg
+
+
+def _merge_fetched(symbol, start, end, source, interval, cache, cached, coverage, pieces):
+    """Merge fetched pieces with the cached slice, write the cache back and return `[start, end]`."""
+    fetched = merge_frames(None, pd.concat(pieces)) if pieces else None
+    if coverage is None and fetched is None:
+        # adapter returned empty -> treat as not found
+        logger.warning("Adapter returned empty for %s from %s", symbol, source)
+        raise DataNotFoundError(f"No data for {symbol} from {source}")
+    logger.info("Fetched data for %s rows=%s", symbol, 0 if fetched is None else len(fetched))
+
+    merged = _slice(merge_frames(cached, fetched), start, end)
+    if cache:
+        new_start = None if start is None or (coverage is not None and coverage[0] is None) else _ts(start)
+        if coverage is not None and coverage[0] is not None and new_start is not None:
+            new_start = min(new_start, coverage[0])
+        new_end = _coverage_end(end, fetched if fetched is not None else merged)
+        if coverage is not None and coverage[1] is not None:
+            new_end = coverage[1] if new_end is None else max(new_end, coverage[1])
+        try:
+            with profiling.phase('data.write_cache'):
+                update_cache(symbol, fetched, (new_start, new_end), interval)
+        except Exception:
+            logger.exception("Failed to write cache for %s", symbol)
+    return merged
+
+
+def _load_history(symbol, start, end, source, interval, adjusted, cache, max_retries, backoff_factor, refresh, **kwargs):
+    logger.info("get_history called: symbol=%s source=%s start=%s end=%s interval=%s cache=%s refresh=%s",
+                symbol, source, start, end, interval, cache, refresh)
+
+    cached, coverage, ranges = _cache_plan(symbol, start, end, interval, cache, refresh)
+    if coverage is not None and not ranges:
+        return cached
+    adapter = _require_adapter(source)
+
+    pieces = []
+    for lo, hi in ranges:
+        lo_arg, hi_arg = _range_args(lo, hi, start, end)
+        try:
+            df = _fetch_range(adapter, symbol, source, lo_arg, hi_arg, interval, adjusted, max_retries, backoff_factor, **kwargs)
+        except DataNotFoundError:
+            if coverage is None:
+                logger.error("Data not found for %s from %s", symbol, source)
+                raise
+            df = None
+        profiling.count('data.fetched_ranges')
+        if df is not None and not df.empty:
+            pieces.append(df)
+    return _merge_fetched(symbol, start, end, source, interval, cache, cached, coverage, pieces)
+
+
+def get_history_many(symbols, start, end, source='yfinance', max_workers=8, **kwargs):
+    """`get_history` for many symbols on a bounded thread pool.
+
+    Workers share the per-source rate limiter, so adding threads overlaps
+    network latency without exceeding the source's request rate. Returns
+    `(results, errors)`: dicts of symbol -> DataFrame and symbol -> the
+    exception its fetch raised; one failing symbol does not stop the rest.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    results, errors = {}, {}
+    if not symbols:
+        return results, errors
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols))), thread_name_prefix='fetch') as pool:
+        futures = {symbol: pool.submit(get_history, symbol, start, end, source=source, **kwargs) for symbol in symbols}
+        for symbol, future in futures.items():
+            try:
+                results[symbol] = future.result()
+            except Exception as e:
+                logger.warning("Fetching %s from %s failed: %s", symbol, source, e)
+                errors[symbol] = e
+    logger.info("get_history_many: %d symbols from %s, %d failed", len(symbols), source, len(errors))
+    return results, errors
+
+
 def valid_test():
     print("This is a test function.")
     pass
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""Process-local LRU of the frames `get_history` returned.
+
+Repeated `get_history` calls within one process (a `plot` after a
+`backtest`, the jobs of a sweep) would otherwise re-read and re-parse the
+parquet cache every time. Entries are keyed by symbol, source, interval,
+adjustment, extra adapter arguments and the cache directory, and remember
+the date range they were loaded for; a request inside that range is served
+by slicing the stored frame. Loading a range that overlaps an entry
+widens it (the frames are merged) instead of adding a second one.
+`get_history` records an open or still-running range only up to its last
+bar, so later calls asking past it still pick up new bars; such an entry is
+marked `latest`, and a repeated open-ended request (end=None) is served
+from it until `refresh=True` reloads.
+Eviction is LRU under an entry count and a memory budget.
+
+The cache is on by default; `disable_frame_cache()` turns it off and
+`frame_cache()` scopes a fresh one to a block:
+
+    with frame_cache(max_bytes=64 << 20) as cache:
+        ...
+    cache.stats()
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pandas as pd
+
+from .storage import merge_frames
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 256 << 20
+
+
+def _ts(value):
+    return pd.Timestamp(value) if value else None
+
+
+def _covers(lo, hi, start, end, latest=False):
+    """Whether the loaded range [lo, hi] (None = open) contains [start, end].
+
+    latest: the range was loaded up to the last bar available, which is what
+    an open end (None) asks for.
+    """
+    if lo is not None and (start is None or start < lo):
+        return False
+    if hi is not None and (end > hi if end is not None else not latest):
+        return False
+    return True
+
+
+def _overlaps(lo, hi, start, end):
+    return (hi is None or start is None or start <= hi) and (lo is None or end is None or lo <= end)
+
+
+def _widen(a, b, pick):
+    return None if a is None or b is None else pick(a, b)
+
+
+def _slice(df, start, end):
+    if start is not None:
+        df = df[df.index >= start]
+    if end is not None:
+        df = df[df.index <= end]
+    return df
+
+
+def _nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _detach(df):
+    """Hand out a frame the caller can modify without touching the cached one."""
+    # a shallow copy is enough under copy-on-write (always on from pandas 3)
+    return df.copy(deep=int(pd.__version__.split('.')[0]) < 3)
+
+
+class FrameCache:
+    """Thread-safe LRU of loaded history frames bounded by entry count and bytes."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, start=None, end=None):
+        """Bars of `key` within [start, end] when a loaded range covers it, else None."""
+        start, end = _ts(start), _ts(end)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not _covers(entry[1], entry[2], start, end, entry[4]):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            df = entry[0]
+        return _detach(_slice(df, start, end))
+
+    def put(self, key, df, start=None, end=None, latest=False):
+        """Store the bars `df` loaded for [start, end], merging an overlapping entry of `key`.
+
+        latest: `end` is the last bar the source had, so open-ended requests may use the entry.
+        """
+        start, end = _ts(start), _ts(end)
+        df = _detach(df)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[3]
+                if _overlaps(old[1], old[2], start, end):
+                    df = merge_frames(old[0], df)
+                    # the flag belongs to whichever range reaches the merged end
+                    if end is not None and (old[2] is None or old[2] > end):
+                        latest = old[4]
+                    elif old[2] == end:
+                        latest = latest or old[4]
+                    start, end = _widen(old[1], start, min), _widen(old[2], end, max)
+            size = _nbytes(df)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (df, start, end, size, latest)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[3]
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+_CACHE = FrameCache()
+
+
+def get_frame_cache():
+    return _CACHE
+
+
+def enable_frame_cache(max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+    """Install a fresh process-wide cache and return it."""
+    global _CACHE
+    _CACHE = FrameCache(max_entries=max_entries, max_bytes=max_bytes)
+    return _CACHE
+
+
+def disable_frame_cache():
+    global _CACHE
+    _CACHE = None
+
+
+@contextmanager
+def frame_cache(max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, cache=None):
+    """Use `cache` (or a new one) for the block, then restore the previous state."""
+    global _CACHE
+    previous = _CACHE
+    _CACHE = cache if cache is not None else FrameCache(max_entries=max_entries, max_bytes=max_bytes)
+    try:
+        yield _CACHE
+    finally:
+        _CACHE = previous
+
+
+__all__ = [
+    "FrameCache",
+    "disable_frame_cache",
+    "enable_frame_cache",
+    "frame_cache",
+    "get_frame_cache",
+]
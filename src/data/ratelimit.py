@@ -0,0 +1,120 @@
+"""Per-source request rate limiting shared by every fetch in the process.
+
+Each remote source gets one `TokenBucket`: a call takes a token, tokens
+refill at `rate` per second up to `burst`, and a caller finding the bucket
+empty sleeps until the next token is due. When an adapter reports a rate
+limit, `backoff` pauses the whole bucket, so every worker thread fetching
+from that source waits out the same backoff instead of each hammering the
+source on its own schedule.
+
+Sources missing from `RATE_LIMITS` (local files, synthetic data) are not
+limited.
+"""
+
+import asyncio
+import threading
+import time
+
+from src.system.log import get_logger
+
+logger = get_logger(__name__)
+
+# requests per second and burst size per source
+RATE_LIMITS = {
+    'akshare': (2.0, 4),
+    'yfinance': (2.0, 4),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket with a shared backoff pause."""
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._stamp = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        # no tokens accrue while paused
+        since = max(self._stamp, self._paused_until)
+        if now > since:
+            self._tokens = min(self.burst, self._tokens + (now - since) * self.rate)
+        self._stamp = now
+
+    def _take(self):
+        """Take a token and return 0, or return the seconds until one may be available."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Take one token, sleeping through any backoff pause; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            wait = self._take()
+            if not wait:
+                return waited
+            self._sleep(wait)
+            waited += wait
+
+    async def acquire_async(self):
+        """`acquire` for coroutines: waits with `asyncio.sleep` instead of blocking the loop."""
+        waited = 0.0
+        while True:
+            wait = self._take()
+            if not wait:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def backoff(self, seconds):
+        """Pause the bucket for every caller for at least `seconds` from now."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + seconds)
+            # resume with a single request, then at the base rate rather than with a burst
+            self._tokens = 1.0
+
+
+_BUCKETS = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(source):
+    """The shared bucket of `source`, or None when the source is not limited."""
+    limits = RATE_LIMITS.get(source)
+    if limits is None:
+        return None
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(source)
+        if bucket is None:
+            bucket = _BUCKETS[source] = TokenBucket(*limits)
+        return bucket
+
+
+def reset_rate_limiters():
+    """Forget all buckets (they are rebuilt from `RATE_LIMITS` on next use)."""
+    with _BUCKETS_LOCK:
+        _BUCKETS.clear()
+
+
+__all__ = [
+    "RATE_LIMITS",
+    "TokenBucket",
+    "get_rate_limiter",
+    "reset_rate_limiters",
+]
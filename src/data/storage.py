@@ -1,4 +1,24 @@
-import os
+"""On-disk bar cache.
+
+Partitioned layout (needs pyarrow):
+
+    data/<symbol>/<interval>/<year>.parquet   one file per calendar year
+    data/<symbol>/<interval>/_coverage.json   date range the cache is complete for
+
+A `start`/`end` read opens only the years it overlaps and passes the range
+to pyarrow as a filter, so row groups outside it are skipped from their
+min/max statistics. Updates rewrite only the years that received new or
+changed bars.
+
+Legacy layout, still read when no partitions exist (and written when
+pyarrow is missing): data/<symbol>.parquet (CSV fallback
+data/<symbol>.parquet.csv) plus data/<symbol>.meta.json. The first update
+through `update_cache` migrates it into partitions. It records no
+interval and only ever held daily bars, so it is used for daily
+(`LEGACY_INTERVAL`, or no interval) requests only.
+"""
+
+import json
 import os
 import pandas as pd
 from ..system.log import get_logger
@@ -8,6 +28,21 @@ logger = get_logger(__name__)
 CACHE_DIR = os.path.join(os.getcwd(), 'data')
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+# rows per parquet row group inside a year partition (the unit skipped by range filters)
+ROW_GROUP_SIZE = 10_000
+_COVERAGE_FILE = '_coverage.json'
+# the bar interval of the legacy single-file cache
+LEGACY_INTERVAL = '1d'
+
+
+def _parquet():
+    """pyarrow.parquet, or None when pyarrow is not installed."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return None
+    return pq
+
 
 def _cache_path(symbol):
     # 简单按 symbol 存单文件（可扩展为按年月分片）
@@ -15,7 +50,188 @@ def _cache_path(symbol):
     return os.path.join(CACHE_DIR, f"{safe}.parquet")
 
 
+def _meta_path(symbol):
+    safe = symbol.replace('/', '_')
+    return os.path.join(CACHE_DIR, f"{safe}.meta.json")
+
+
+def _partition_dir(symbol, interval=None):
+    parts = [CACHE_DIR, symbol.replace('/', '_')]
+    if interval:
+        parts.append(str(interval).replace('/', '_'))
+    return os.path.join(*parts)
+
+
+def _partition_path(symbol, year, interval=None):
+    return os.path.join(_partition_dir(symbol, interval), f"{int(year)}.parquet")
+
+
+def partition_years(symbol, interval=None):
+    """Years with a partition file for `symbol`/`interval`, ascending."""
+    directory = _partition_dir(symbol, interval)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(name[:-8]) for name in os.listdir(directory) if name.endswith('.parquet') and name[:-8].isdigit())
+
+
+def _ts(value):
+    return None if value is None else pd.Timestamp(value)
+
+
+def _uses_legacy(interval):
+    """Whether requests for `interval` may read or migrate the legacy single-file cache."""
+    return interval is None or interval == LEGACY_INTERVAL
+
+
+def read_coverage(symbol, interval=None):
+    """(start, end) date range the cached frame of `symbol` is complete for, or None.
+
+    A None start means the history was fetched from the beginning. Older
+    caches without metadata report None; callers fall back to the frame's
+    first and last bar.
+    """
+    path = os.path.join(_partition_dir(symbol, interval), _COVERAGE_FILE)
+    if not os.path.exists(path):
+        path = _meta_path(symbol)
+        if not _uses_legacy(interval) or not os.path.exists(path):
+            return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            meta = json.load(f)
+        return _ts(meta.get('start')), _ts(meta['end'])
+    except Exception as e:
+        logger.warning("Ignoring unreadable cache metadata for %s: %s", symbol, e)
+        return None
+
+
+def write_coverage(symbol, start, end, interval=None):
+    meta = {'start': None if start is None else pd.Timestamp(start).isoformat(), 'end': pd.Timestamp(end).isoformat()}
+    if partition_years(symbol, interval) or not _uses_legacy(interval):
+        os.makedirs(_partition_dir(symbol, interval), exist_ok=True)
+        path = os.path.join(_partition_dir(symbol, interval), _COVERAGE_FILE)
+    else:
+        path = _meta_path(symbol)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp, path)
+
+
+def merge_frames(cached, new):
+    """Union of two bar frames by timestamp; rows in `new` replace cached ones."""
+    if cached is None or cached.empty:
+        merged = new
+    elif new is None or new.empty:
+        return cached
+    else:
+        merged = pd.concat([cached, new])
+    merged = merged[~merged.index.duplicated(keep='last')]
+    return merged if merged.index.is_monotonic_increasing else merged.sort_index()
+
+
+def _read_partition(pq, path, start=None, end=None):
+    """One year file; the range goes to pyarrow so row groups outside it are skipped."""
+    filters = []
+    if start is not None or end is not None:
+        index_cols = (pq.read_schema(path).pandas_metadata or {}).get('index_columns') or []
+        if index_cols and isinstance(index_cols[0], str):
+            if start is not None:
+                filters.append((index_cols[0], '>=', start))
+            if end is not None:
+                filters.append((index_cols[0], '<=', end))
+    if filters:
+        try:
+            return pq.read_table(path, filters=filters).to_pandas()
+        except Exception as e:
+            # e.g. a tz-aware index against naive bounds: filter after reading, as the legacy path does
+            logger.debug("Range filter not pushed down for %s: %s", path, e)
+    return pq.read_table(path).to_pandas()
+
+
+def _write_partition(path, df):
+    """Write one year file atomically (temp file renamed into place)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    df.to_parquet(tmp, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp, path)
+
+
+def write_partitions(symbol, df, interval=None, years=None):
+    """Write `df` as year partitions (only `years` when given); returns the years written."""
+    written = []
+    for year, part in df.groupby(df.index.year, sort=True):
+        if years is not None and year not in years:
+            continue
+        _write_partition(_partition_path(symbol, year, interval), part)
+        written.append(int(year))
+    if written:
+        logger.info("Wrote cache partitions for %s/%s: %s", symbol, interval, written)
+    return written
+
+
+def last_cached_bar(symbol, interval=None):
+    """Timestamp of the newest cached bar (reads only the last partition), or None."""
+    years = partition_years(symbol, interval)
+    pq = _parquet()
+    if years and pq is not None:
+        df = _read_partition(pq, _partition_path(symbol, years[-1], interval))
+    else:
+        df = _read_legacy(symbol) if _uses_legacy(interval) else None
+    return None if df is None or df.empty else df.index.max()
+
+
+def _remove_legacy(symbol):
+    """Drop the single-file cache once its bars live in partitions."""
+    path = _cache_path(symbol)
+    for stale in (path, path + '.csv', _meta_path(symbol)):
+        if os.path.exists(stale):
+            os.remove(stale)
+    logger.info("Migrated legacy cache for %s into year partitions", symbol)
+
+
+def update_cache(symbol, new, coverage, interval=None):
+    """Merge `new` bars into the cache of `symbol` and record `coverage` ((start, end)).
+
+    With pyarrow, only the year partitions `new` touches are read, merged
+    (new bars win) and rewritten, and only if the merge changed them; a
+    legacy single-file cache is migrated into partitions on the first
+    daily update. Without pyarrow the legacy file is merged and rewritten
+    when it changed; other intervals are then not cached. The coverage
+    metadata is updated whenever the bars were stored.
+    """
+    pq = _parquet()
+    if pq is None and not _uses_legacy(interval):
+        logger.warning("Not caching %s/%s: the partitioned cache needs pyarrow", symbol, interval)
+        return
+    ok = True
+    if new is not None and not new.empty:
+        if pq is not None and partition_years(symbol, interval):
+            for year, part in new.groupby(new.index.year, sort=True):
+                path = _partition_path(symbol, year, interval)
+                existing = _read_partition(pq, path) if os.path.exists(path) else None
+                merged = merge_frames(existing, part)
+                if existing is None or not merged.equals(existing):
+                    _write_partition(path, merged)
+                    logger.info("Updated cache partition %s (%s rows)", path, len(merged))
+        else:
+            legacy = _read_legacy(symbol) if _uses_legacy(interval) else None
+            merged = merge_frames(legacy, new)
+            if pq is not None:
+                write_partitions(symbol, merged, interval)
+                if legacy is not None:
+                    _remove_legacy(symbol)
+            elif legacy is None or not merged.equals(legacy):
+                ok = write_cache(symbol, merged)
+    if not ok:
+        return
+    try:
+        write_coverage(symbol, *coverage, interval=interval)
+    except Exception as e:
+        logger.warning("Failed writing cache metadata for %s: %s", symbol, e)
+
+
 def write_cache(symbol, df: pd.DataFrame):
+    """Write the cached frame of `symbol`; returns False when nothing could be written."""
     path = _cache_path(symbol)
     try:
         df.to_parquet(path)
@@ -28,39 +244,65 @@ def write_cache(symbol, df: pd.DataFrame):
             logger.warning("Parquet write failed for %s, wrote CSV -> %s; error=%s", symbol, csvp, e)
         except Exception as e2:
             logger.exception("Failed to write cache for %s: %s", symbol, e2)
+            return False
+    return True
 
 
-def read_cached(symbol, start=None, end=None):
+def _read_legacy(symbol):
     path = _cache_path(symbol)
-    df = None
     if os.path.exists(path):
         try:
             df = pd.read_parquet(path)
             logger.info("Cache hit (parquet) for %s -> %s", symbol, path)
+            return df
         except Exception as e:
             logger.warning("Failed reading parquet cache for %s: %s", symbol, e)
             try:
                 df = pd.read_csv(path + '.csv', index_col=0, parse_dates=True)
                 logger.info("Read fallback CSV cache for %s", symbol)
+                return df
             except Exception as e2:
                 logger.warning("Failed reading CSV cache for %s: %s", symbol, e2)
                 return None
+    # 也尝试 csv 后缀
+    csvp = path + '.csv'
+    if os.path.exists(csvp):
+        try:
+            df = pd.read_csv(csvp, index_col=0, parse_dates=True)
+            logger.info("Cache hit (csv) for %s -> %s", symbol, csvp)
+            return df
+        except Exception as e:
+            logger.warning("Failed reading CSV cache for %s: %s", symbol, e)
+            return None
+    logger.debug("No cache found for %s", symbol)
+    return None
+
+
+def read_cached(symbol, start=None, end=None, interval=None):
+    """Cached bars of `symbol` within [start, end], or None when nothing is cached.
+
+    Reads the year partitions overlapping the range when they exist,
+    otherwise the legacy single file (daily requests only).
+    """
+    start, end = (pd.to_datetime(start) if start else None), (pd.to_datetime(end) if end else None)
+    years = partition_years(symbol, interval)
+    pq = _parquet()
+    if years and pq is not None:
+        lo = start.year if start is not None else years[0]
+        hi = end.year if end is not None else years[-1]
+        frames = [_read_partition(pq, _partition_path(symbol, year, interval), start, end) for year in years if lo <= year <= hi]
+        if not frames:
+            # keep the columns of an empty slice, as the single-file path does
+            frames = [_read_partition(pq, _partition_path(symbol, years[0], interval)).iloc[:0]]
+        df = pd.concat(frames) if len(frames) > 1 else frames[0]
+        logger.info("Cache hit (partitions %s) for %s rows=%s", [y for y in years if lo <= y <= hi], symbol, len(df))
     else:
-        # 也尝试 csv 后缀
-        csvp = path + '.csv'
-        if os.path.exists(csvp):
-            try:
-                df = pd.read_csv(csvp, index_col=0, parse_dates=True)
-                logger.info("Cache hit (csv) for %s -> %s", symbol, csvp)
-            except Exception as e:
-                logger.warning("Failed reading CSV cache for %s: %s", symbol, e)
-                return None
-        else:
-            logger.debug("No cache found for %s", symbol)
+        df = _read_legacy(symbol) if _uses_legacy(interval) else None
+        if df is None:
             return None
 
-    if start:
-        df = df[df.index >= pd.to_datetime(start)]
-    if end:
-        df = df[df.index <= pd.to_datetime(end)]
+    if start is not None:
+        df = df[df.index >= start]
+    if end is not None:
+        df = df[df.index <= end]
     return df
@@ -0,0 +1,65 @@
+"""Deterministic synthetic OHLCV data for offline tests and benchmarks.
+
+Prices follow a geometric random walk; each bar's open/high/low are drawn
+around the close so the usual OHLC invariants hold (low <= open, close <= high).
+The same (seed, symbol) always produces the same frame, and a longer frame
+extends a shorter one without changing its bars.
+"""
+
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# interval names used by the adapters -> pandas frequency aliases
+INTERVAL_FREQ = {
+    '1m': 'min', '5m': '5min', '15m': '15min', '30m': '30min', '60m': 'h', '1h': 'h',
+    '1d': 'D', 'daily': 'D', '1b': 'B', '1wk': 'W-FRI', 'weekly': 'W-FRI',
+}
+
+
+def _symbol_seed(seed: int, symbol: str) -> int:
+    return (int(seed) * 1_000_003 + zlib.crc32(symbol.encode('utf-8'))) & 0xFFFFFFFF
+
+
+def _freq(freq: str) -> str:
+    return INTERVAL_FREQ.get(freq, freq)
+
+
+def random_walk_ohlcv(index: pd.DatetimeIndex, symbol: str = 'SYN', seed: int = 0, start_price: float = 100.0,
+                      drift: float = 0.0, volatility: float = 0.01, base_volume: float = 1e6) -> pd.DataFrame:
+    """OHLCV frame on a given index (columns Open/High/Low/Close/Volume)."""
+    n = len(index)
+    rng = np.random.default_rng(_symbol_seed(seed, symbol))
+    # one row of draws per bar, so bar i does not depend on the total length
+    z = rng.standard_normal((n, 5))
+    close = start_price * np.exp(np.cumsum(drift + volatility * z[:, 0]))
+    prev_close = np.concatenate(([start_price], close[:-1]))
+    # open gaps a little away from the previous close
+    open_ = prev_close * np.exp(volatility * 0.25 * z[:, 1])
+    high = np.maximum(open_, close) * np.exp(np.abs(volatility * 0.5 * z[:, 2]))
+    low = np.minimum(open_, close) * np.exp(-np.abs(volatility * 0.5 * z[:, 3]))
+    volume = np.round(base_volume * np.exp(0.3 * z[:, 4]))
+    return pd.DataFrame(
+        {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+        index=pd.DatetimeIndex(index, name='date'),
+    )
+
+
+def generate_ohlcv(n_bars: int = 1000, freq: str = '1d', symbols=None, start: str = '2000-01-03', seed: int = 0,
+                   start_price: float = 100.0, drift: float = 0.0, volatility: float = 0.01):
+    """Generate `n_bars` of random-walk OHLCV at `freq` ('1d', '1b', '1h', '1m', or any pandas alias).
+
+    symbols: None for a single frame (symbol 'SYN'), an int for that many
+    symbols named SYN000.., or a list of names; multiple symbols return a
+    dict symbol -> DataFrame sharing one index.
+    """
+    index = pd.date_range(start=start, periods=int(n_bars), freq=_freq(freq))
+    if symbols is None:
+        return random_walk_ohlcv(index, 'SYN', seed, start_price, drift, volatility)
+    if isinstance(symbols, int):
+        symbols = [f"SYN{i:03d}" for i in range(symbols)]
+    return {sym: random_walk_ohlcv(index, sym, seed, start_price, drift, volatility) for sym in symbols}
+
+
+__all__ = ["INTERVAL_FREQ", "generate_ohlcv", "random_walk_ohlcv"]
@@ -14,6 +14,7 @@ import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
 from matplotlib.dates import DateFormatter
 from src.system.log import get_logger
+from src.system import profiling
 from src.system.startup import new_result_run_dir
 from src.strategy.calc_lines import MA, EMA, RSI, MACD, BOLL, ATR
 
@@ -56,6 +57,7 @@ def _resample(df: pd.DataFrame, frame: str) -> pd.DataFrame:
 		return dfw
 	return df
 
+@profiling.timed('ploter.plot_kline')
 def plot_kline(
 	df: pd.DataFrame,
 	symbol: str,
@@ -0,0 +1,91 @@
+"""Read-only history window handed to `decide(date, history)` strategies.
+
+Responsibilities:
+- Pull each column out of the frame once as a NumPy array
+- Expose the bars up to the current one as array views behind a moving end pointer
+- Build a DataFrame only when legacy code asks for one (`to_frame()`)
+
+`run_backtest` passes a `HistoryView` instead of a per-bar DataFrame slice to
+strategies that set `history_view = True`; the same object is reused for
+every bar, so nothing is allocated until a column or frame is requested.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class HistoryView:
+	"""Bars `[start, end)` of a frame, with `end` advanced by the engine.
+
+	`view[col]` is a read-only NumPy view; `lookback` (if set) caps the
+	window to that many trailing bars, as for a plain `decide` call.
+	"""
+
+	def __init__(self, data: pd.DataFrame, lookback: Optional[int] = None) -> None:
+		self._data = data
+		self.lookback = lookback
+		self._arrays: Dict[Hashable, np.ndarray] = {}
+		for col in data.columns:
+			arr = data[col].to_numpy().view()
+			arr.flags.writeable = False
+			self._arrays[col] = arr
+		self._start = 0
+		self._end = 0
+		self._frame: Optional[pd.DataFrame] = None
+
+	def seek(self, end: int) -> "HistoryView":
+		"""Move the window to end just after bar position `end - 1`."""
+		self._end = end
+		self._start = 0 if self.lookback is None else max(0, end - self.lookback)
+		self._frame = None
+		return self
+
+	@property
+	def columns(self) -> pd.Index:
+		return self._data.columns
+
+	@property
+	def index(self) -> pd.Index:
+		return self._data.index[self._start:self._end]
+
+	@property
+	def date(self) -> Any:
+		"""Timestamp of the current (last visible) bar."""
+		return self._data.index[self._end - 1]
+
+	@property
+	def empty(self) -> bool:
+		return self._end <= self._start
+
+	def __len__(self) -> int:
+		return self._end - self._start
+
+	def __contains__(self, col: Hashable) -> bool:
+		return col in self._arrays
+
+	def __getitem__(self, col: Hashable) -> np.ndarray:
+		return self._arrays[col][self._start:self._end]
+
+	def get(self, col: Hashable, default: Any = None) -> Any:
+		return self[col] if col in self._arrays else default
+
+	def last(self, col: Hashable) -> Any:
+		"""Value of `col` at the current bar."""
+		return self._arrays[col][self._end - 1]
+
+	def series(self, col: Hashable) -> pd.Series:
+		"""`col` as a Series over the window, sharing the view's memory."""
+		return pd.Series(self[col], index=self.index, name=col, copy=False)
+
+	def to_frame(self) -> pd.DataFrame:
+		"""The window as a DataFrame (built on first request per bar)."""
+		if self._frame is None:
+			self._frame = self._data.iloc[self._start:self._end]
+		return self._frame
+
+
+__all__ = ["HistoryView"]
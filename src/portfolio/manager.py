@@ -9,9 +9,14 @@ Responsibilities:
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, Sequence
+import numpy as np
 import pandas as pd
+from src.backtest.checkpoint import Checkpointer, capture_state, restore_state
+from src.portfolio.history import HistoryView
+from src.strategy.backends import get_backend
 from src.system.log import get_logger
+from src.system import profiling
 
 logger = get_logger(__name__)
 
@@ -39,14 +44,14 @@ class PortfolioManager:
 		"""Apply market orders at given prices.
 
 		orders: symbol -> qty (positive buy, negative sell)
-		prices: symbol -> price
+		prices: symbol -> price; symbols without a price, or with a NaN one, are skipped
 		"""
 		fills = []
 		for sym, qty in orders.items():
 			if qty == 0:
 				continue
 			px = prices.get(sym)
-			if px is None:
+			if px is None or px != px:
 				continue
 			# apply slippage
 			fill_px = px * (1 + self.slippage if qty > 0 else 1 - self.slippage)
@@ -67,21 +72,341 @@ class PortfolioManager:
 				self.state.positions.get(sym),
 			)
 		return fills
+
 	def value(self, prices: Dict[str, float]) -> float:
 		return self.state.equity(prices)
 
 
-def run_backtest(strategy, data: pd.DataFrame, commission: float, slippage: float, initial_cash: float = 1_000_000.0):
+class RecordBuffer:
+	"""Growable structured-array buffer.
+
+	Rows are written into a preallocated NumPy structured array that doubles
+	when full, so appending does not allocate a Python dict/tuple per row.
+	"""
+
+	def __init__(self, dtype, capacity: int = 1024) -> None:
+		self._data = np.zeros(max(int(capacity), 1), dtype=dtype)
+		self._n = 0
+
+	def __len__(self) -> int:
+		return self._n
+
+	@property
+	def data(self) -> np.ndarray:
+		"""View of the filled rows."""
+		return self._data[:self._n]
+
+	def _reserve(self, extra: int) -> None:
+		need = self._n + extra
+		if need > len(self._data):
+			cap = len(self._data)
+			while cap < need:
+				cap *= 2
+			grown = np.zeros(cap, dtype=self._data.dtype)
+			grown[:self._n] = self._data[:self._n]
+			self._data = grown
+
+	def append(self, *values) -> None:
+		self._reserve(1)
+		self._data[self._n] = values
+		self._n += 1
+
+	def extend(self, **columns) -> None:
+		"""Append many rows at once from equally sized column arrays."""
+		n = len(next(iter(columns.values())))
+		if n == 0:
+			return
+		self._reserve(n)
+		rows = self._data[self._n:self._n + n]
+		for name, values in columns.items():
+			rows[name] = values
+		self._n += n
+
+
+# per-bar rows reference bars by position so any index type can be restored
+FILL_DTYPE = np.dtype([('bar', 'i8'), ('symbol_id', 'i8'), ('qty', 'i8'), ('price', 'f8'), ('fee', 'f8')])
+CURVE_DTYPE = np.dtype([('bar', 'i8'), ('equity', 'f8'), ('cash', 'f8'), ('position_value', 'f8')])
+
+
+class ArrayPortfolioManager:
+	"""Compact portfolio manager with symbols indexed by integer.
+
+	Cash is a float, positions a NumPy vector aligned with `symbols`, and
+	fills go into a `RecordBuffer` instead of per-fill dicts.
+	"""
+
+	def __init__(self, symbols: Sequence[str], cash: float = 1_000_000.0, commission: float = 0.0,
+				 slippage: float = 0.0, capacity: int = 1024) -> None:
+		self.symbols = list(symbols)
+		self._ids = {sym: i for i, sym in enumerate(self.symbols)}
+		self.cash = float(cash)
+		self.positions = np.zeros(len(self.symbols), dtype=np.int64)
+		self.commission = commission
+		self.slippage = slippage
+		self.fills = RecordBuffer(FILL_DTYPE, capacity)
+
+	def symbol_id(self, symbol: str) -> int:
+		return self._ids[symbol]
+
+	def snapshot(self) -> PortfolioState:
+		positions = {sym: int(q) for sym, q in zip(self.symbols, self.positions) if q != 0}
+		return PortfolioState(cash=self.cash, positions=positions)
+
+	def apply_orders(self, orders: Dict[str, int], prices: np.ndarray, bar: int = -1) -> int:
+		"""Apply a symbol -> qty dict at `prices` (vector aligned with symbols).
+
+		Unknown symbols and NaN prices are skipped. Returns the number of fills.
+		"""
+		n = 0
+		for sym, qty in orders.items():
+			j = self._ids.get(sym)
+			if qty == 0 or j is None:
+				continue
+			px = prices[j]
+			if px != px:
+				continue
+			fill_px = px * (1 + self.slippage if qty > 0 else 1 - self.slippage)
+			cost = fill_px * qty
+			fee = abs(cost) * self.commission
+			self.cash -= cost + fee
+			self.positions[j] += qty
+			self.fills.append(bar, j, qty, fill_px, fee)
+			n += 1
+		return n
+
+	def apply_order_vector(self, qty: np.ndarray, prices: np.ndarray, bar: int = -1) -> int:
+		"""Apply one order per symbol with array math; NaN prices are skipped."""
+		qty = np.asarray(qty)
+		active = (qty != 0) & ~np.isnan(prices)
+		idx = np.flatnonzero(active)
+		if len(idx) == 0:
+			return 0
+		q = qty[idx]
+		px = prices[idx]
+		fill_px = np.where(q > 0, px * (1 + self.slippage), px * (1 - self.slippage))
+		cost = fill_px * q
+		fee = np.abs(cost) * self.commission
+		self.cash -= float(cost.sum() + fee.sum())
+		self.positions[idx] += q
+		self.fills.extend(bar=np.full(len(idx), bar), symbol_id=idx, qty=q, price=fill_px, fee=fee)
+		return len(idx)
+
+	def value(self, prices: np.ndarray) -> float:
+		return self.cash + float(self.positions @ prices)
+
+	def fills_frame(self, dates) -> pd.DataFrame:
+		"""Fills as the loop engine's trades frame (date, symbol, qty, price, fee, side)."""
+		rows = self.fills.data
+		if len(rows) == 0:
+			return pd.DataFrame([])
+		return pd.DataFrame({
+			"date": pd.Index(dates)[rows['bar']],
+			"symbol": np.asarray(self.symbols, dtype=object)[rows['symbol_id']],
+			"qty": rows['qty'],
+			"price": rows['price'],
+			"fee": rows['fee'],
+			"side": np.where(rows['qty'] > 0, "BUY", "SELL").astype(object),
+		})
+
+
+def _build_curve(records) -> pd.DataFrame:
+	curve_df = pd.DataFrame(records, columns=['date', 'equity', 'cash', 'position_value']).set_index('date')
+	# stock part return: pct change of position_value; when previous value is 0, define 0
+	curve_df['stock_return_pct'] = curve_df['position_value'].pct_change().fillna(0.0).replace([pd.NA, pd.NaT], 0.0)
+	return curve_df
+
+
+def _curve_from_buffer(buf: RecordBuffer, dates) -> pd.DataFrame:
+	rows = buf.data
+	records = zip(pd.Index(dates)[rows['bar']], rows['equity'], rows['cash'], rows['position_value'])
+	return _build_curve(records)
+
+
+def strategy_lookback(strategy) -> int | None:
+	"""Trailing bars `strategy.decide` needs, or None for the full history.
+
+	Read from a `lookback` attribute/property or a zero-argument `lookback()`
+	method; None (or no such member) keeps the full-history behaviour.
+	"""
+	lookback = getattr(strategy, 'lookback', None)
+	if callable(lookback):
+		lookback = lookback()
+	if lookback is None:
+		return None
+	lookback = int(lookback)
+	if lookback < 1:
+		raise ValueError(f"{type(strategy).__name__}.lookback must be >= 1, got {lookback}")
+	return lookback
+
+
+def _history(data: pd.DataFrame, i: int, dt, lookback: int | None) -> pd.DataFrame:
+	"""Bars visible to `decide` at bar `i`: at most `lookback` of them, as a slice view."""
+	if lookback is None:
+		return data.loc[:dt]
+	return data.iloc[max(0, i + 1 - lookback):i + 1]
+
+
+def _history_source(strategy, data: pd.DataFrame):
+	"""Per-bar history getter `(i, dt) -> history` for `decide`.
+
+	Strategies with `history_view = True` get one reused `HistoryView`;
+	others a DataFrame slice per bar.
+	"""
+	lookback = strategy_lookback(strategy)
+	if getattr(strategy, 'history_view', False):
+		view = HistoryView(data, lookback)
+		return lambda i, dt: view.seek(i + 1)
+	return lambda i, dt: _history(data, i, dt, lookback)
+
+
+def _iter_bars(data: pd.DataFrame, start: int = 0):
+	"""(date, bar) pairs from bar `start` on, as handed to `on_bar`.
+
+	The pandas backend yields `iterrows()` Series. The numpy/numba backends
+	(see `src.strategy.backends`) yield a plain dict per bar, built from one
+	`to_numpy()` block: the same upcast values without a Series per row.
+	"""
+	part = data.iloc[start:]
+	if get_backend() == 'pandas':
+		return part.iterrows()
+	columns = list(part.columns)
+	return ((dt, dict(zip(columns, values))) for dt, values in zip(part.index, part.to_numpy().tolist()))
+
+
+def _data_marker(data: pd.DataFrame) -> tuple:
+	"""Cheap identity of the replayed frame, stored with checkpoints."""
+	if data.empty:
+		return (0,)
+	return (len(data), str(data.index[0]), str(data.index[-1]))
+
+
+def _load_checkpoint(checkpoint: Checkpointer | None, data: pd.DataFrame, strategy, layout: str):
+	"""Saved run state to continue from (strategy already restored), or None."""
+	if checkpoint is None:
+		return None
+	saved = checkpoint.load()
+	if saved is None:
+		return None
+	if saved['layout'] != layout or saved['data'] != _data_marker(data):
+		logger.warning("Checkpoint %s does not match this run (%s, %s bars); starting over", checkpoint.path, layout, len(data))
+		return None
+	restore_state(strategy, saved['strategy'])
+	return saved
+
+
+def _save_checkpoint(checkpoint: Checkpointer, bar: int, data: pd.DataFrame, strategy, layout: str, portfolio) -> None:
+	checkpoint.save({
+		'bar': bar,
+		'layout': layout,
+		'data': _data_marker(data),
+		'strategy': capture_state(strategy),
+		'portfolio': portfolio,
+	})
+
+
+def _run_backtest_compact(strategy, data: pd.DataFrame, commission: float, slippage: float, initial_cash: float,
+						  checkpoint: Checkpointer | None = None, decide: bool = False):
+	pm = ArrayPortfolioManager([strategy.symbol], cash=initial_cash, commission=commission, slippage=slippage)
+	curve_buf = RecordBuffer(CURVE_DTYPE, capacity=len(data))
+	start = 0
+	saved = _load_checkpoint(checkpoint, data, strategy, 'compact')
+	if saved is not None:
+		start, state = saved['bar'], saved['portfolio']
+		pm.cash = state['cash']
+		pm.positions[:] = state['positions']
+		curve_buf.extend(**{name: state['curve'][name] for name in CURVE_DTYPE.names})
+		pm.fills.extend(**{name: state['fills'][name] for name in FILL_DTYPE.names})
+	close = data['Close'].to_numpy(dtype=float)
+	on_bar = None if decide else getattr(strategy, 'on_bar', None)
+	if on_bar is not None:
+		on_bar = profiling.instrument('strategy.on_bar', on_bar)
+	else:
+		decide = profiling.instrument('strategy.decide', strategy.decide)
+	apply_orders = profiling.instrument('portfolio.apply_orders', pm.apply_orders)
+	history = _history_source(strategy, data) if on_bar is None else None
+
+	for i, (dt, row) in enumerate(_iter_bars(data, start), start):
+		if on_bar is not None:
+			orders = on_bar(dt, row)
+		else:
+			orders = decide(dt, history(i, dt))
+		prices = close[i:i + 1]
+		if orders:
+			apply_orders(orders, prices, bar=i)
+		position_value = pm.positions[0] * prices[0]
+		curve_buf.append(i, pm.cash + position_value, pm.cash, position_value)
+		if checkpoint is not None and i + 1 < len(data) and checkpoint.due(i + 1):
+			_save_checkpoint(checkpoint, i + 1, data, strategy, 'compact', {
+				'cash': pm.cash, 'positions': pm.positions, 'curve': curve_buf.data, 'fills': pm.fills.data,
+			})
+
+	if checkpoint is not None:
+		checkpoint.clear()
+	profiling.count('portfolio.bars', len(data))
+	profiling.count('portfolio.fills', len(pm.fills))
+	return _curve_from_buffer(curve_buf, data.index), pm.fills_frame(data.index)
+
+
+def run_backtest(strategy, data: pd.DataFrame, commission: float, slippage: float, initial_cash: float = 1_000_000.0,
+				 compact: bool = False, checkpoint: Checkpointer | None = None, decide: bool = False):
+	"""Replay `data` bar by bar through `strategy` and the portfolio.
+
+	Strategies implementing `on_bar(date, bar)` are pushed one bar at a time
+	and keep their own rolling state; otherwise `decide(date, history)` is
+	called with the history up to the current bar. Strategies declaring a
+	`lookback` (see `strategy_lookback`) get only that many trailing bars,
+	so each call costs O(lookback) instead of O(t). Strategies setting
+	`history_view = True` receive a reused read-only `HistoryView` instead
+	of a DataFrame slice. Bars reach `on_bar` as a row Series under the
+	pandas compute backend and as a dict of column values under numpy/numba.
+
+	compact: use `ArrayPortfolioManager` and preallocated record buffers
+	instead of per-bar dicts/tuples (same output, less allocation).
+	checkpoint: periodically save the portfolio, the partial curve/fills and
+	the strategy state through this `Checkpointer`, and continue from its
+	file when one matching this run exists; the file is removed on success.
+	decide: call `decide(date, history)` even when the strategy implements
+	`on_bar`, so its `lookback` and `history_view` apply (same orders for the
+	built-in strategies, which implement both).
+	"""
+	if compact:
+		with profiling.phase('portfolio.run_backtest'):
+			return _run_backtest_compact(strategy, data, commission, slippage, initial_cash, checkpoint, decide)
+
+	with profiling.phase('portfolio.run_backtest'):
+		return _run_backtest_loop(strategy, data, commission, slippage, initial_cash, checkpoint, decide)
+
+
+def _run_backtest_loop(strategy, data: pd.DataFrame, commission: float, slippage: float, initial_cash: float,
+					   checkpoint: Checkpointer | None = None, decide: bool = False):
 	pm = PortfolioManager(cash=initial_cash, commission=commission, slippage=slippage)
 	records = []
 	fills_records = []
+	start = 0
+	saved = _load_checkpoint(checkpoint, data, strategy, 'loop')
+	if saved is not None:
+		start, state = saved['bar'], saved['portfolio']
+		pm.state.cash = state['cash']
+		pm.state.positions = dict(state['positions'])
+		records.extend(state['records'])
+		fills_records.extend(state['fills'])
+	on_bar = None if decide else getattr(strategy, 'on_bar', None)
+	# per-call timers when profiling is on; the plain callables otherwise
+	if on_bar is not None:
+		on_bar = profiling.instrument('strategy.on_bar', on_bar)
+	else:
+		decide = profiling.instrument('strategy.decide', strategy.decide)
+	apply_orders = profiling.instrument('portfolio.apply_orders', pm.apply_orders)
+	history = _history_source(strategy, data) if on_bar is None else None
 
-	for dt, row in data.iterrows():
-		# build history up to current bar (inclusive)
-		history = data.loc[:dt]
-		orders = strategy.decide(dt, history)
+	for i, (dt, row) in enumerate(_iter_bars(data, start), start):
+		if on_bar is not None:
+			orders = on_bar(dt, row)
+		else:
+			# history up to current bar (inclusive), trimmed to the declared lookback
+			orders = decide(dt, history(i, dt))
 		prices = {strategy.symbol: row['Close']}
-		fills = pm.apply_orders(orders, prices)
+		fills = apply_orders(orders, prices)
 		# record fills with timestamp
 		for f in fills:
 			fills_records.append({"date": dt, **f})
@@ -91,11 +416,85 @@ def run_backtest(strategy, data: pd.DataFrame, commission: float, slippage: floa
 		position_value = pos_qty * px
 		equity = pm.state.cash + position_value
 		records.append((dt, equity, pm.state.cash, position_value))
+		if checkpoint is not None and i + 1 < len(data) and checkpoint.due(i + 1):
+			_save_checkpoint(checkpoint, i + 1, data, strategy, 'loop', {
+				'cash': pm.state.cash, 'positions': pm.state.positions, 'records': records, 'fills': fills_records,
+			})
 
-	curve_df = pd.DataFrame(records, columns=['date', 'equity', 'cash', 'position_value']).set_index('date')
-	# stock part return: pct change of position_value; when previous value is 0, define 0
-	curve_df['stock_return_pct'] = curve_df['position_value'].pct_change().fillna(0.0).replace([pd.NA, pd.NaT], 0.0)
+	if checkpoint is not None:
+		checkpoint.clear()
+	profiling.count('portfolio.bars', len(data))
+	profiling.count('portfolio.fills', len(fills_records))
+	return _build_curve(records), pd.DataFrame(fills_records)
+
+
+def _strategy_order_array(strategy, data: pd.DataFrame) -> np.ndarray:
+	"""Collect per-bar order quantities from a vectorized strategy.
+
+	A strategy either emits orders directly via `order_array(data)` or target
+	positions via `target_positions(data)`; targets are differenced into orders.
+	"""
+	if hasattr(strategy, 'order_array'):
+		orders = np.asarray(strategy.order_array(data), dtype=float)
+	elif hasattr(strategy, 'target_positions'):
+		targets = np.nan_to_num(np.asarray(strategy.target_positions(data), dtype=float))
+		orders = np.diff(targets, prepend=0.0)
+	else:
+		raise TypeError(f"{type(strategy).__name__} does not support vectorized mode (needs order_array or target_positions)")
+	if orders.shape != (len(data),):
+		raise ValueError(f"Order array length {orders.shape} does not match data length {len(data)}")
+	return np.nan_to_num(orders).astype(np.int64)
+
+
+def run_backtest_vectorized(strategy, data: pd.DataFrame, commission: float, slippage: float, initial_cash: float = 1_000_000.0):
+	"""Vectorized counterpart of `run_backtest`.
+
+	The strategy emits its orders for the whole frame at once; fills, fees,
+	cash and equity are then computed with cumulative array operations. Fill
+	rules match `PortfolioManager.apply_orders`, so the returned curve/trades
+	are the same as the loop engine's.
+	"""
+	with profiling.phase('strategy.order_array'):
+		orders = _strategy_order_array(strategy, data)
+	with profiling.phase('portfolio.vectorized_accounting'):
+		curve_df, trades_df = _vectorized_accounting(strategy, data, orders, commission, slippage, initial_cash)
+	profiling.count('portfolio.bars', len(data))
+	profiling.count('portfolio.fills', len(trades_df))
+	return curve_df, trades_df
+
+
+def _vectorized_accounting(strategy, data: pd.DataFrame, orders: np.ndarray, commission: float, slippage: float,
+						   initial_cash: float):
+	close = data['Close'].to_numpy(dtype=float)
+
+	fill_px = np.where(orders > 0, close * (1 + slippage), close * (1 - slippage))
+	cost = np.where(orders != 0, fill_px * orders, 0.0)
+	fee = np.abs(cost) * commission
+	# running sum seeded with the starting cash: cash_t = cash_{t-1} - (cost + fee), in the
+	# same order and rounding as the loop engine's per-fill `cash -= cost + fee`
+	cash = np.cumsum(np.concatenate(([initial_cash], -(cost + fee))))[1:]
+	positions = np.cumsum(orders)
+	position_value = positions * close
+	equity = cash + position_value
+
+	records = list(zip(data.index, equity, cash, position_value))
+	curve_df = _build_curve(records)
+
+	idx = np.flatnonzero(orders)
+	fills_records = [
+		{
+			"date": data.index[i],
+			"symbol": strategy.symbol,
+			"qty": int(orders[i]),
+			"price": float(fill_px[i]),
+			"fee": float(fee[i]),
+			"side": "BUY" if orders[i] > 0 else "SELL",
+		}
+		for i in idx
+	]
+	logger.info("Vectorized backtest: bars=%s fills=%s final_cash=%.2f", len(data), len(idx), cash[-1] if len(cash) else initial_cash)
 	return curve_df, pd.DataFrame(fills_records)
 
 
-__all__ = ["PortfolioManager", "run_backtest"]
+__all__ = ["PortfolioManager", "ArrayPortfolioManager", "RecordBuffer", "run_backtest", "run_backtest_vectorized",
+		   "strategy_lookback"]
@@ -0,0 +1,170 @@
+"""Multi-symbol panel backtesting over an aligned price matrix.
+
+Responsibilities:
+- Align per-symbol OHLCV frames once onto a shared date index (dates x symbols)
+- Replay the panel through a multi-symbol strategy against one ArrayPortfolioManager
+- Value positions with vector operations across symbols
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.portfolio.manager import CURVE_DTYPE, ArrayPortfolioManager, RecordBuffer, _curve_from_buffer
+from src.system.log import get_logger
+from src.system import profiling
+
+logger = get_logger(__name__)
+
+PANEL_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+@dataclass
+class PricePanel:
+	"""OHLCV fields as 2-D float arrays of shape (len(dates), len(symbols))."""
+
+	dates: pd.DatetimeIndex
+	symbols: List[str]
+	fields: Dict[str, np.ndarray] = field(default_factory=dict)
+
+	def __getitem__(self, name: str) -> np.ndarray:
+		return self.fields[name]
+
+	@property
+	def shape(self) -> tuple:
+		return (len(self.dates), len(self.symbols))
+
+	def column(self, symbol: str) -> int:
+		return self.symbols.index(symbol)
+
+	def mark_prices(self) -> np.ndarray:
+		"""Close forward-filled per symbol for valuation; 0 before the first quote."""
+		close = pd.DataFrame(self.fields["Close"]).ffill().to_numpy()
+		return np.nan_to_num(close, nan=0.0)
+
+
+def _field_column(df: pd.DataFrame, name: str) -> str | None:
+	lower_cols = {str(c).lower(): c for c in df.columns}
+	return lower_cols.get(name.lower())
+
+
+def align_panel(frames: Mapping[str, pd.DataFrame], fields: Sequence[str] = PANEL_FIELDS, how: str = "outer") -> PricePanel:
+	"""Align OHLCV frames on one date index and stack them into 2-D arrays.
+
+	how: 'outer' keeps every date seen by any symbol (missing quotes are NaN),
+	'inner' keeps only dates quoted by all symbols.
+	"""
+	if not frames:
+		raise ValueError("align_panel needs at least one frame")
+	symbols = list(frames.keys())
+	indexes = [pd.DatetimeIndex(pd.to_datetime(frames[sym].index)) for sym in symbols]
+	dates = indexes[0]
+	for idx in indexes[1:]:
+		dates = dates.union(idx) if how == "outer" else dates.intersection(idx)
+	dates = dates.sort_values()
+
+	arrays = {name: np.full((len(dates), len(symbols)), np.nan) for name in fields}
+	for j, sym in enumerate(symbols):
+		df = frames[sym]
+		df = df[~df.index.duplicated(keep="last")]
+		df = df.set_axis(pd.DatetimeIndex(pd.to_datetime(df.index))).reindex(dates)
+		for name in fields:
+			col = _field_column(df, name)
+			if col is not None:
+				arrays[name][:, j] = df[col].to_numpy(dtype=float)
+
+	logger.info("Aligned panel: symbols=%s dates=%s how=%s", len(symbols), len(dates), how)
+	return PricePanel(dates=dates, symbols=symbols, fields=arrays)
+
+
+def _order_vector(orders, panel: PricePanel) -> np.ndarray:
+	"""Normalize a strategy's orders (vector or symbol->qty dict) to an int vector."""
+	if isinstance(orders, Mapping):
+		vec = np.zeros(len(panel.symbols), dtype=np.int64)
+		for sym, qty in orders.items():
+			vec[panel.column(sym)] += int(qty)
+		return vec
+	vec = np.asarray(orders)
+	if vec.shape != (len(panel.symbols),):
+		raise ValueError(f"Order vector shape {vec.shape} does not match symbols {len(panel.symbols)}")
+	return np.nan_to_num(vec).astype(np.int64)
+
+
+def weight_orders(weights, positions: np.ndarray, prices: np.ndarray, equity: float, lot: int = 1,
+				  cost: float = 0.0) -> np.ndarray:
+	"""Orders moving `positions` to `weights` (fractions of `equity`) at `prices`.
+
+	Target shares are rounded down to whole `lot`s after grossing the price up
+	by `cost` (commission + slippage per unit). Symbols with a NaN weight or
+	no price keep their current position.
+	"""
+	weights = np.asarray(weights, dtype=float)
+	if weights.shape != positions.shape:
+		raise ValueError(f"Weight vector shape {weights.shape} does not match symbols {len(positions)}")
+	prices = np.asarray(prices, dtype=float)
+	with np.errstate(divide="ignore", invalid="ignore"):
+		target = np.floor(weights * equity / (prices * (1 + cost)) / lot) * lot
+	keep = ~np.isfinite(target) | ~(prices > 0)
+	return np.where(keep, 0, target - positions).astype(np.int64)
+
+
+def run_panel_backtest(strategy, frames, commission: float, slippage: float, initial_cash: float = 1_000_000.0):
+	"""Run a multi-symbol strategy over an aligned panel.
+
+	frames: dict symbol -> OHLCV DataFrame, or an already aligned PricePanel.
+	The strategy implements `decide_panel(i, panel)` returning an order vector
+	(one qty per symbol) or a symbol -> qty dict, or `target_weights(i, panel)`
+	returning a weight vector (None = no rebalance) that is turned into orders
+	against the current equity via `weight_orders`, rounded to the strategy's
+	`lot` (default 1). It may implement `prepare(panel)` to precompute
+	indicators once. Orders on bars without a quote for that symbol are
+	dropped. Cash, positions and fills live in an `ArrayPortfolioManager`.
+	"""
+	if isinstance(frames, PricePanel):
+		panel = frames
+	else:
+		with profiling.phase("portfolio.align_panel"):
+			panel = align_panel(frames)
+	pm = ArrayPortfolioManager(panel.symbols, cash=initial_cash, commission=commission, slippage=slippage)
+	close = panel["Close"]
+	mark = panel.mark_prices()
+	curve_buf = RecordBuffer(CURVE_DTYPE, capacity=len(panel.dates))
+
+	prepare = getattr(strategy, "prepare", None)
+	if prepare is not None:
+		with profiling.phase("strategy.prepare"):
+			prepare(panel)
+	target_weights = getattr(strategy, "target_weights", None)
+	if target_weights is not None:
+		target_weights = profiling.instrument("strategy.target_weights", target_weights)
+		lot = int(getattr(strategy, "lot", 1))
+	else:
+		decide_panel = profiling.instrument("strategy.decide_panel", strategy.decide_panel)
+	apply_order_vector = profiling.instrument("portfolio.apply_order_vector", pm.apply_order_vector)
+
+	for i in range(len(panel.dates)):
+		if target_weights is not None:
+			weights = target_weights(i, panel)
+			if weights is None:
+				orders = None
+			else:
+				equity = pm.cash + float(pm.positions @ mark[i])
+				orders = weight_orders(weights, pm.positions, close[i], equity, lot, (1 + commission) * (1 + slippage) - 1)
+		else:
+			orders = _order_vector(decide_panel(i, panel), panel)
+		if orders is not None:
+			apply_order_vector(orders, close[i], bar=i)
+		position_value = float(pm.positions @ mark[i])
+		curve_buf.append(i, pm.cash + position_value, pm.cash, position_value)
+
+	profiling.count("portfolio.bars", len(panel.dates))
+	profiling.count("portfolio.fills", len(pm.fills))
+	logger.info("Panel backtest: symbols=%s bars=%s fills=%s", len(panel.symbols), len(panel.dates), len(pm.fills))
+	return _curve_from_buffer(curve_buf, panel.dates), pm.fills_frame(panel.dates)
+
+
+__all__ = ["PricePanel", "align_panel", "run_panel_backtest", "weight_orders"]
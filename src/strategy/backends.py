@@ -0,0 +1,103 @@
+"""Compute backend selection for `calc_lines` and the backtest bar loop.
+
+Three backends produce the same indicators:
+
+	pandas  the reference: Series.rolling / Series.ewm (default)
+	numpy   vectorized array kernels; rolling mean/std/z-score come from
+	        the pairwise-merged moments behind the `*_MULTI` indicators:
+	        within ~1e-10 relative of exact window sums at any price level,
+	        not bit for bit with pandas, and exactly 0 on flat windows where
+	        pandas' running variance leaves rounding noise
+	numba   the pandas rolling/ewm algorithms as compiled loops
+	        (`loop_kernels`); bit-identical to pandas. Optional: without
+	        numba installed selecting it falls back to numpy with a warning
+
+The backend is process-wide (`set_backend`) or scoped to a block:
+
+	with use_backend("numpy"):
+		run_backtest(...)
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Tuple
+
+from src.system.log import get_logger
+
+logger = get_logger(__name__)
+
+try:
+	import numba
+	HAVE_NUMBA = True
+except ImportError:  # optional dependency
+	numba = None
+	HAVE_NUMBA = False
+
+BACKENDS = ("pandas", "numpy", "numba")
+DEFAULT_BACKEND = "pandas"
+
+_BACKEND = DEFAULT_BACKEND
+_LOCK = threading.Lock()
+
+
+def jit(fn: Callable) -> Callable:
+	"""`numba.njit(cache=True)` when numba is installed, otherwise `fn` unchanged."""
+	if HAVE_NUMBA:
+		return numba.njit(cache=True)(fn)
+	return fn
+
+
+def available_backends() -> Tuple[str, ...]:
+	return BACKENDS if HAVE_NUMBA else tuple(b for b in BACKENDS if b != "numba")
+
+
+def resolve_backend(name: str | None) -> str:
+	"""Validate a backend name (None -> default); numba without numba -> numpy."""
+	if name is None:
+		return DEFAULT_BACKEND
+	name = str(name).lower()
+	if name not in BACKENDS:
+		raise ValueError(f"Unknown compute backend {name!r}; expected one of {', '.join(BACKENDS)}")
+	if name == "numba" and not HAVE_NUMBA:
+		logger.warning("numba is not installed; using the numpy backend")
+		return "numpy"
+	return name
+
+
+def get_backend() -> str:
+	return _BACKEND
+
+
+def set_backend(name: str | None) -> str:
+	"""Select the process-wide backend and return the one actually in use."""
+	global _BACKEND
+	resolved = resolve_backend(name)
+	with _LOCK:
+		_BACKEND = resolved
+	return resolved
+
+
+@contextmanager
+def use_backend(name: str | None):
+	"""Select a backend for the block, then restore the previous one."""
+	previous = get_backend()
+	resolved = set_backend(name)
+	try:
+		yield resolved
+	finally:
+		set_backend(previous)
+
+
+__all__ = [
+	"BACKENDS",
+	"DEFAULT_BACKEND",
+	"HAVE_NUMBA",
+	"available_backends",
+	"get_backend",
+	"jit",
+	"resolve_backend",
+	"set_backend",
+	"use_backend",
+]
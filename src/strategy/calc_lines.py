@@ -1,15 +1,28 @@
 """Core time-series helper functions for strategy building.
 
-All functions operate on pandas Series/DataFrame and stay ASCII-only.
+All functions operate on pandas Series/DataFrame and stay ASCII-only; the
+rolling/EWM indicators also take plain float arrays and run on the compute
+backend selected in `backends` (pandas by default).
+Indicators decorated with `cached_indicator` are memoized while an
+indicator cache is enabled (see `indicator_cache`); derived indicators call
+the cached primitives so their intermediates are shared.
 """
 
 from __future__ import annotations
 
-from typing import Iterable, Optional
+import functools
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
 
 import numpy as np
 import pandas as pd
 
+from . import loop_kernels
+from .backends import HAVE_NUMBA, get_backend
+from .extrema import rolling_max, rolling_min
+from .indicator_cache import cached_indicator
+
 SeriesLike = pd.Series
 
 
@@ -22,6 +35,13 @@ def _pick_col(df: pd.DataFrame, candidates: Iterable[str]) -> pd.Series:
 	raise KeyError(f"No column found among candidates: {list(candidates)}")
 
 
+def _like(series: SeriesLike, values: np.ndarray) -> SeriesLike:
+	"""Wrap a kernel result with the labels of the Series/DataFrame it came from."""
+	if isinstance(series, pd.DataFrame):
+		return pd.DataFrame(values, index=series.index, columns=series.columns, copy=False)
+	return pd.Series(values, index=series.index, name=series.name, copy=False)
+
+
 def CLOSE(df: pd.DataFrame) -> SeriesLike:
 	return _pick_col(df, ["close", "adj close", "adj_close", "price"])
 
@@ -42,40 +62,256 @@ def VOLUME(df: pd.DataFrame) -> SeriesLike:
 	return _pick_col(df, ["volume", "vol"])
 
 
+# --- compute backends -------------------------------------------------------
+#
+# Indicators below run on the backend selected in `backends`. Under "pandas"
+# the function body runs as written. Under "numpy"/"numba" the registered
+# array kernel runs instead on float64 arrays (DataFrame columns one at a
+# time) and the result gets the input's labels back. Plain ndarray inputs
+# are accepted on every backend and give ndarrays back (a dict of arrays
+# for MACD/BOLL).
+
+
+@dataclass(frozen=True)
+class _ArrayOps:
+	"""Rolling mean/std/z-score and adjust=False EWM (by centre of mass) on 1-D float64 arrays."""
+	mean: Callable[[np.ndarray, int], np.ndarray]
+	std: Callable[[np.ndarray, int], np.ndarray]
+	zscore: Callable[[np.ndarray, int], np.ndarray]
+	ewm: Callable[[np.ndarray, float], np.ndarray]
+
+
+def _numpy_mean(x: np.ndarray, window: int) -> np.ndarray:
+	return _moment_columns(x, [window], std=False)[0][:, 0]
+
+
+def _numpy_std(x: np.ndarray, window: int) -> np.ndarray:
+	return _moment_columns(x, [window], mean=False)[1][:, 0]
+
+
+def _numpy_zscore(x: np.ndarray, window: int) -> np.ndarray:
+	return _moment_columns(x, [window], mean=False, zscore=True)[0][:, 0]
+
+
+def _loop_zscore(x: np.ndarray, window: int) -> np.ndarray:
+	return _zscore(x, MA(x, window), STD(x, window))
+
+
+def _numpy_ewm(x: np.ndarray, com: float) -> np.ndarray:
+	# the recursion has no vectorized form: compiled loop if available, else pandas' own kernel
+	if HAVE_NUMBA:
+		return loop_kernels.ewm_mean(x, com)
+	return pd.Series(x, copy=False).ewm(com=com, adjust=False).mean().to_numpy()
+
+
+_OPS = {
+	"numpy": _ArrayOps(_numpy_mean, _numpy_std, _numpy_zscore, _numpy_ewm),
+	"numba": _ArrayOps(loop_kernels.rolling_mean, loop_kernels.rolling_std, _loop_zscore, loop_kernels.ewm_mean),
+}
+
+
+def _numeric(obj: Any) -> bool:
+	dtypes = obj.dtypes if isinstance(obj, pd.DataFrame) else [obj.dtype]
+	return all(isinstance(d, np.dtype) and d.kind in "iuf" for d in dtypes)
+
+
+def _to_pandas(obj: Any) -> Any:
+	if isinstance(obj, np.ndarray):
+		return pd.Series(obj) if obj.ndim == 1 else pd.DataFrame(obj)
+	return obj
+
+
+def _from_pandas(result: Any, multi: bool) -> Any:
+	if multi:
+		return {str(c): result[c].to_numpy() for c in result.columns}
+	return result.to_numpy()
+
+
+def _backend_kernel(kernel: Callable, inputs: int = 1, multi: bool = False) -> Callable:
+	"""Run the decorated indicator through `kernel(ops, *arrays, *params)` off the pandas backend.
+
+	inputs: how many leading arguments are series. multi: the kernel returns
+	a dict of columns (a DataFrame for pandas inputs). Multi-input or
+	multi-output indicators on 2-D inputs, and non-numeric inputs, always
+	take the pandas path.
+	"""
+	def decorate(fn: Callable) -> Callable:
+		sig = inspect.signature(fn)
+
+		@functools.wraps(fn)
+		def wrapper(*args, **kwargs):
+			bound = sig.bind(*args, **kwargs)
+			bound.apply_defaults()
+			arguments = list(bound.arguments.values())
+			series, params = arguments[:inputs], arguments[inputs:]
+			template = series[0]
+			raw = isinstance(template, np.ndarray)
+			backend = get_backend()
+			two_d = np.ndim(template) == 2
+			if backend == "pandas" or not all(_numeric(s) for s in series) or (two_d and (multi or inputs > 1)):
+				if not raw:
+					return fn(*args, **kwargs)
+				return _from_pandas(fn(*[_to_pandas(s) for s in series], *params), multi)
+
+			ops = _OPS[backend]
+			arrays = [s.to_numpy(dtype=np.float64) if not isinstance(s, np.ndarray) else s.astype(np.float64, copy=False)
+					  for s in series]
+			if two_d:
+				x = arrays[0]
+				values = np.empty(x.shape)
+				for j in range(x.shape[1]):
+					values[:, j] = kernel(ops, np.ascontiguousarray(x[:, j]), *params)
+			else:
+				values = kernel(ops, *arrays, *params)
+			if raw:
+				return values
+			if multi:
+				return pd.DataFrame(values, index=template.index)
+			out = _like(template, values)
+			if inputs > 1:
+				# pandas arithmetic across differently named inputs drops the name
+				out.name = None
+			return out
+
+		return wrapper
+
+	return decorate
+
+
+def _shift(x: np.ndarray, n: int) -> np.ndarray:
+	out = np.full(x.shape, np.nan)
+	if n >= 0:
+		if n < len(x):
+			out[n:] = x[:len(x) - n]
+	elif -n < len(x):
+		out[:n] = x[-n:]
+	return out
+
+
+def _span_com(window: float) -> float:
+	# same conversion as pandas ewm(span=...)
+	return (window - 1) / 2
+
+
+def _alpha_com(alpha: float) -> float:
+	# same conversion as pandas ewm(alpha=...)
+	return (1 - alpha) / alpha
+
+
+def _lag_kernel(ops: _ArrayOps, x: np.ndarray, n: int) -> np.ndarray:
+	return _shift(x, n)
+
+
+def _diff_kernel(ops: _ArrayOps, x: np.ndarray, n: int) -> np.ndarray:
+	return x - _shift(x, n)
+
+
+def _rolling_max_kernel(ops: _ArrayOps, x: np.ndarray, window: int) -> np.ndarray:
+	return rolling_max(x, window)
+
+
+def _rolling_min_kernel(ops: _ArrayOps, x: np.ndarray, window: int) -> np.ndarray:
+	return rolling_min(x, window)
+
+
+def _std_kernel(ops: _ArrayOps, x: np.ndarray, window: int) -> np.ndarray:
+	return ops.std(x, window)
+
+
+def _zscore(x: np.ndarray, mean: np.ndarray, dev: np.ndarray) -> np.ndarray:
+	with np.errstate(invalid="ignore", divide="ignore"):
+		return (x - mean) / np.where(dev == 0, np.nan, dev)
+
+
+def _zscore_kernel(ops: _ArrayOps, x: np.ndarray, window: int) -> np.ndarray:
+	return ops.zscore(x, window)
+
+
+def _ma_kernel(ops: _ArrayOps, x: np.ndarray, window: int) -> np.ndarray:
+	return ops.mean(x, window)
+
+
+def _ema_kernel(ops: _ArrayOps, x: np.ndarray, window: int) -> np.ndarray:
+	return ops.ewm(x, _span_com(window))
+
+
+def _rsi_kernel(ops: _ArrayOps, x: np.ndarray, window: int) -> np.ndarray:
+	delta = x - _shift(x, 1)
+	com = _alpha_com(1 / window)
+	gain = ops.ewm(np.maximum(delta, 0.0), com)
+	loss = -ops.ewm(np.minimum(delta, 0.0), com)
+	with np.errstate(invalid="ignore", divide="ignore"):
+		rs = gain / np.where(loss == 0, np.nan, loss)
+		return 100 - (100 / (1 + rs))
+
+
+def _macd_kernel(ops: _ArrayOps, x: np.ndarray, fast: int, slow: int, signal: int) -> dict:
+	macd = EMA(x, fast) - EMA(x, slow)
+	signal_line = EMA(macd, signal)
+	return {"macd": macd, "signal": signal_line, "hist": macd - signal_line}
+
+
+def _boll_kernel(ops: _ArrayOps, x: np.ndarray, window: int, k: float) -> dict:
+	mid = MA(x, window)
+	dev = STD(x, window)
+	return {"mid": mid, "upper": mid + k * dev, "lower": mid - k * dev}
+
+
+def _atr_kernel(ops: _ArrayOps, high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+	prev_close = _shift(close, 1)
+	# fmax skips NaN like DataFrame.max(axis=1)
+	tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+	return MA(tr, window)
+
+
+@_backend_kernel(_lag_kernel)
 def LAG(series: SeriesLike, n: int = 1) -> SeriesLike:
 	return series.shift(n)
 
 
+@_backend_kernel(_diff_kernel)
 def DIFF(series: SeriesLike, n: int = 1) -> SeriesLike:
 	return series.diff(n)
 
 
+@cached_indicator
+@_backend_kernel(_rolling_max_kernel)
 def ROLLING_MAX(series: SeriesLike, window: int) -> SeriesLike:
-	return series.rolling(window, min_periods=1).max()
+	return _like(series, rolling_max(series.to_numpy(dtype=np.float64), window))
 
 
+@cached_indicator
+@_backend_kernel(_rolling_min_kernel)
 def ROLLING_MIN(series: SeriesLike, window: int) -> SeriesLike:
-	return series.rolling(window, min_periods=1).min()
+	return _like(series, rolling_min(series.to_numpy(dtype=np.float64), window))
 
 
+@cached_indicator
+@_backend_kernel(_std_kernel)
 def STD(series: SeriesLike, window: int) -> SeriesLike:
 	return series.rolling(window, min_periods=1).std()
 
 
+@cached_indicator
+@_backend_kernel(_zscore_kernel)
 def ZSCORE(series: SeriesLike, window: int) -> SeriesLike:
-	rolling_mean = series.rolling(window, min_periods=1).mean()
-	rolling_std = series.rolling(window, min_periods=1).std()
-	return (series - rolling_mean) / rolling_std.replace(0, np.nan)
+	return (series - MA(series, window)) / STD(series, window).replace(0, np.nan)
 
 
+@cached_indicator
+@_backend_kernel(_ma_kernel)
 def MA(series: SeriesLike, window: int) -> SeriesLike:
 	return series.rolling(window, min_periods=1).mean()
 
 
+@cached_indicator
+@_backend_kernel(_ema_kernel)
 def EMA(series: SeriesLike, window: int) -> SeriesLike:
 	return series.ewm(span=window, adjust=False).mean()
 
 
+@cached_indicator
+@_backend_kernel(_rsi_kernel)
 def RSI(series: SeriesLike, window: int = 14) -> SeriesLike:
 	delta = series.diff()
 	gain = delta.clip(lower=0).ewm(alpha=1 / window, adjust=False).mean()
@@ -84,6 +320,8 @@ def RSI(series: SeriesLike, window: int = 14) -> SeriesLike:
 	return 100 - (100 / (1 + rs))
 
 
+@cached_indicator
+@_backend_kernel(_macd_kernel, multi=True)
 def MACD(series: SeriesLike, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
 	fast_ema = EMA(series, fast)
 	slow_ema = EMA(series, slow)
@@ -93,6 +331,8 @@ def MACD(series: SeriesLike, fast: int = 12, slow: int = 26, signal: int = 9) ->
 	return pd.DataFrame({"macd": macd, "signal": signal_line, "hist": hist})
 
 
+@cached_indicator
+@_backend_kernel(_boll_kernel, multi=True)
 def BOLL(series: SeriesLike, window: int = 20, k: float = 2.0) -> pd.DataFrame:
 	mid = MA(series, window)
 	dev = STD(series, window)
@@ -101,6 +341,218 @@ def BOLL(series: SeriesLike, window: int = 20, k: float = 2.0) -> pd.DataFrame:
 	return pd.DataFrame({"mid": mid, "upper": upper, "lower": lower})
 
 
+def _check_windows(windows: Iterable[int]) -> list:
+	windows = [int(w) for w in windows]
+	if not windows:
+		raise ValueError("windows must not be empty")
+	if min(windows) < 1:
+		raise ValueError(f"windows must be >= 1: {windows}")
+	return windows
+
+
+def _part(a: np.ndarray | None, sl: slice) -> np.ndarray | None:
+	return None if a is None else a[sl]
+
+
+def _merge_moments(count, mean: np.ndarray, m2: np.ndarray | None, e_count, e_mean: np.ndarray, e_m2: np.ndarray | None):
+	"""Fold the moments of earlier, disjoint bars (`e_*`) into (mean, m2) in place; returns the merged count.
+
+	Chan et al.'s pairwise update: the sums of squared deviations only ever
+	add non-negative terms, so nothing cancels however large the values are
+	compared with their spread. Counts may be arrays or scalars; empty parts
+	have count 0 and mean 0.
+	"""
+	total = count + e_count
+	if np.ndim(total):
+		share = np.divide(e_count, total, out=np.zeros(np.shape(total)), where=total > 0)
+	else:
+		share = e_count / total if total else 0.0
+	delta = e_mean - mean
+	if m2 is not None:
+		m2 += e_m2
+		weight = count * share
+		m2 += delta * delta * weight
+	delta *= share
+	mean += delta
+	return total
+
+
+class _RollingMoments:
+	"""Trailing-window count, mean and sum of squared deviations behind the
+	numpy backend's `MA`/`STD`/`ZSCORE` and the `*_MULTI` indicators.
+
+	Level k of a doubling table holds the moments of the 2**k bars ending at
+	each bar, built by merging two level k - 1 entries (`_merge_moments`); a
+	window of w bars is then merged from the levels of the bits of w. Values
+	are taken relative to the first observation, so precision follows each
+	window's own spread rather than the price level: a series around 1e9
+	moving in cents keeps its deviations to float rounding, and a window of
+	equal values has exactly zero deviation. The table is built once for the
+	largest window and shared by all of them. NaNs are skipped as pandas
+	does (`min_periods=1`); without any, counts are known and stay scalars.
+	"""
+
+	def __init__(self, series: SeriesLike, windows: list, squares: bool) -> None:
+		if isinstance(series, pd.Series):
+			x = series.to_numpy(dtype=np.float64)
+		else:
+			# 1-D arrays come from the numpy compute backend
+			x = np.asarray(series, dtype=np.float64)
+			if x.ndim != 1:
+				raise TypeError("multi-window kernels take a single Series or 1-D array, not a DataFrame or 2-D array")
+		self.n = n = len(x)
+		valid = ~np.isnan(x)
+		self.has_nan = not valid.all()
+		self.anchor = x[valid][0] if valid.any() else 0.0
+		# x relative to the anchor, the unit window means are measured in (NaN kept)
+		self.y = x - self.anchor
+		count = valid.astype(np.float64) if self.has_nan else None
+		self._levels = [(count, np.where(valid, self.y, 0.0) if self.has_nan else self.y, np.zeros(n) if squares else None)]
+		top = max(min(w, n) for w in windows).bit_length() - 1 if n else 0
+		for k in range(top):
+			level = tuple(None if a is None else a.copy() for a in self._levels[-1])
+			self._merge_back(level, self._levels[-1], 1 << k, 1 << k)
+			self._levels.append(level)
+
+	def _merge_back(self, acc: tuple, level: tuple, shift: int, span: int) -> None:
+		"""Merge the `span`-bar moments of `level`, taken `shift` bars back, into
+		`acc` (the moments of the last `shift` bars) in place."""
+		n = self.n
+		if shift >= n:
+			return
+		count, mean, m2 = acc
+		e_count, e_mean, e_m2 = level
+		cut = n - shift
+		later = slice(shift, None)
+		if self.has_nan:
+			count[later] = _merge_moments(count[later], mean[later], _part(m2, later),
+										  e_count[:cut], e_mean[:cut], _part(e_m2, slice(None, cut)))
+			return
+		# without NaNs both parts hold `shift` and `span` bars once the series is long enough
+		full = min(shift + span - 1, n)
+		if full > shift:
+			# the earlier part is cut short by the start of the series
+			short = slice(shift, full)
+			_merge_moments(shift, mean[short], _part(m2, short), np.arange(1.0, full - shift + 1),
+						   e_mean[:full - shift], _part(e_m2, slice(None, full - shift)))
+		if full < n:
+			rest = slice(full, None)
+			_merge_moments(shift, mean[rest], _part(m2, rest), span,
+						   e_mean[full - shift:cut], _part(e_m2, slice(full - shift, cut)))
+
+	def moments(self, window: int, mean: np.ndarray, m2: np.ndarray | None) -> np.ndarray | None:
+		"""Fill `mean` (relative to `anchor`) and `m2` (sum of squared deviations)
+		for every trailing `window`-bar window; returns the counts, or None
+		without NaNs (then min(i + 1, window))."""
+		w = min(window, self.n)
+		acc = None
+		offset = 0
+		for k, level in enumerate(self._levels):
+			if not w >> k & 1:
+				continue
+			if acc is None:
+				np.copyto(mean, level[1])
+				if m2 is not None:
+					np.copyto(m2, level[2])
+				acc = (None if level[0] is None else level[0].copy(), mean, m2)
+			else:
+				self._merge_back(acc, level, offset, 1 << k)
+			offset += 1 << k
+		return acc[0]
+
+
+def _moment_columns(series: SeriesLike, windows: list, mean: bool = True, std: bool = True, zscore: bool = False):
+	"""Rolling mean and/or standard deviation columns (n x len(windows)) from one shared table.
+
+	zscore: the first result holds `(x - mean) / std` instead of the mean,
+	both relative to the anchor so the price level cancels exactly.
+	"""
+	moments = _RollingMoments(series, windows, squares=std or zscore)
+	n = moments.n
+	# column-major so each window's column is contiguous and the frame wraps it without a copy
+	means = np.empty((n, len(windows)), order="F") if mean or zscore else None
+	stds = np.empty((n, len(windows)), order="F") if std else None
+	if not n:
+		return means, stds
+	local = np.empty(n) if means is None or zscore else None
+	dev = np.empty(n) if (std or zscore) and stds is None else None
+	with np.errstate(invalid="ignore", divide="ignore"):
+		for k, w in enumerate(windows):
+			w = min(w, n)
+			mean_col = local if local is not None else means[:, k]
+			dev_col = None if not (std or zscore) else (dev if dev is not None else stds[:, k])
+			count = moments.moments(w, mean_col, dev_col)
+			if dev_col is not None:
+				# sample deviation; fewer than two observations have none
+				if count is None:
+					dev_col[:w] /= np.arange(float(w))
+					dev_col[w:] /= w - 1
+					dev_col[0] = np.nan
+				else:
+					dev_col /= count - 1
+					dev_col[count < 2] = np.nan
+				np.sqrt(dev_col, out=dev_col)
+			if zscore:
+				col = means[:, k]
+				np.subtract(moments.y, mean_col, out=col)
+				dev_col[dev_col == 0] = np.nan
+				col /= dev_col
+			elif means is not None:
+				mean_col += moments.anchor
+				if count is not None:
+					mean_col[count == 0] = np.nan
+	return means, stds
+
+
+def _multi_frame(series: SeriesLike, windows: list, values: np.ndarray) -> pd.DataFrame | np.ndarray:
+	"""One column per window; a 1-D array input gets the (n, len(windows)) array back."""
+	if not isinstance(series, pd.Series):
+		return values
+	return pd.DataFrame(values, index=series.index, columns=pd.Index(windows, name="window"), copy=False)
+
+
+def MA_MULTI(series: SeriesLike, windows: Iterable[int]) -> pd.DataFrame:
+	"""`MA` for several windows from one shared pass: one column per window.
+
+	Takes a Series or a 1-D array (then returns an (n, len(windows)) array),
+	as do the other `*_MULTI` indicators.
+	"""
+	windows = _check_windows(windows)
+	return _multi_frame(series, windows, _moment_columns(series, windows, std=False)[0])
+
+
+def STD_MULTI(series: SeriesLike, windows: Iterable[int]) -> pd.DataFrame:
+	"""`STD` for several windows from one shared pass: one column per window."""
+	windows = _check_windows(windows)
+	return _multi_frame(series, windows, _moment_columns(series, windows, mean=False)[1])
+
+
+def ZSCORE_MULTI(series: SeriesLike, windows: Iterable[int]) -> pd.DataFrame:
+	"""`ZSCORE` for several windows from one shared pass: one column per window."""
+	windows = _check_windows(windows)
+	return _multi_frame(series, windows, _moment_columns(series, windows, mean=False, zscore=True)[0])
+
+
+def BOLL_MULTI(series: SeriesLike, windows: Iterable[int], k: float = 2.0) -> pd.DataFrame:
+	"""`BOLL` for several windows from one shared pass: columns (window, mid/upper/lower).
+
+	A 1-D array input returns the values as an array in the same column order.
+	"""
+	windows = _check_windows(windows)
+	mid, dev = _moment_columns(series, windows)
+	dev *= k
+	columns = pd.MultiIndex.from_product([windows, ["mid", "upper", "lower"]], names=["window", None])
+	values = np.empty((len(mid), len(columns)), order="F")
+	values[:, 0::3] = mid
+	np.add(mid, dev, out=values[:, 1::3])
+	np.subtract(mid, dev, out=values[:, 2::3])
+	if not isinstance(series, pd.Series):
+		return values
+	return pd.DataFrame(values, index=series.index, columns=columns, copy=False)
+
+
+@cached_indicator
+@_backend_kernel(_atr_kernel, inputs=3)
 def ATR(high: SeriesLike, low: SeriesLike, close: SeriesLike, window: int = 14) -> SeriesLike:
 	prev_close = close.shift(1)
 	tr = pd.concat([
@@ -155,6 +607,10 @@ __all__ = [
 	"MACD",
 	"BOLL",
 	"ATR",
+	"MA_MULTI",
+	"STD_MULTI",
+	"ZSCORE_MULTI",
+	"BOLL_MULTI",
 	"RESAMPLE_OHLC",
 	"RESAMPLE",
 ]
@@ -0,0 +1,121 @@
+"""Cross-sectional strategies that rank a whole symbol universe.
+
+A strategy scores every symbol on a dates x symbols matrix built from
+`calc_lines` indicators, then on each rebalance date holds the `top_n`
+best-scoring symbols with equal weights. Ranking is done for all rebalance
+dates at once with `numpy.argpartition`; the weights go to
+`run_panel_backtest` through `target_weights(i, panel)`, which sizes the
+orders against current equity in board lots.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.strategy.calc_lines import LAG, ZSCORE
+from src.system.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def top_n_mask(scores, n: int) -> np.ndarray:
+    """Boolean mask of the `n` highest finite scores in each row.
+
+    Rows with fewer than `n` finite scores select only those; ties at the
+    cut-off are broken arbitrarily.
+    """
+    scores = np.asarray(scores, dtype=float)
+    mask = np.zeros(scores.shape, dtype=bool)
+    n = min(int(n), scores.shape[1])
+    if n <= 0 or scores.shape[0] == 0:
+        return mask
+    key = np.where(np.isfinite(scores), scores, -np.inf)
+    picked = np.argpartition(-key, n - 1, axis=1)[:, :n]
+    np.put_along_axis(mask, picked, np.isfinite(np.take_along_axis(key, picked, axis=1)), axis=1)
+    return mask
+
+
+class CrossSectionalStrategy:
+    """Hold the top-N symbols by `score`, rebalanced every `rebalance` bars.
+
+    Subclasses implement `score(close)` returning a dates x symbols frame
+    (higher is better). Symbols without a quote or a finite score on a
+    rebalance date are not eligible; the selected ones share the equity
+    equally. Rebalancing starts on the first date with any finite score.
+    """
+
+    def __init__(self, symbols: Sequence[str] | None = None, top_n: int = 10, rebalance: int = 20,
+                 lot: int = 100) -> None:
+        if top_n < 1:
+            raise ValueError("top_n must be >= 1")
+        if rebalance < 1:
+            raise ValueError("rebalance must be >= 1")
+        self.symbols = list(symbols) if symbols is not None else None
+        self.top_n = top_n
+        self.rebalance = rebalance
+        self.lot = lot
+        self._weights: Dict[int, np.ndarray] = {}
+
+    def score(self, close: pd.DataFrame) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def prepare(self, panel) -> None:
+        close = pd.DataFrame(panel["Close"], index=panel.dates, columns=panel.symbols)
+        scores = np.array(self.score(close), dtype=float)
+        if scores.shape != panel.shape:
+            raise ValueError(f"score() returned shape {scores.shape}, expected {panel.shape}")
+        scores[np.isnan(panel["Close"])] = np.nan
+        if self.symbols is not None:
+            # restrict the universe to the configured symbols
+            outside = np.ones(len(panel.symbols), dtype=bool)
+            outside[[panel.column(sym) for sym in self.symbols]] = False
+            scores[:, outside] = np.nan
+
+        valid = np.flatnonzero(np.isfinite(scores).any(axis=1))
+        rows = np.arange(valid[0], len(scores), self.rebalance) if len(valid) else np.arange(0)
+        selected = top_n_mask(scores[rows], self.top_n)
+        counts = selected.sum(axis=1, keepdims=True)
+        weights = np.divide(selected, counts, out=np.zeros(selected.shape), where=counts > 0)
+        self._weights = dict(zip(rows.tolist(), weights))
+        logger.info("%s: rebalances=%s universe=%s top_n=%s", type(self).__name__, len(rows),
+                    len(self.symbols) if self.symbols is not None else len(panel.symbols), self.top_n)
+
+    def target_weights(self, i: int, panel) -> np.ndarray | None:
+        """Weights for bar `i` on rebalance dates, None (hold) otherwise."""
+        return self._weights.get(i)
+
+
+class MomentumStrategy(CrossSectionalStrategy):
+    """Buy the top-N by trailing return over `window` bars, skipping the last `skip`."""
+
+    def __init__(self, symbols: Sequence[str] | None = None, window: int = 20, skip: int = 0, top_n: int = 10,
+                 rebalance: int = 20, lot: int = 100) -> None:
+        super().__init__(symbols, top_n=top_n, rebalance=rebalance, lot=lot)
+        self.window = window
+        self.skip = skip
+
+    def score(self, close: pd.DataFrame) -> pd.DataFrame:
+        return LAG(close, self.skip) / LAG(close, self.window + self.skip) - 1
+
+
+class MeanReversionStrategy(CrossSectionalStrategy):
+    """Buy the top-N most oversold symbols by z-score of close over `window` bars."""
+
+    def __init__(self, symbols: Sequence[str] | None = None, window: int = 5, top_n: int = 10,
+                 rebalance: int = 5, lot: int = 100) -> None:
+        super().__init__(symbols, top_n=top_n, rebalance=rebalance, lot=lot)
+        self.window = window
+
+    def score(self, close: pd.DataFrame) -> pd.DataFrame:
+        return -ZSCORE(close, self.window)
+
+
+__all__ = [
+    "CrossSectionalStrategy",
+    "MeanReversionStrategy",
+    "MomentumStrategy",
+    "top_n_mask",
+]
@@ -0,0 +1,613 @@
+"""Strategy expressions compiled into a shared DAG over the `calc_lines` primitives.
+
+An expression such as
+
+	crossabove(MA(CLOSE, short), MA(CLOSE, long))
+
+is parsed with `ast` and hash-consed into an `ExprGraph`: structurally equal
+subexpressions (after applying parameter defaults and ordering operands of
+commutative operators) become one node, so `MA(CLOSE, 20)` is computed once
+no matter how many expressions or strategies compiled into the same graph
+use it. A compiled `Program` runs either as one vectorized pass over a
+frame (`evaluate`, calling the `calc_lines` functions) or one bar at a time
+(`stream`, using the `streaming` indicators); both give the same values.
+
+Supported syntax: the columns CLOSE/OPEN/HIGH/LOW/VOLUME, numbers, names
+bound through `bindings`, the indicators MA, EMA, STD, ZSCORE, RSI, ATR,
+ROLLING_MAX, ROLLING_MIN, LAG, DIFF, MACD(...).macd/.signal/.hist and
+BOLL(...).mid/.upper/.lower, crossabove/crossbelow, + - * /, comparisons,
+and/or/not (also & | ~).
+"""
+
+from __future__ import annotations
+
+import ast
+import inspect
+import math
+import operator
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.strategy import calc_lines
+from src.strategy.streaming import (
+	StreamATR,
+	StreamBOLL,
+	StreamEMA,
+	StreamMA,
+	StreamMACD,
+	StreamRollingMax,
+	StreamRollingMin,
+	StreamRSI,
+	StreamSTD,
+	StreamZSCORE,
+)
+from src.strategy.support import TriggerSet, crossabove, crossabove_value, crossbelow, crossbelow_value
+from src.system.log import get_logger
+
+logger = get_logger(__name__)
+
+NAN = float("nan")
+
+# expression column name -> accepted frame/bar keys (case-insensitive), as in calc_lines
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+	"CLOSE": ("close", "adj close", "adj_close", "price"),
+	"OPEN": ("open",),
+	"HIGH": ("high",),
+	"LOW": ("low",),
+	"VOLUME": ("volume", "vol"),
+}
+
+# indicator -> (number of leading series arguments, streaming factory or None, output fields)
+INDICATORS: Dict[str, Tuple[int, Optional[Callable], Tuple[str, ...]]] = {
+	"MA": (1, StreamMA, ()),
+	"EMA": (1, StreamEMA, ()),
+	"STD": (1, StreamSTD, ()),
+	"ZSCORE": (1, StreamZSCORE, ()),
+	"RSI": (1, StreamRSI, ()),
+	"ROLLING_MAX": (1, StreamRollingMax, ()),
+	"ROLLING_MIN": (1, StreamRollingMin, ()),
+	"LAG": (1, None, ()),
+	"DIFF": (1, None, ()),
+	"ATR": (3, StreamATR, ()),
+	"MACD": (1, StreamMACD, ("macd", "signal", "hist")),
+	"BOLL": (1, StreamBOLL, ("mid", "upper", "lower")),
+}
+
+_BINOPS = {ast.Add: "add", ast.Sub: "sub", ast.Mult: "mul", ast.Div: "div", ast.BitAnd: "and", ast.BitOr: "or"}
+_CMPOPS = {ast.Gt: "gt", ast.Lt: "lt", ast.GtE: "ge", ast.LtE: "le", ast.Eq: "eq", ast.NotEq: "ne"}
+# a < b is stored as b > a so both spellings share a node
+_FLIPPED = {"lt": "gt", "le": "ge"}
+_COMMUTATIVE = {"add", "mul", "and", "or", "eq", "ne"}
+
+
+class ExprError(ValueError):
+	"""Invalid strategy expression."""
+
+
+def _div(a: float, b: float) -> float:
+	try:
+		return a / b
+	except ZeroDivisionError:
+		# IEEE semantics, as pandas gives for Series division
+		if a == 0 or a != a:
+			return NAN
+		return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+def _as_bool(x: Any) -> Any:
+	if isinstance(x, pd.Series):
+		return x if x.dtype == bool else x.astype(bool)
+	return bool(x)
+
+
+# scalar implementations; the vectorized pass uses the same operators on Series
+_SCALAR_OPS: Dict[str, Callable] = {
+	"add": operator.add,
+	"sub": operator.sub,
+	"mul": operator.mul,
+	"div": _div,
+	"gt": operator.gt,
+	"ge": operator.ge,
+	"eq": operator.eq,
+	"ne": operator.ne,
+	"and": lambda a, b: bool(a) and bool(b),
+	"or": lambda a, b: bool(a) or bool(b),
+	"not": lambda a: not bool(a),
+	"neg": operator.neg,
+}
+
+_SERIES_OPS: Dict[str, Callable] = {
+	"add": operator.add,
+	"sub": operator.sub,
+	"mul": operator.mul,
+	"div": operator.truediv,
+	"gt": operator.gt,
+	"ge": operator.ge,
+	"eq": operator.eq,
+	"ne": operator.ne,
+	"and": lambda a, b: _as_bool(a) & _as_bool(b),
+	"or": lambda a, b: _as_bool(a) | _as_bool(b),
+	"not": lambda a: ~_as_bool(a),
+	"neg": operator.neg,
+}
+
+
+class Node:
+	"""One DAG node: `op` over child node ids `args` with constant `params`."""
+
+	__slots__ = ("id", "op", "args", "params")
+
+	def __init__(self, node_id: int, op: str, args: Tuple[int, ...], params: Tuple[Any, ...]) -> None:
+		self.id = node_id
+		self.op = op
+		self.args = args
+		self.params = params
+
+	def __repr__(self) -> str:
+		return f"Node({self.id}, {self.op}, args={self.args}, params={self.params})"
+
+
+class ExprGraph:
+	"""Hash-consed expression DAG; node ids are in topological order."""
+
+	def __init__(self) -> None:
+		self.nodes: List[Node] = []
+		self._index: Dict[Hashable, int] = {}
+
+	def __len__(self) -> int:
+		return len(self.nodes)
+
+	def add(self, op: str, args: Tuple[int, ...] = (), params: Tuple[Any, ...] = ()) -> int:
+		"""Id of the node (op, args, params), creating it on first use."""
+		if op in _COMMUTATIVE:
+			args = tuple(sorted(args))
+		key = (op, args, params)
+		node_id = self._index.get(key)
+		if node_id is None:
+			node_id = len(self.nodes)
+			self.nodes.append(Node(node_id, op, args, params))
+			self._index[key] = node_id
+		return node_id
+
+	def compile(self, source: str, bindings: Mapping[str, Any] | None = None) -> int:
+		"""Parse one expression into the graph and return its root node id."""
+		try:
+			tree = ast.parse(source.strip(), mode="eval")
+		except SyntaxError as exc:
+			raise ExprError(f"Invalid expression {source!r}: {exc.msg}") from exc
+		return _Compiler(self, dict(bindings or {}), source).visit(tree.body)
+
+	def closure(self, roots: Iterable[int]) -> List[int]:
+		"""All node ids needed for `roots`, in evaluation order."""
+		needed = set()
+		stack = list(roots)
+		while stack:
+			node_id = stack.pop()
+			if node_id in needed:
+				continue
+			needed.add(node_id)
+			stack.extend(self.nodes[node_id].args)
+		return sorted(needed)
+
+	def evaluate(self, frame: pd.DataFrame, roots: Iterable[int], aliases: Mapping[str, str] | None = None) -> Dict[int, Any]:
+		"""Vectorized pass: node id -> Series (or constant) for every node under `roots`."""
+		values: Dict[int, Any] = {}
+		for node_id in self.closure(roots):
+			node = self.nodes[node_id]
+			args = [values[a] for a in node.args]
+			values[node_id] = _eval_series(node, args, frame, aliases)
+		return values
+
+
+def _pick_key(keys: Iterable[Any], column: str, aliases: Mapping[str, str] | None) -> Any:
+	by_lower = {str(k).lower(): k for k in keys}
+	for name in COLUMNS[column]:
+		if name in by_lower:
+			return by_lower[name]
+	alias = (aliases or {}).get(column)
+	if alias is not None and alias in by_lower.values():
+		return alias
+	raise KeyError(f"No column found for {column} among candidates: {list(COLUMNS[column])}")
+
+
+def _eval_series(node: Node, args: List[Any], frame: pd.DataFrame, aliases: Mapping[str, str] | None) -> Any:
+	op = node.op
+	if op == "const":
+		return node.params[0]
+	if op == "col":
+		return frame[_pick_key(frame.columns, node.params[0], aliases)]
+	if op == "field":
+		return args[0][node.params[0]]
+	if op == "crossabove":
+		return crossabove(args[0], args[1])
+	if op == "crossbelow":
+		return crossbelow(args[0], args[1])
+	if op in INDICATORS:
+		# through the module so the indicator cache applies when enabled
+		return getattr(calc_lines, op)(*args, *node.params)
+	return _SERIES_OPS[op](*args)
+
+
+class _Compiler(ast.NodeVisitor):
+	def __init__(self, graph: ExprGraph, bindings: Dict[str, Any], source: str) -> None:
+		self.graph = graph
+		self.bindings = bindings
+		self.source = source
+
+	def error(self, message: str) -> ExprError:
+		return ExprError(f"{message} in expression {self.source!r}")
+
+	def generic_visit(self, node: ast.AST) -> int:
+		raise self.error(f"Unsupported syntax {type(node).__name__}")
+
+	def const(self, value: Any) -> int:
+		return self.graph.add("const", (), (value,))
+
+	def const_value(self, node_id: int) -> Any:
+		node = self.graph.nodes[node_id]
+		return node.params[0] if node.op == "const" else None
+
+	def is_const(self, node_id: int) -> bool:
+		return self.graph.nodes[node_id].op == "const"
+
+	def check_series(self, node_id: int) -> int:
+		node = self.graph.nodes[node_id]
+		if node.op in INDICATORS and INDICATORS[node.op][2]:
+			raise self.error(f"{node.op}(...) has several outputs; pick one of {INDICATORS[node.op][2]}")
+		return node_id
+
+	def op(self, name: str, *args: int) -> int:
+		args = tuple(self.check_series(a) for a in args)
+		if all(self.is_const(a) for a in args):
+			# fold constant subexpressions at compile time
+			return self.const(_SCALAR_OPS[name](*[self.const_value(a) for a in args]))
+		if name in _FLIPPED:
+			return self.graph.add(_FLIPPED[name], args[::-1])
+		return self.graph.add(name, args)
+
+	def visit_Constant(self, node: ast.Constant) -> int:
+		if not isinstance(node.value, (bool, int, float)):
+			raise self.error(f"Unsupported constant {node.value!r}")
+		return self.const(node.value)
+
+	def visit_Name(self, node: ast.Name) -> int:
+		if node.id in self.bindings:
+			value = self.bindings[node.id]
+			if not isinstance(value, (bool, int, float)):
+				raise self.error(f"Binding {node.id}={value!r} is not a number")
+			return self.const(value)
+		if node.id in COLUMNS:
+			return self.graph.add("col", (), (node.id,))
+		raise self.error(f"Unknown name {node.id}")
+
+	def visit_BinOp(self, node: ast.BinOp) -> int:
+		name = _BINOPS.get(type(node.op))
+		if name is None:
+			raise self.error(f"Unsupported operator {type(node.op).__name__}")
+		return self.op(name, self.visit(node.left), self.visit(node.right))
+
+	def visit_BoolOp(self, node: ast.BoolOp) -> int:
+		name = "and" if isinstance(node.op, ast.And) else "or"
+		result = self.visit(node.values[0])
+		for value in node.values[1:]:
+			result = self.op(name, result, self.visit(value))
+		return result
+
+	def visit_UnaryOp(self, node: ast.UnaryOp) -> int:
+		operand = self.visit(node.operand)
+		if isinstance(node.op, (ast.Not, ast.Invert)):
+			return self.op("not", operand)
+		if isinstance(node.op, ast.USub):
+			return self.op("neg", operand)
+		if isinstance(node.op, ast.UAdd):
+			return self.check_series(operand)
+		raise self.error(f"Unsupported operator {type(node.op).__name__}")
+
+	def visit_Compare(self, node: ast.Compare) -> int:
+		# a < b < c -> (a < b) and (b < c)
+		left = self.visit(node.left)
+		result = None
+		for cmp_op, comparator in zip(node.ops, node.comparators):
+			name = _CMPOPS.get(type(cmp_op))
+			if name is None:
+				raise self.error(f"Unsupported comparison {type(cmp_op).__name__}")
+			right = self.visit(comparator)
+			term = self.op(name, left, right)
+			result = term if result is None else self.op("and", result, term)
+			left = right
+		return result
+
+	def visit_Attribute(self, node: ast.Attribute) -> int:
+		base = self.visit(node.value)
+		op = self.graph.nodes[base].op
+		fields = INDICATORS.get(op, (0, None, ()))[2]
+		if node.attr not in fields:
+			raise self.error(f"{op} has no output {node.attr!r}")
+		return self.graph.add("field", (base,), (node.attr,))
+
+	def visit_Call(self, node: ast.Call) -> int:
+		if not isinstance(node.func, ast.Name):
+			raise self.error("Only plain function calls are supported")
+		name = node.func.id
+		if name in COLUMNS and not node.args and not node.keywords:
+			return self.graph.add("col", (), (name,))
+		if name in ("crossabove", "crossbelow"):
+			if len(node.args) != 2 or node.keywords:
+				raise self.error(f"{name} takes exactly two arguments")
+			a, b = (self.check_series(self.visit(arg)) for arg in node.args)
+			return self.graph.add(name, (a, b))
+		if name not in INDICATORS:
+			raise self.error(f"Unknown function {name}")
+		return self.indicator(name, node)
+
+	def indicator(self, name: str, node: ast.Call) -> int:
+		n_series = INDICATORS[name][0]
+		sig = inspect.signature(getattr(calc_lines, name))
+		try:
+			bound = sig.bind(*node.args, **{kw.arg: kw.value for kw in node.keywords})
+		except TypeError as exc:
+			raise self.error(f"Bad arguments for {name}: {exc}") from None
+		bound.apply_defaults()
+		series: List[int] = []
+		params: List[Any] = []
+		for i, (pname, value) in enumerate(bound.arguments.items()):
+			node_id = self.visit(value) if isinstance(value, ast.AST) else self.const(value)
+			if i < n_series:
+				if self.is_const(node_id):
+					raise self.error(f"{name} argument {pname} must be a series")
+				series.append(self.check_series(node_id))
+			else:
+				if not self.is_const(node_id):
+					raise self.error(f"{name} parameter {pname} must be a constant")
+				params.append(self.const_value(node_id))
+		return self.graph.add(name, tuple(series), tuple(params))
+
+
+class _Lag:
+	def __init__(self, n: int = 1) -> None:
+		if n < 0:
+			raise ExprError("LAG/DIFF with a negative period looks ahead and cannot stream")
+		self.n = n
+		self._buf: deque = deque(maxlen=n + 1)
+
+	def update(self, value: float) -> float:
+		self._buf.append(value)
+		return self._buf[0] if len(self._buf) == self.n + 1 else NAN
+
+
+class _Diff(_Lag):
+	def update(self, value: float) -> float:
+		return value - super().update(value)
+
+
+class _Cross:
+	def __init__(self, above: bool) -> None:
+		self._test = crossabove_value if above else crossbelow_value
+		self._prev = (NAN, NAN)
+
+	def update(self, a: float, b: float) -> bool:
+		result = self._test(self._prev[0], self._prev[1], a, b)
+		self._prev = (a, b)
+		return result
+
+
+def _stream_step(node: Node, aliases: Mapping[str, str] | None) -> Tuple[Callable[[List[Any], Any], Any], Any]:
+	"""Per-bar update for one node: ((values by node id, bar) -> node value, state object or None)."""
+	op, args, params = node.op, node.args, node.params
+	if op == "const":
+		value = params[0]
+		return (lambda vals, bar: value), None
+	if op == "col":
+		key: List[Any] = []
+
+		def read(vals, bar):
+			if not key:
+				key.append(_pick_key(bar.keys(), params[0], aliases))
+			return float(bar[key[0]])
+
+		return read, None
+	if op == "field":
+		(a,), field = args, params[0]
+		return (lambda vals, bar: vals[a][field]), None
+	if op in ("crossabove", "crossbelow"):
+		cross = _Cross(op == "crossabove")
+		a, b = args
+		return (lambda vals, bar: cross.update(vals[a], vals[b])), cross
+	if op in INDICATORS:
+		if op == "LAG":
+			state = _Lag(*params)
+		elif op == "DIFF":
+			state = _Diff(*params)
+		else:
+			state = INDICATORS[op][1](*params)
+		update = state.update
+		if len(args) == 1:
+			(a,) = args
+			return (lambda vals, bar: update(vals[a])), state
+		return (lambda vals, bar: update(*[vals[i] for i in args])), state
+	fn = _SCALAR_OPS[op]
+	if len(args) == 1:
+		(a,) = args
+		return (lambda vals, bar: fn(vals[a])), None
+	a, b = args
+	return (lambda vals, bar: fn(vals[a], vals[b])), None
+
+
+class Program:
+	"""Named expressions compiled into one graph."""
+
+	def __init__(self, graph: ExprGraph, outputs: Dict[str, int]) -> None:
+		self.graph = graph
+		self.outputs = outputs
+
+	@property
+	def nodes(self) -> List[int]:
+		"""Node ids this program evaluates (shared subexpressions counted once)."""
+		return self.graph.closure(self.outputs.values())
+
+	def evaluate(self, frame: pd.DataFrame, aliases: Mapping[str, str] | None = None) -> Dict[str, pd.Series]:
+		"""Whole-frame pass: output name -> Series aligned to `frame`.
+
+		aliases: fallback column per expression column, e.g. {"CLOSE": "AAPL"}.
+		"""
+		values = self.graph.evaluate(frame, self.outputs.values(), aliases)
+		return {name: _as_series(values[node_id], frame.index) for name, node_id in self.outputs.items()}
+
+	def stream(self, aliases: Mapping[str, str] | None = None) -> "ProgramStream":
+		"""Fresh per-bar evaluator with its own indicator state."""
+		return ProgramStream(self, aliases)
+
+
+def _as_series(value: Any, index: pd.Index) -> pd.Series:
+	return value if isinstance(value, pd.Series) else pd.Series(value, index=index)
+
+
+class ProgramStream:
+	"""Incremental evaluation of a `Program`: one `update(bar)` per bar, O(nodes) work."""
+
+	def __init__(self, program: Program, aliases: Mapping[str, str] | None = None) -> None:
+		self.program = program
+		graph = program.graph
+		steps = [(node_id, _stream_step(graph.nodes[node_id], aliases)) for node_id in program.nodes]
+		self._steps = [(node_id, step) for node_id, (step, _) in steps]
+		# indicator/cross objects behind the steps, for state()/load_state()
+		self._states = {node_id: state for node_id, (_, state) in steps if state is not None}
+		self._values: List[Any] = [NAN] * len(graph)
+		self._outputs = list(program.outputs.items())
+
+	def state(self) -> Dict[str, Any]:
+		"""Node values and indicator states (picklable, for checkpoints)."""
+		return {"values": list(self._values), "states": dict(self._states)}
+
+	def load_state(self, state: Dict[str, Any]) -> None:
+		"""Restore a `state()` snapshot taken from a stream of the same program."""
+		if state["states"].keys() != self._states.keys():
+			raise ValueError("Stream state was saved from a different program")
+		self._values[:] = state["values"]
+		for node_id, saved in state["states"].items():
+			# update in place: the step closures hold these objects
+			vars(self._states[node_id]).update(vars(saved))
+
+	def update(self, bar: Mapping[str, Any]) -> Dict[str, Any]:
+		"""Push one bar (row Series or mapping of columns); returns output name -> value."""
+		vals = self._values
+		for node_id, step in self._steps:
+			vals[node_id] = step(vals, bar)
+		return {name: vals[node_id] for name, node_id in self._outputs}
+
+
+def compile_exprs(exprs: Mapping[str, str], bindings: Mapping[str, Any] | None = None,
+				  graph: ExprGraph | None = None) -> Program:
+	"""Compile named expressions (e.g. {"buy": ..., "sell": ...}) into a Program.
+
+	Pass one `graph` to several calls to share nodes across programs, then
+	evaluate them together with `evaluate_programs`.
+	"""
+	graph = graph if graph is not None else ExprGraph()
+	outputs = {name: graph.compile(source, bindings) for name, source in exprs.items()}
+	return Program(graph, outputs)
+
+
+def evaluate_programs(programs: List[Program], frame: pd.DataFrame,
+					  aliases: Mapping[str, str] | None = None) -> List[Dict[str, pd.Series]]:
+	"""Evaluate programs built on one graph in a single pass over their union of nodes."""
+	if not programs:
+		return []
+	graph = programs[0].graph
+	if any(p.graph is not graph for p in programs):
+		raise ValueError("evaluate_programs needs programs compiled into the same ExprGraph")
+	roots = [node_id for p in programs for node_id in p.outputs.values()]
+	values = graph.evaluate(frame, roots, aliases)
+	return [{name: _as_series(values[node_id], frame.index) for name, node_id in p.outputs.items()} for p in programs]
+
+
+class ExprStrategy:
+	"""Trade `qty` on rising edges of the `buy` / `sell` expressions.
+
+	Extra keyword arguments are bound as names in the expressions, so task
+	params and sweep grids can drive them:
+
+		ExprStrategy("AAPL", buy="crossabove(MA(CLOSE, short), MA(CLOSE, long))",
+					 sell="crossbelow(MA(CLOSE, short), MA(CLOSE, long))", short=5, long=20)
+	"""
+
+	def __init__(self, symbol: str, buy: str, sell: str | None = None, qty: int = 100,
+				 graph: ExprGraph | None = None, **bindings: Any) -> None:
+		self.symbol = symbol
+		self.qty = qty
+		exprs = {"buy": buy} if sell is None else {"buy": buy, "sell": sell}
+		self.program = compile_exprs(exprs, bindings, graph)
+		# single-column frames named after the symbol act as CLOSE
+		self._aliases = {"CLOSE": symbol}
+		self._orders: Dict[str, int] = {}
+		self._triggers = self._make_triggers()
+		self._bar_triggers = self._make_triggers()
+		self._stream: ProgramStream | None = None
+		logger.info("ExprStrategy compiled %s outputs into %s nodes", len(exprs), len(self.program.nodes))
+
+	def _make_triggers(self) -> TriggerSet:
+		triggers = TriggerSet()
+		triggers.always(lambda ctx: ctx["buy"], lambda ctx: self._orders.__setitem__(self.symbol, self.qty), name="buy")
+		if "sell" in self.program.outputs:
+			triggers.always(lambda ctx: ctx["sell"], lambda ctx: self._orders.__setitem__(self.symbol, -self.qty), name="sell")
+		return triggers
+
+	def decide(self, date: pd.Timestamp, history: pd.DataFrame) -> Dict[str, int]:
+		if history.empty:
+			return {}
+		self._orders.clear()
+		self._triggers.run(self.program.evaluate(history, self._aliases))
+		return dict(self._orders)
+
+	def on_bar(self, date: pd.Timestamp, bar) -> Dict[str, int]:
+		"""Incremental counterpart of `decide`."""
+		if self._stream is None:
+			self._stream = self.program.stream(self._aliases)
+		self._orders.clear()
+		self._bar_triggers.run(self._stream.update(bar))
+		return dict(self._orders)
+
+	def state(self) -> Dict[str, Any]:
+		"""Trigger flags and streaming state, for checkpoints."""
+		return {
+			"triggers": self._triggers.state(),
+			"bar_triggers": self._bar_triggers.state(),
+			"stream": None if self._stream is None else self._stream.state(),
+		}
+
+	def load_state(self, state: Dict[str, Any]) -> None:
+		self._triggers.load_state(state["triggers"])
+		self._bar_triggers.load_state(state["bar_triggers"])
+		self._stream = None
+		if state["stream"] is not None:
+			self._stream = self.program.stream(self._aliases)
+			self._stream.load_state(state["stream"])
+
+	def order_array(self, data: pd.DataFrame) -> np.ndarray:
+		"""Vectorized orders over the whole frame (same signals as `decide`)."""
+		orders = np.zeros(len(data), dtype=np.int64)
+		if data.empty:
+			return orders
+		fired = self._triggers.run_batch(self.program.evaluate(data, self._aliases), reset=True)
+		orders[fired["buy"]] = self.qty
+		if "sell" in fired:
+			# sell is registered after buy, so it wins on the same bar as in decide()
+			orders[fired["sell"]] = -self.qty
+		return orders
+
+
+__all__ = [
+	"COLUMNS",
+	"INDICATORS",
+	"ExprError",
+	"ExprGraph",
+	"ExprStrategy",
+	"Node",
+	"Program",
+	"ProgramStream",
+	"compile_exprs",
+	"evaluate_programs",
+]
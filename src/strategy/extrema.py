@@ -0,0 +1,131 @@
+"""O(n) rolling max/min over numpy arrays, batch and incremental.
+
+Both paths keep the `calc_lines.ROLLING_MAX/MIN` semantics (`min_periods=1`,
+NaN skipped, an all-NaN window stays NaN) and work on a 1-D series or a 2-D
+bars x symbols matrix (rolling along axis 0).
+
+The batch kernel is the van Herk/Gil-Werman form of the monotonic deque:
+the input is cut into blocks of `window` bars, each block gets a running
+extremum from the left and from the right, and every window is the
+extremum of one suffix and one prefix. That is three vectorized passes
+regardless of the window, so whole symbol matrices go through at once.
+
+`PanelRollingMax/Min` do the same incrementally: the running prefix of the
+current block is updated per bar and the suffixes of the previous block are
+rebuilt once every `window` bars, amortized O(1) per symbol per update.
+For a single scalar series `streaming.StreamRollingMax/Min` keep the
+classic deque.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def _check_window(window: int) -> int:
+	window = int(window)
+	if window < 1:
+		raise ValueError("window must be >= 1")
+	return window
+
+
+def _rolling(values, window: int, ufunc: np.ufunc) -> np.ndarray:
+	x = np.asarray(values, dtype=np.float64)
+	if x.ndim not in (1, 2):
+		raise ValueError(f"expected a 1-D or 2-D array, got shape {x.shape}")
+	n = x.shape[0]
+	w = min(_check_window(window), max(n, 1))
+	out = np.empty_like(x)
+	if n == 0:
+		return out
+	rest = x.shape[1:]
+	pad = -n % w
+	if pad:
+		x = np.concatenate([x, np.full((pad,) + rest, np.nan)])
+	blocks = x.reshape((-1, w) + rest)
+	prefix = ufunc.accumulate(blocks, axis=1).reshape((-1,) + rest)
+	suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape((-1,) + rest)
+	# bars before the first full window only see the first block's prefix
+	out[:w - 1] = prefix[:w - 1]
+	ufunc(suffix[:n - w + 1], prefix[w - 1:n], out=out[w - 1:])
+	return out
+
+
+def rolling_max(values, window: int) -> np.ndarray:
+	"""Trailing-window maximum along axis 0 of a 1-D or 2-D array."""
+	return _rolling(values, window, np.fmax)
+
+
+def rolling_min(values, window: int) -> np.ndarray:
+	"""Trailing-window minimum along axis 0 of a 1-D or 2-D array."""
+	return _rolling(values, window, np.fmin)
+
+
+class _PanelExtremum:
+	"""Incremental block-split rolling extremum over a vector of symbols."""
+
+	_ufunc = np.fmax
+
+	def __init__(self, window: int, n_symbols: int) -> None:
+		self.window = _check_window(window)
+		self.n_symbols = int(n_symbols)
+		shape = (self.window, self.n_symbols)
+		# bars of the block being filled, and suffix extrema of the last full block
+		self._block = np.full(shape, np.nan)
+		self._suffix = np.full(shape, np.nan)
+		self._prefix = np.full(self.n_symbols, np.nan)
+		self._pos = 0
+		self._value = np.full(self.n_symbols, np.nan)
+
+	@property
+	def value(self) -> np.ndarray:
+		return self._value
+
+	def update(self, row) -> np.ndarray:
+		"""Push one bar (one value per symbol) and return the new extrema."""
+		x = np.asarray(row, dtype=np.float64)
+		if x.shape != (self.n_symbols,):
+			raise ValueError(f"expected {self.n_symbols} values, got shape {x.shape}")
+		pos = self._pos
+		if pos == 0:
+			self._prefix[:] = x
+		else:
+			self._ufunc(self._prefix, x, out=self._prefix)
+		self._block[pos] = x
+		if pos + 1 < self.window:
+			# the window still reaches back into the previous block
+			self._value = self._ufunc(self._suffix[pos + 1], self._prefix)
+			self._pos = pos + 1
+		else:
+			self._value = self._prefix.copy()
+			self._ufunc.accumulate(self._block[::-1], axis=0, out=self._suffix[::-1])
+			self._pos = 0
+		return self._value
+
+	def extend(self, rows) -> np.ndarray:
+		"""Push a bars x symbols block; returns the extrema for every new bar."""
+		rows = np.asarray(rows, dtype=np.float64).reshape(-1, self.n_symbols)
+		out = np.empty_like(rows)
+		for i, row in enumerate(rows):
+			out[i] = self.update(row)
+		return out
+
+
+class PanelRollingMax(_PanelExtremum):
+	"""Rolling maximum per symbol, updated one bars x symbols row at a time."""
+
+	_ufunc = np.fmax
+
+
+class PanelRollingMin(_PanelExtremum):
+	"""Rolling minimum per symbol, updated one bars x symbols row at a time."""
+
+	_ufunc = np.fmin
+
+
+__all__ = [
+	"rolling_max",
+	"rolling_min",
+	"PanelRollingMax",
+	"PanelRollingMin",
+]
@@ -0,0 +1,238 @@
+"""Memoization cache in front of the `calc_lines` indicator functions.
+
+Entries are keyed by the indicator name, the compute backend (see
+`backends`), a cheap content fingerprint of every Series/DataFrame argument
+(CRC32 of the raw value and index buffers plus shape/dtype and labels) and the bound
+parameters, so equal inputs hit regardless of which strategy, sweep job or
+plot built them. Eviction is LRU under both an
+entry count and a memory budget. Derived indicators call the cached
+primitives (MACD -> EMA, BOLL/ZSCORE -> MA/STD), so their intermediates are
+shared too.
+
+The cache is off by default; turn it on process-wide with `enable_cache()`
+or for a block with `indicator_cache()`:
+
+	with indicator_cache(max_bytes=64 << 20) as cache:
+		...
+	cache.stats()
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable
+
+import numpy as np
+import pandas as pd
+
+from .backends import get_backend
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 256 << 20
+
+_CACHE: "IndicatorCache | None" = None
+
+
+def _crc(values: np.ndarray) -> int:
+	arr = np.ascontiguousarray(values)
+	if arr.dtype == object:
+		return zlib.crc32(repr(arr.tolist()).encode())
+	return zlib.crc32(memoryview(arr).cast('B'))
+
+
+def _index_fingerprint(index: pd.Index) -> tuple:
+	if isinstance(index, pd.RangeIndex):
+		return ('range', index.start, index.stop, index.step)
+	values = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
+	return (str(index.dtype), _crc(values))
+
+
+def fingerprint(obj: Any) -> Hashable:
+	"""Content fingerprint of a Series/DataFrame; other values are used as-is.
+
+	Labels (Series name, column names) are part of it: results carry them.
+	"""
+	if isinstance(obj, pd.Series):
+		return ('S', obj.name, len(obj), str(obj.dtype), _crc(obj.to_numpy()), _index_fingerprint(obj.index))
+	if isinstance(obj, pd.DataFrame):
+		cols = tuple((c, str(obj[c].dtype), _crc(obj[c].to_numpy())) for c in obj.columns)
+		return ('F', obj.shape, cols, _index_fingerprint(obj.index))
+	if isinstance(obj, np.ndarray):
+		return ('A', obj.shape, str(obj.dtype), _crc(obj))
+	return obj
+
+
+def _nbytes(obj: Any) -> int:
+	if isinstance(obj, pd.Series):
+		return int(obj.memory_usage(index=False))
+	if isinstance(obj, pd.DataFrame):
+		return int(obj.memory_usage(index=False).sum())
+	if isinstance(obj, dict):
+		return sum(_nbytes(v) for v in obj.values())
+	return int(getattr(obj, 'nbytes', 0))
+
+
+def _copy_on_write() -> bool:
+	# always on from pandas 3; opt-in before that
+	if int(pd.__version__.split('.')[0]) >= 3:
+		return True
+	try:
+		return bool(pd.get_option('mode.copy_on_write'))
+	except Exception:
+		return False
+
+
+def _detach(obj: Any) -> Any:
+	"""Hand out a result the caller can modify without touching the cached one."""
+	if isinstance(obj, (pd.Series, pd.DataFrame)):
+		# a shallow copy is enough under copy-on-write
+		return obj.copy(deep=not _copy_on_write())
+	if isinstance(obj, np.ndarray):
+		return obj.copy()
+	if isinstance(obj, dict):
+		# MACD/BOLL on arrays
+		return {k: _detach(v) for k, v in obj.items()}
+	return obj
+
+
+class IndicatorCache:
+	"""Thread-safe LRU map bounded by entry count and total result bytes."""
+
+	def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+		self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+		self._bytes = 0
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self._by_name: Dict[str, Dict[str, int]] = {}
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def _tally(self, name: str, field: str) -> None:
+		stat = self._by_name.setdefault(name, {'hits': 0, 'misses': 0})
+		stat[field] += 1
+
+	def get(self, key: Hashable, name: str = '') -> Any:
+		"""Cached value for `key` (marked most recently used) or None."""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				self.misses += 1
+				self._tally(name, 'misses')
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+			self._tally(name, 'hits')
+			return entry[0]
+
+	def put(self, key: Hashable, value: Any) -> None:
+		size = _nbytes(value)
+		with self._lock:
+			if size > self.max_bytes:
+				return
+			old = self._entries.pop(key, None)
+			if old is not None:
+				self._bytes -= old[1]
+			self._entries[key] = (value, size)
+			self._bytes += size
+			while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+				_, (_, evicted) = self._entries.popitem(last=False)
+				self._bytes -= evicted
+				self.evictions += 1
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+			self._bytes = 0
+
+	def stats(self) -> Dict[str, Any]:
+		with self._lock:
+			lookups = self.hits + self.misses
+			return {
+				'entries': len(self._entries),
+				'bytes': self._bytes,
+				'max_entries': self.max_entries,
+				'max_bytes': self.max_bytes,
+				'hits': self.hits,
+				'misses': self.misses,
+				'evictions': self.evictions,
+				'hit_rate': self.hits / lookups if lookups else 0.0,
+				'by_indicator': {k: dict(v) for k, v in self._by_name.items()},
+			}
+
+
+def get_cache() -> IndicatorCache | None:
+	return _CACHE
+
+
+def enable_cache(max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES) -> IndicatorCache:
+	"""Install a fresh process-wide cache and return it."""
+	global _CACHE
+	_CACHE = IndicatorCache(max_entries=max_entries, max_bytes=max_bytes)
+	return _CACHE
+
+
+def disable_cache() -> None:
+	global _CACHE
+	_CACHE = None
+
+
+@contextmanager
+def indicator_cache(max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+					cache: IndicatorCache | None = None):
+	"""Use `cache` (or a new one) for the block, then restore the previous state."""
+	global _CACHE
+	previous = _CACHE
+	_CACHE = cache if cache is not None else IndicatorCache(max_entries=max_entries, max_bytes=max_bytes)
+	try:
+		yield _CACHE
+	finally:
+		_CACHE = previous
+
+
+def cached_indicator(fn: Callable) -> Callable:
+	"""Memoize an indicator function through the active cache (no-op when off)."""
+	sig = inspect.signature(fn)
+	name = fn.__name__
+
+	@functools.wraps(fn)
+	def wrapper(*args, **kwargs):
+		cache = _CACHE
+		if cache is None:
+			return fn(*args, **kwargs)
+		bound = sig.bind(*args, **kwargs)
+		bound.apply_defaults()
+		try:
+			key = (name, get_backend()) + tuple((k, fingerprint(v)) for k, v in bound.arguments.items())
+			hash(key)
+		except TypeError:
+			# unhashable parameter: compute without caching
+			return fn(*args, **kwargs)
+		result = cache.get(key, name)
+		if result is None:
+			result = fn(*args, **kwargs)
+			cache.put(key, result)
+		return _detach(result)
+
+	wrapper.uncached = fn
+	return wrapper
+
+
+__all__ = [
+	"IndicatorCache",
+	"cached_indicator",
+	"disable_cache",
+	"enable_cache",
+	"fingerprint",
+	"get_cache",
+	"indicator_cache",
+]
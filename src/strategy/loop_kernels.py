@@ -0,0 +1,188 @@
+"""Loop kernels behind the numba compute backend.
+
+Array versions of the pandas rolling-mean, rolling-variance and
+exponentially weighted mean algorithms (the same ones `streaming` follows
+one bar at a time), written in the subset of Python numba compiles. With
+numba installed they are compiled on first use (and cached on disk);
+without it they still run as plain Python, which is only useful for tests
+on short inputs.
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+
+import numpy as np
+
+from .backends import jit
+
+# pandas treats a Welford step as ill-conditioned below this ratio
+_INV_COND_TOL = sys.float_info.epsilon * 1e3
+
+
+@jit
+def rolling_mean(x, window):
+	"""`Series.rolling(window, min_periods=1).mean()` on a float64 array."""
+	n = len(x)
+	out = np.empty(n)
+	nobs = 0
+	total = 0.0
+	comp_add = 0.0
+	comp_remove = 0.0
+	neg_ct = 0
+	same_ct = 0
+	prev = np.nan
+	for i in range(n):
+		if window == 1:
+			# pandas recomputes from scratch when windows do not overlap
+			nobs = 0
+			total = 0.0
+			comp_add = 0.0
+			comp_remove = 0.0
+			neg_ct = 0
+			same_ct = 0
+			prev = np.nan
+		elif i >= window:
+			v = x[i - window]
+			if v == v:
+				nobs -= 1
+				y = -v - comp_remove
+				t = total + y
+				comp_remove = t - total - y
+				total = t
+				if math.copysign(1.0, v) < 0:
+					neg_ct -= 1
+		v = x[i]
+		if v == v:
+			nobs += 1
+			y = v - comp_add
+			t = total + y
+			comp_add = t - total - y
+			total = t
+			if math.copysign(1.0, v) < 0:
+				neg_ct += 1
+			if v == prev:
+				same_ct += 1
+			else:
+				same_ct = 1
+			prev = v
+		if nobs > 0:
+			result = total / nobs
+			if same_ct >= nobs:
+				result = prev
+			elif neg_ct == 0 and result < 0:
+				result = 0.0
+			elif neg_ct == nobs and result > 0:
+				result = 0.0
+		else:
+			result = np.nan
+		out[i] = result
+	return out
+
+
+@jit
+def _welford_add(v, nobs, mean, ssqdm, comp, unstable):
+	if v != v:
+		return nobs, mean, ssqdm, comp, unstable
+	prev_m2 = ssqdm
+	nobs += 1
+	prev_mean = mean - comp
+	y = v - comp
+	t = y - mean
+	comp = t + mean - y
+	mean = mean + t / nobs
+	ssqdm = ssqdm + (v - prev_mean) * (v - mean)
+	if prev_m2 * _INV_COND_TOL > ssqdm:
+		unstable = True
+	return nobs, mean, ssqdm, comp, unstable
+
+
+@jit
+def rolling_std(x, window):
+	"""`Series.rolling(window, min_periods=1).std()` on a float64 array."""
+	n = len(x)
+	out = np.empty(n)
+	nobs = 0
+	mean = 0.0
+	ssqdm = 0.0
+	comp_add = 0.0
+	comp_remove = 0.0
+	unstable = False
+	for i in range(n):
+		recompute = window == 1
+		if not recompute:
+			if i >= window:
+				v = x[i - window]
+				if v == v:
+					prev_m2 = ssqdm
+					nobs -= 1
+					if nobs:
+						prev_mean = mean - comp_remove
+						y = v - comp_remove
+						t = y - mean
+						comp_remove = t + mean - y
+						mean = mean - t / nobs
+						ssqdm = ssqdm - (v - prev_mean) * (v - mean)
+						if prev_m2 * _INV_COND_TOL > ssqdm:
+							unstable = True
+					else:
+						mean = 0.0
+						ssqdm = 0.0
+						unstable = False
+			nobs, mean, ssqdm, comp_add, unstable = _welford_add(x[i], nobs, mean, ssqdm, comp_add, unstable)
+		if recompute or unstable:
+			# catastrophic cancellation: rebuild the window from scratch
+			nobs = 0
+			mean = 0.0
+			ssqdm = 0.0
+			comp_add = 0.0
+			comp_remove = 0.0
+			unstable = False
+			for j in range(max(0, i - window + 1), i + 1):
+				nobs, mean, ssqdm, comp_add, unstable = _welford_add(x[j], nobs, mean, ssqdm, comp_add, unstable)
+			unstable = False
+		if nobs > 1:
+			var = ssqdm / (nobs - 1)
+			out[i] = math.sqrt(var) if var > 0 else 0.0
+		else:
+			out[i] = np.nan
+	return out
+
+
+@jit
+def ewm_mean(x, com):
+	"""`Series.ewm(com=com, adjust=False).mean()` on a float64 array."""
+	n = len(x)
+	out = np.empty(n)
+	if n == 0:
+		return out
+	alpha = 1.0 / (1.0 + com)
+	old_wt_factor = 1.0 - alpha
+	new_wt = alpha
+	old_wt = 1.0
+	weighted = x[0]
+	out[0] = weighted
+	for i in range(1, n):
+		cur = x[i]
+		if weighted == weighted:
+			old_wt *= old_wt_factor
+			if cur == cur:
+				# avoid numerical drift on constant series (as pandas does)
+				if weighted != cur:
+					if com == 1:
+						new_wt = 1.0 - old_wt
+					weighted = old_wt * weighted + new_wt * cur
+					weighted /= (old_wt + new_wt)
+				old_wt = 1.0
+		elif cur == cur:
+			weighted = cur
+		out[i] = weighted
+	return out
+
+
+__all__ = [
+	"ewm_mean",
+	"rolling_mean",
+	"rolling_std",
+]
@@ -0,0 +1,431 @@
+"""Stateful streaming indicators that mirror `calc_lines` one bar at a time.
+
+Each indicator exposes `update(value)` (returns the new value) and a `value`
+property. The arithmetic follows the pandas kernels behind the batch
+functions so both paths produce the same numbers.
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+from collections import deque
+
+NAN = float("nan")
+# pandas treats a Welford step as ill-conditioned below this ratio
+_INV_COND_TOL = sys.float_info.epsilon * 1e3
+
+
+def _is_nan(x: float) -> bool:
+	return x != x
+
+
+class StreamMA:
+	"""Rolling mean with `min_periods=1`, equivalent to `calc_lines.MA`."""
+
+	def __init__(self, window: int) -> None:
+		if window < 1:
+			raise ValueError("window must be >= 1")
+		self.window = window
+		self._buf: deque = deque()
+		self._nobs = 0
+		self._sum = 0.0
+		self._comp_add = 0.0
+		self._comp_remove = 0.0
+		self._neg_ct = 0
+		self._same_ct = 0
+		self._prev = NAN
+		self._value = NAN
+
+	@property
+	def value(self) -> float:
+		return self._value
+
+	def _add(self, x: float) -> None:
+		if _is_nan(x):
+			return
+		self._nobs += 1
+		y = x - self._comp_add
+		t = self._sum + y
+		self._comp_add = t - self._sum - y
+		self._sum = t
+		if math.copysign(1.0, x) < 0:
+			self._neg_ct += 1
+		if x == self._prev:
+			self._same_ct += 1
+		else:
+			self._same_ct = 1
+		self._prev = x
+
+	def _remove(self, x: float) -> None:
+		if _is_nan(x):
+			return
+		self._nobs -= 1
+		y = -x - self._comp_remove
+		t = self._sum + y
+		self._comp_remove = t - self._sum - y
+		self._sum = t
+		if math.copysign(1.0, x) < 0:
+			self._neg_ct -= 1
+
+	def _reset(self) -> None:
+		self._nobs = 0
+		self._sum = 0.0
+		self._comp_add = 0.0
+		self._comp_remove = 0.0
+		self._neg_ct = 0
+		self._same_ct = 0
+		self._prev = NAN
+
+	def update(self, value: float) -> float:
+		x = float(value)
+		if self.window == 1:
+			# pandas recomputes from scratch when windows do not overlap
+			self._buf.clear()
+			self._reset()
+		elif len(self._buf) == self.window:
+			self._remove(self._buf.popleft())
+		self._buf.append(x)
+		self._add(x)
+
+		if self._nobs > 0:
+			result = self._sum / self._nobs
+			if self._same_ct >= self._nobs:
+				result = self._prev
+			elif self._neg_ct == 0 and result < 0:
+				result = 0.0
+			elif self._neg_ct == self._nobs and result > 0:
+				result = 0.0
+		else:
+			result = NAN
+		self._value = result
+		return result
+
+
+class StreamEMA:
+	"""Exponential moving average with `adjust=False`, equivalent to `calc_lines.EMA`.
+
+	Pass `alpha` instead of `window` for the `ewm(alpha=...)` form used by RSI.
+	"""
+
+	def __init__(self, window: float | None = None, alpha: float | None = None) -> None:
+		if alpha is not None:
+			com = (1.0 - alpha) / alpha
+		elif window is not None:
+			com = (window - 1) / 2.0
+		else:
+			raise ValueError("either window or alpha is required")
+		# same derivation as pandas ewm: span/alpha -> com -> alpha
+		self._com = com
+		self.alpha = 1.0 / (1.0 + com)
+		self.window = window
+		self._old_wt_factor = 1.0 - self.alpha
+		self._new_wt = self.alpha
+		self._old_wt = 1.0
+		self._weighted = NAN
+		self._started = False
+
+	@property
+	def value(self) -> float:
+		return self._weighted
+
+	def update(self, value: float) -> float:
+		cur = float(value)
+		is_obs = not _is_nan(cur)
+		if not self._started:
+			self._started = True
+			self._weighted = cur
+			return self._weighted
+		if not _is_nan(self._weighted):
+			self._old_wt *= self._old_wt_factor
+			if is_obs:
+				# avoid numerical drift on constant series (as pandas does)
+				if self._weighted != cur:
+					if self._com == 1:
+						# pandas special-cases com == 1 (irregular-interval update)
+						self._new_wt = 1.0 - self._old_wt
+					self._weighted = self._old_wt * self._weighted + self._new_wt * cur
+					self._weighted /= (self._old_wt + self._new_wt)
+				self._old_wt = 1.0
+		elif is_obs:
+			self._weighted = cur
+		return self._weighted
+
+
+class StreamSTD:
+	"""Rolling sample standard deviation (ddof=1, `min_periods=1`), equivalent to `calc_lines.STD`."""
+
+	def __init__(self, window: int) -> None:
+		if window < 1:
+			raise ValueError("window must be >= 1")
+		self.window = window
+		self._buf: deque = deque()
+		self._reset()
+		self._value = NAN
+
+	@property
+	def value(self) -> float:
+		return self._value
+
+	def _reset(self) -> None:
+		self._nobs = 0
+		self._mean = 0.0
+		self._ssqdm = 0.0
+		self._comp_add = 0.0
+		self._comp_remove = 0.0
+		self._unstable = False
+
+	def _add(self, x: float) -> None:
+		if _is_nan(x):
+			return
+		prev_m2 = self._ssqdm
+		self._nobs += 1
+		# Welford update with Kahan-compensated mean, as in pandas roll_var
+		prev_mean = self._mean - self._comp_add
+		y = x - self._comp_add
+		t = y - self._mean
+		self._comp_add = t + self._mean - y
+		self._mean = self._mean + t / self._nobs
+		self._ssqdm = self._ssqdm + (x - prev_mean) * (x - self._mean)
+		if prev_m2 * _INV_COND_TOL > self._ssqdm:
+			self._unstable = True
+
+	def _remove(self, x: float) -> None:
+		if _is_nan(x):
+			return
+		prev_m2 = self._ssqdm
+		self._nobs -= 1
+		if self._nobs:
+			prev_mean = self._mean - self._comp_remove
+			y = x - self._comp_remove
+			t = y - self._mean
+			self._comp_remove = t + self._mean - y
+			self._mean = self._mean - t / self._nobs
+			self._ssqdm = self._ssqdm - (x - prev_mean) * (x - self._mean)
+			if prev_m2 * _INV_COND_TOL > self._ssqdm:
+				self._unstable = True
+		else:
+			self._mean = 0.0
+			self._ssqdm = 0.0
+			self._unstable = False
+
+	def update(self, value: float) -> float:
+		x = float(value)
+		recompute = self.window == 1
+		if recompute:
+			self._buf.clear()
+		elif len(self._buf) == self.window:
+			self._remove(self._buf.popleft())
+		self._buf.append(x)
+		if not recompute:
+			self._add(x)
+		if recompute or self._unstable:
+			# catastrophic cancellation: rebuild the window from scratch
+			self._reset()
+			for v in self._buf:
+				self._add(v)
+			self._unstable = False
+
+		if self._nobs > 1:
+			var = self._ssqdm / (self._nobs - 1)
+			result = math.sqrt(var) if var > 0 else 0.0
+		else:
+			result = NAN
+		self._value = result
+		return result
+
+
+class StreamZSCORE:
+	"""Rolling z-score, equivalent to `calc_lines.ZSCORE` (zero deviation -> NaN)."""
+
+	def __init__(self, window: int) -> None:
+		self.window = window
+		self._mean = StreamMA(window)
+		self._std = StreamSTD(window)
+		self._value = NAN
+
+	@property
+	def value(self) -> float:
+		return self._value
+
+	def update(self, value: float) -> float:
+		x = float(value)
+		mean = self._mean.update(x)
+		std = self._std.update(x)
+		if std == 0 or _is_nan(std):
+			self._value = NAN
+		else:
+			self._value = (x - mean) / std
+		return self._value
+
+
+class StreamRSI:
+	"""Relative strength index with Wilder smoothing, equivalent to `calc_lines.RSI`."""
+
+	def __init__(self, window: int = 14) -> None:
+		self.window = window
+		self._gain = StreamEMA(alpha=1 / window)
+		self._loss = StreamEMA(alpha=1 / window)
+		self._last = NAN
+		self._value = NAN
+
+	@property
+	def value(self) -> float:
+		return self._value
+
+	def update(self, value: float) -> float:
+		x = float(value)
+		delta = x - self._last
+		self._last = x
+		if _is_nan(delta):
+			gain = loss = NAN
+		else:
+			# clip(lower=0) / -clip(upper=0) as in the batch version
+			gain = delta if delta > 0 else 0.0
+			loss = -(delta if delta < 0 else 0.0)
+		avg_gain = self._gain.update(gain)
+		avg_loss = self._loss.update(loss)
+		if avg_loss == 0 or _is_nan(avg_loss) or _is_nan(avg_gain):
+			self._value = NAN
+		else:
+			self._value = 100 - (100 / (1 + avg_gain / avg_loss))
+		return self._value
+
+
+class StreamMACD:
+	"""MACD line, signal line and histogram, equivalent to `calc_lines.MACD`.
+
+	`value` is a dict with the batch column names: macd, signal, hist.
+	"""
+
+	def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+		self.fast = fast
+		self.slow = slow
+		self.signal = signal
+		self._fast = StreamEMA(fast)
+		self._slow = StreamEMA(slow)
+		self._signal = StreamEMA(signal)
+		self._value = {"macd": NAN, "signal": NAN, "hist": NAN}
+
+	@property
+	def value(self) -> dict:
+		return self._value
+
+	def update(self, value: float) -> dict:
+		x = float(value)
+		macd = self._fast.update(x) - self._slow.update(x)
+		signal = self._signal.update(macd)
+		self._value = {"macd": macd, "signal": signal, "hist": macd - signal}
+		return self._value
+
+
+class StreamBOLL:
+	"""Bollinger bands, equivalent to `calc_lines.BOLL`.
+
+	`value` is a dict with the batch column names: mid, upper, lower.
+	"""
+
+	def __init__(self, window: int = 20, k: float = 2.0) -> None:
+		self.window = window
+		self.k = k
+		self._mid = StreamMA(window)
+		self._dev = StreamSTD(window)
+		self._value = {"mid": NAN, "upper": NAN, "lower": NAN}
+
+	@property
+	def value(self) -> dict:
+		return self._value
+
+	def update(self, value: float) -> dict:
+		x = float(value)
+		mid = self._mid.update(x)
+		dev = self._dev.update(x)
+		self._value = {"mid": mid, "upper": mid + self.k * dev, "lower": mid - self.k * dev}
+		return self._value
+
+
+class StreamATR:
+	"""Average true range, equivalent to `calc_lines.ATR`.
+
+	Takes one bar at a time: `update(high, low, close)`.
+	"""
+
+	def __init__(self, window: int = 14) -> None:
+		self.window = window
+		self._mean = StreamMA(window)
+		self._prev_close = NAN
+
+	@property
+	def value(self) -> float:
+		return self._mean.value
+
+	def update(self, high: float, low: float, close: float) -> float:
+		high, low, close = float(high), float(low), float(close)
+		ranges = [high - low, abs(high - self._prev_close), abs(low - self._prev_close)]
+		ranges = [r for r in ranges if not _is_nan(r)]
+		self._prev_close = close
+		# row-wise max skips NaN; an all-NaN row stays NaN
+		return self._mean.update(max(ranges) if ranges else NAN)
+
+
+class _StreamExtremum:
+	"""Monotonic-deque rolling extremum shared by StreamRollingMax/Min."""
+
+	_take_max = True
+
+	def __init__(self, window: int) -> None:
+		if window < 1:
+			raise ValueError("window must be >= 1")
+		self.window = window
+		self._count = 0
+		# (bar position, value) pairs; values are monotonic from front to back
+		self._deque: deque = deque()
+		self._value = NAN
+
+	@property
+	def value(self) -> float:
+		return self._value
+
+	def update(self, value: float) -> float:
+		x = float(value)
+		pos = self._count
+		self._count += 1
+		dq = self._deque
+		while dq and dq[0][0] <= pos - self.window:
+			dq.popleft()
+		if not _is_nan(x):
+			if self._take_max:
+				while dq and dq[-1][1] <= x:
+					dq.pop()
+			else:
+				while dq and dq[-1][1] >= x:
+					dq.pop()
+			dq.append((pos, x))
+		self._value = dq[0][1] if dq else NAN
+		return self._value
+
+
+class StreamRollingMax(_StreamExtremum):
+	"""Rolling maximum with `min_periods=1`, equivalent to `calc_lines.ROLLING_MAX`."""
+
+	_take_max = True
+
+
+class StreamRollingMin(_StreamExtremum):
+	"""Rolling minimum with `min_periods=1`, equivalent to `calc_lines.ROLLING_MIN`."""
+
+	_take_max = False
+
+
+__all__ = [
+	"StreamMA",
+	"StreamEMA",
+	"StreamSTD",
+	"StreamZSCORE",
+	"StreamRSI",
+	"StreamMACD",
+	"StreamBOLL",
+	"StreamATR",
+	"StreamRollingMax",
+	"StreamRollingMin",
+]
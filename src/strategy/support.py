@@ -4,12 +4,19 @@ Provides a per-instance trigger container `TriggerSet` to avoid global
 state collisions when multiple strategies coexist. The legacy global API
 (always/on_bar/run_triggers) remains for backward compatibility by using
 an internal shared TriggerSet.
+
+Conditions may return a bool or a whole boolean Series/array: per-bar
+evaluation (`run`) reads its last element, while `run_batch` evaluates each
+condition once over the full series and returns the rising-edge indices.
+A condition that only returns a bool is re-run in batch mode once per bar on
+the context cut to that bar, which is as slow as the per-bar loop.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Callable, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
+import numpy as np
 import pandas as pd
 
 # Type aliases
@@ -24,14 +31,15 @@ class Trigger:
 	name: Optional[str] = None
 	last_state: bool = field(default=False, init=False)
 
-	def evaluate(self, context: Any) -> None:
-		"""Execute action on rising edge of condition (false -> true)."""
-		current = False
+	def _condition(self, context: Any) -> Any:
 		try:
-			current = bool(self.condition(context))
+			return self.condition(context)
 		except Exception as exc:
 			raise RuntimeError(f"Condition failed for trigger {self.name or ''}: {exc}") from exc
 
+	def evaluate(self, context: Any) -> None:
+		"""Execute action on rising edge of condition (false -> true)."""
+		current = _last_value(self._condition(context))
 		if current and not self.last_state:
 			try:
 				self.action(context)
@@ -39,6 +47,54 @@ class Trigger:
 				raise RuntimeError(f"Action failed for trigger {self.name or ''}: {exc}") from exc
 		self.last_state = current
 
+	def evaluate_batch(self, context: Any) -> np.ndarray:
+		"""Rising-edge positions of the condition over a whole-series context.
+
+		Continues from `last_state` and leaves it at the final element, as if
+		`evaluate` had been called once per bar. Actions are not executed. A
+		condition returning a scalar is evaluated bar by bar instead (see
+		`_bar_contexts`).
+		"""
+		current = np.asarray(self._condition(context), dtype=bool)
+		if current.ndim == 0:
+			current = np.array([_last_value(self._condition(bar)) for bar in _bar_contexts(context, self.name)], dtype=bool)
+		if current.ndim != 1:
+			raise ValueError(f"Batch condition for trigger {self.name or ''} must return a 1-D series, got shape {current.shape}")
+		edges = np.flatnonzero(rising_edge(current, initial=self.last_state))
+		if len(current):
+			self.last_state = bool(current[-1])
+		return edges
+
+
+def _bar_contexts(context: Any, name: Optional[str] = None):
+	"""Per-bar contexts for scalar conditions in batch mode: every Series,
+	DataFrame or 1-D array in a dict context cut to bars [0, i]; other values
+	are passed unchanged."""
+	series = {}
+	if isinstance(context, dict):
+		series = {k: v for k, v in context.items()
+				  if isinstance(v, (pd.Series, pd.DataFrame)) or (isinstance(v, np.ndarray) and v.ndim)}
+	lengths = {len(v) for v in series.values()}
+	if len(lengths) != 1:
+		raise ValueError(
+			f"Batch condition for trigger {name or ''} returned a scalar; per-bar fallback needs a dict context "
+			f"of equal-length series, got {'lengths ' + str(sorted(lengths)) if lengths else 'none'}"
+		)
+	for i in range(lengths.pop()):
+		bar = dict(context)
+		for key, value in series.items():
+			bar[key] = value.iloc[:i + 1] if isinstance(value, (pd.Series, pd.DataFrame)) else value[:i + 1]
+		yield bar
+
+
+def _last_value(result: Any) -> bool:
+	"""A condition's value at the current bar (the last element of a series)."""
+	if isinstance(result, pd.Series):
+		return bool(result.iloc[-1]) if len(result) else False
+	if isinstance(result, np.ndarray) and result.ndim:
+		return bool(result[-1]) if len(result) else False
+	return bool(result)
+
 
 class TriggerSet:
 	"""Container to hold triggers and on-bar actions per strategy instance."""
@@ -62,6 +118,42 @@ class TriggerSet:
 		for trig in list(self._triggers):
 			trig.evaluate(context)
 
+	def reset(self) -> None:
+		"""Forget edge state, as for a fresh strategy instance."""
+		for trig in self._triggers:
+			trig.last_state = False
+
+	def state(self) -> List[bool]:
+		"""Rising-edge flags of the triggers, in registration order (for checkpoints)."""
+		return [trig.last_state for trig in self._triggers]
+
+	def load_state(self, state: List[bool]) -> None:
+		"""Restore flags saved by `state()` on a set with the same triggers."""
+		if len(state) != len(self._triggers):
+			raise ValueError(f"Trigger state has {len(state)} flags for {len(self._triggers)} triggers")
+		for trig, flag in zip(self._triggers, state):
+			trig.last_state = bool(flag)
+
+	def run_batch(self, context: Any, reset: bool = False) -> Dict[str, np.ndarray]:
+		"""Evaluate every trigger over whole series at once.
+
+		`context` holds full-length series instead of per-bar history. Returns
+		trigger name (or "trigger_<i>" when unnamed) -> bar indices where the
+		action would have fired, in registration order. Per-bar `on_bar`
+		actions have no batch form and are rejected.
+		"""
+		if self._on_bar:
+			raise ValueError("run_batch does not support on_bar actions")
+		if reset:
+			self.reset()
+		fired: Dict[str, np.ndarray] = {}
+		for i, trig in enumerate(self._triggers):
+			key = trig.name or f"trigger_{i}"
+			if key in fired:
+				raise ValueError(f"Duplicate trigger name in batch mode: {key}")
+			fired[key] = trig.evaluate_batch(context)
+		return fired
+
 
 # Backward-compatible global trigger set (optional use)
 _GLOBAL_SET = TriggerSet()
@@ -79,6 +171,10 @@ def run_triggers(context: Any) -> None:
 	_GLOBAL_SET.run(context)
 
 
+def run_triggers_batch(context: Any, reset: bool = False) -> Dict[str, np.ndarray]:
+	return _GLOBAL_SET.run_batch(context, reset=reset)
+
+
 def assign(value: Any) -> Any:
 	return value
 
@@ -98,14 +194,42 @@ def crossbelow(a: pd.Series, b: pd.Series) -> pd.Series:
 	return (a < b) & (a.shift(1) >= b.shift(1))
 
 
+def crossabove_value(prev_a: float, prev_b: float, a: float, b: float) -> bool:
+	"""Scalar form of `crossabove` for per-bar strategies (NaN compares False)."""
+	return bool(a > b and prev_a <= prev_b)
+
+
+def crossbelow_value(prev_a: float, prev_b: float, a: float, b: float) -> bool:
+	"""Scalar form of `crossbelow` for per-bar strategies (NaN compares False)."""
+	return bool(a < b and prev_a >= prev_b)
+
+
+def rising_edge(condition, initial: bool = False) -> np.ndarray:
+	"""Vectorized rising-edge detection (false -> true) over a boolean array.
+
+	Mirrors `Trigger.evaluate`: `initial` plays the role of `last_state`
+	before the first element.
+	"""
+	cur = np.asarray(condition, dtype=bool)
+	prev = np.empty_like(cur)
+	if len(cur):
+		prev[0] = initial
+		prev[1:] = cur[:-1]
+	return cur & ~prev
+
+
 __all__ = [
 	"Trigger",
 	"TriggerSet",
 	"always",
 	"on_bar",
 	"run_triggers",
+	"run_triggers_batch",
 	"assign",
 	"assert_stmt",
 	"crossabove",
 	"crossbelow",
+	"crossabove_value",
+	"crossbelow_value",
+	"rising_edge",
 ]
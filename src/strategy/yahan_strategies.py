@@ -1,20 +1,46 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from typing import Dict
 
+from src.portfolio.history import HistoryView
 from src.strategy.calc_lines import CLOSE, MA, MACD
-from src.strategy.support import TriggerSet, crossabove, crossbelow
+from src.strategy.streaming import StreamMA, StreamMACD
+from src.strategy.support import (
+    TriggerSet,
+    crossabove,
+    crossabove_value,
+    crossbelow,
+    crossbelow_value,
+)
 from src.system.log import get_logger
 
 logger = get_logger(__name__)
 
 
+def _price_key(container, symbol: str) -> str | None:
+    """First of `symbol`, "Close", "close" present in a bar, mapping or HistoryView."""
+    for key in (symbol, "Close", "close"):
+        if key in container:
+            return key
+    return None
+
+
+def _bar_price(bar, symbol: str) -> float | None:
+    """Pick the price of `symbol` from a single bar (Series row or mapping)."""
+    key = _price_key(bar, symbol)
+    return None if key is None else bar[key]
+
+
 class SMAStrategy:
     """
     Simple MA crossover strategy using TriggerSet to avoid global state.
     """
 
+    # decide() accepts the engine's HistoryView as well as a DataFrame
+    history_view = True
+
     def __init__(self, symbol: str, short_window: int = 5, long_window: int = 20, qty: int = 100) -> None:
         self.symbol = symbol
         self.short_window = short_window
@@ -30,18 +56,37 @@ class SMAStrategy:
         self._triggers = TriggerSet()
 
         # Register triggers: buy on short crossing above long; sell on short crossing below long.
+        # Conditions return the whole cross series: decide() reads the last bar, order_array() all bars.
         self._triggers.always(
-            lambda ctx: bool(crossabove(ctx["sma_short"], ctx["sma_long"]).iloc[-1]),
+            lambda ctx: crossabove(ctx["sma_short"], ctx["sma_long"]),
             lambda ctx: self._orders.__setitem__(self.symbol, self.qty),
             name="sma_buy_cross",
         )
         self._triggers.always(
-            lambda ctx: bool(crossbelow(ctx["sma_short"], ctx["sma_long"]).iloc[-1]),
+            lambda ctx: crossbelow(ctx["sma_short"], ctx["sma_long"]),
+            lambda ctx: self._orders.__setitem__(self.symbol, -self.qty),
+            name="sma_sell_cross",
+        )
+
+        # Incremental state for on_bar(): rolling means plus the previous bar's values.
+        self._sma_short = StreamMA(short_window)
+        self._sma_long = StreamMA(long_window)
+        self._bar_triggers = TriggerSet()
+        self._bar_triggers.always(
+            lambda ctx: crossabove_value(ctx["prev_short"], ctx["prev_long"], ctx["sma_short"], ctx["sma_long"]),
+            lambda ctx: self._orders.__setitem__(self.symbol, self.qty),
+            name="sma_buy_cross",
+        )
+        self._bar_triggers.always(
+            lambda ctx: crossbelow_value(ctx["prev_short"], ctx["prev_long"], ctx["sma_short"], ctx["sma_long"]),
             lambda ctx: self._orders.__setitem__(self.symbol, -self.qty),
             name="sma_sell_cross",
         )
 
-    def _select_price(self, history: pd.DataFrame) -> pd.Series | None:
+    def _select_price(self, history: pd.DataFrame | HistoryView) -> pd.Series | None:
+        if isinstance(history, HistoryView):
+            key = _price_key(history, self.symbol)
+            return None if key is None else history.series(key)
         if self.symbol in history.columns:
             return CLOSE(history[[self.symbol]].rename(columns={self.symbol: "close"}))
         if "Close" in history.columns:
@@ -50,7 +95,12 @@ class SMAStrategy:
             return history["close"]
         return None
 
-    def decide(self, date: pd.Timestamp, history: pd.DataFrame) -> Dict[str, int]:
+    @property
+    def lookback(self) -> int:
+        """Bars `decide` needs: the longer window plus the previous bar for the cross."""
+        return max(self.short_window, self.long_window) + 1
+
+    def decide(self, date: pd.Timestamp, history: pd.DataFrame | HistoryView) -> Dict[str, int]:
         if history.empty:
             return {}
 
@@ -67,16 +117,58 @@ class SMAStrategy:
         self._triggers.run(ctx)
         return dict(self._orders)
 
+    def on_bar(self, date: pd.Timestamp, bar) -> Dict[str, int]:
+        """Incremental counterpart of `decide`: consume one bar, O(1) work."""
+        price = _bar_price(bar, self.symbol)
+        if price is None:
+            return {}
+
+        ctx = {
+            "prev_short": self._sma_short.value,
+            "prev_long": self._sma_long.value,
+            "sma_short": self._sma_short.update(price),
+            "sma_long": self._sma_long.update(price),
+        }
+
+        self._orders.clear()
+        self._bar_triggers.run(ctx)
+        return dict(self._orders)
+
+    def order_array(self, data: pd.DataFrame) -> np.ndarray:
+        """Vectorized orders over the whole frame (same signals as `decide`)."""
+        orders = np.zeros(len(data), dtype=np.int64)
+        price = self._select_price(data)
+        if price is None or data.empty:
+            return orders
+        ctx = {
+            "sma_short": MA(price, self.short_window),
+            "sma_long": MA(price, self.long_window),
+        }
+        fired = self._triggers.run_batch(ctx, reset=True)
+        # sell trigger runs after buy in decide(), so it wins on the same bar
+        orders[fired["sma_buy_cross"]] = self.qty
+        orders[fired["sma_sell_cross"]] = -self.qty
+        return orders
+
 
 class MACDStrategy:
-    """MACD crossover strategy (MACD line vs signal line)."""
+    """MACD crossover strategy (MACD line vs signal line).
+
+    The EMAs depend on the whole history, so `decide` sees every bar unless
+    `warmup` bounds it; with a warmup of a few times `slow` the truncated
+    EMAs agree with the full-history ones to well within price precision.
+    """
+
+    history_view = True
 
-    def __init__(self, symbol: str, fast: int = 12, slow: int = 26, signal: int = 9, qty: int = 100) -> None:
+    def __init__(self, symbol: str, fast: int = 12, slow: int = 26, signal: int = 9, qty: int = 100,
+                 warmup: int | None = None) -> None:
         self.symbol = symbol
         self.fast = fast
         self.slow = slow
         self.signal = signal
         self.qty = qty
+        self.warmup = warmup
         if fast == 12:
             logger.warning("MACDStrategy: fast uses default=12")
         if slow == 26:
@@ -89,17 +181,34 @@ class MACDStrategy:
         self._triggers = TriggerSet()
 
         self._triggers.always(
-            lambda ctx: bool(crossabove(ctx["macd"], ctx["signal"]).iloc[-1]),
+            lambda ctx: crossabove(ctx["macd"], ctx["signal"]),
             lambda ctx: self._orders.__setitem__(self.symbol, self.qty),
             name="macd_buy_cross",
         )
         self._triggers.always(
-            lambda ctx: bool(crossbelow(ctx["macd"], ctx["signal"]).iloc[-1]),
+            lambda ctx: crossbelow(ctx["macd"], ctx["signal"]),
             lambda ctx: self._orders.__setitem__(self.symbol, -self.qty),
             name="macd_sell_cross",
         )
 
-    def _select_price(self, history: pd.DataFrame) -> pd.Series | None:
+        # Incremental state for on_bar(): streaming MACD keeps the fast/slow/signal EMAs.
+        self._macd = StreamMACD(fast=fast, slow=slow, signal=signal)
+        self._bar_triggers = TriggerSet()
+        self._bar_triggers.always(
+            lambda ctx: crossabove_value(ctx["prev_macd"], ctx["prev_signal"], ctx["macd"], ctx["signal"]),
+            lambda ctx: self._orders.__setitem__(self.symbol, self.qty),
+            name="macd_buy_cross",
+        )
+        self._bar_triggers.always(
+            lambda ctx: crossbelow_value(ctx["prev_macd"], ctx["prev_signal"], ctx["macd"], ctx["signal"]),
+            lambda ctx: self._orders.__setitem__(self.symbol, -self.qty),
+            name="macd_sell_cross",
+        )
+
+    def _select_price(self, history: pd.DataFrame | HistoryView) -> pd.Series | None:
+        if isinstance(history, HistoryView):
+            key = _price_key(history, self.symbol)
+            return None if key is None else history.series(key)
         if self.symbol in history.columns:
             return CLOSE(history[[self.symbol]].rename(columns={self.symbol: "close"}))
         if "Close" in history.columns:
@@ -108,7 +217,12 @@ class MACDStrategy:
             return history["close"]
         return None
 
-    def decide(self, date: pd.Timestamp, history: pd.DataFrame) -> Dict[str, int]:
+    @property
+    def lookback(self) -> int | None:
+        """Bars `decide` needs: `warmup` when given, otherwise the full history."""
+        return self.warmup
+
+    def decide(self, date: pd.Timestamp, history: pd.DataFrame | HistoryView) -> Dict[str, int]:
         if history.empty:
             return {}
 
@@ -126,10 +240,45 @@ class MACDStrategy:
         self._triggers.run(ctx)
         return dict(self._orders)
 
+    def on_bar(self, date: pd.Timestamp, bar) -> Dict[str, int]:
+        """Incremental counterpart of `decide`: consume one bar, O(1) work."""
+        price = _bar_price(bar, self.symbol)
+        if price is None:
+            return {}
+
+        prev = self._macd.value
+        cur = self._macd.update(price)
+        ctx = {
+            "prev_macd": prev["macd"],
+            "prev_signal": prev["signal"],
+            "macd": cur["macd"],
+            "signal": cur["signal"],
+        }
+
+        self._orders.clear()
+        self._bar_triggers.run(ctx)
+        return dict(self._orders)
+
+    def order_array(self, data: pd.DataFrame) -> np.ndarray:
+        """Vectorized orders over the whole frame (same signals as `decide`)."""
+        orders = np.zeros(len(data), dtype=np.int64)
+        price = self._select_price(data)
+        if price is None or data.empty:
+            return orders
+        macd_df = MACD(price, fast=self.fast, slow=self.slow, signal=self.signal)
+        fired = self._triggers.run_batch({"macd": macd_df["macd"], "signal": macd_df["signal"]}, reset=True)
+        orders[fired["macd_buy_cross"]] = self.qty
+        orders[fired["macd_sell_cross"]] = -self.qty
+        return orders
+
 
 class BuyAndHoldStrategy:
     """Use initial cash to buy as many shares as possible on the first bar, then hold."""
 
+    # decide() only reads the current bar, from a DataFrame or HistoryView
+    lookback = 1
+    history_view = True
+
     def __init__(self, symbol: str, initial_cash: float = 1_000_000.0, commission: float = 0.0, slippage: float = 0.0) -> None:
         self.symbol = symbol
         self.initial_cash = initial_cash
@@ -143,12 +292,17 @@ class BuyAndHoldStrategy:
         if slippage == 0.0:
             logger.warning("BuyAndHoldStrategy: slippage uses default=0")
 
-    def decide(self, date: pd.Timestamp, history: pd.DataFrame) -> Dict[str, int]:
+    def decide(self, date: pd.Timestamp, history: pd.DataFrame | HistoryView) -> Dict[str, int]:
         if self._bought or history.empty:
             return {}
 
         # Use the latest close (first bar when called) to size maximum purchasable shares
-        if self.symbol in history.columns:
+        if isinstance(history, HistoryView):
+            key = _price_key(history, self.symbol)
+            if key is None:
+                return {}
+            px = history.last(key)
+        elif self.symbol in history.columns:
             px = CLOSE(history[[self.symbol]].rename(columns={self.symbol: "close"})).iloc[-1]
         elif "Close" in history.columns:
             px = history["Close"].iloc[-1]
@@ -166,4 +320,76 @@ class BuyAndHoldStrategy:
             return {}
 
         self._bought = True
-        return {self.symbol: qty}
\ No newline at end of file
+        return {self.symbol: qty}
+
+    def on_bar(self, date: pd.Timestamp, bar) -> Dict[str, int]:
+        """Incremental counterpart of `decide`: only the current bar is needed."""
+        if self._bought:
+            return {}
+        px = _bar_price(bar, self.symbol)
+        if px is None:
+            return {}
+
+        effective_price = px * (1 + self.slippage) * (1 + self.commission)
+        if effective_price <= 0:
+            return {}
+
+        qty = int(self.initial_cash // effective_price)
+        if qty <= 0:
+            return {}
+
+        self._bought = True
+        return {self.symbol: qty}
+
+    def order_array(self, data: pd.DataFrame) -> np.ndarray:
+        """Vectorized orders: buy on the first bar where a purchase is possible."""
+        orders = np.zeros(len(data), dtype=np.int64)
+        if data.empty:
+            return orders
+        if self.symbol in data.columns:
+            px = CLOSE(data[[self.symbol]].rename(columns={self.symbol: "close"}))
+        elif "Close" in data.columns:
+            px = data["Close"]
+        elif "close" in data.columns:
+            px = data["close"]
+        else:
+            return orders
+
+        effective_price = px.to_numpy(dtype=float) * (1 + self.slippage) * (1 + self.commission)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            qty = np.where(effective_price > 0, np.floor_divide(self.initial_cash, effective_price), 0)
+        candidates = np.flatnonzero(qty > 0)
+        if len(candidates):
+            orders[candidates[0]] = int(qty[candidates[0]])
+        return orders
+
+
+class PanelSMAStrategy:
+    """SMA crossover applied to every symbol of an aligned price panel.
+
+    Indicators are computed once over the dates x symbols close matrix in
+    `prepare`; `decide_panel` then only reads one row per bar.
+    """
+
+    def __init__(self, symbols: list[str], short_window: int = 5, long_window: int = 20, qty: int = 100) -> None:
+        self.symbols = list(symbols)
+        self.short_window = short_window
+        self.long_window = long_window
+        self.qty = qty
+        self._orders = np.zeros((0, len(self.symbols)), dtype=np.int64)
+
+    def prepare(self, panel) -> None:
+        close = pd.DataFrame(panel["Close"], index=panel.dates, columns=panel.symbols)
+        sma_short = MA(close, self.short_window)
+        sma_long = MA(close, self.long_window)
+        buy = crossabove(sma_short, sma_long).to_numpy(dtype=bool)
+        sell = crossbelow(sma_short, sma_long).to_numpy(dtype=bool)
+        orders = np.where(buy, self.qty, 0)
+        orders[sell] = -self.qty
+        # keep only the symbols this strategy was configured with
+        cols = [panel.column(sym) for sym in self.symbols]
+        self._orders = np.zeros(panel.shape, dtype=np.int64)
+        self._orders[:, cols] = orders[:, cols]
+
+    def decide_panel(self, i: int, panel) -> np.ndarray:
+        return self._orders[i]
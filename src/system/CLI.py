@@ -13,6 +13,7 @@ Commands:
     help, h, ?       Show this help
     config, cfg      Show or set configuration
     backtest, bt     Run a backtest
+    sweep, sw        Run a parameter sweep over a task
     plot, pt         Plot cached OHLC data
     exit, quit, q    Exit the CLI
 
@@ -56,15 +57,20 @@ def interactive_loop() -> int:
             return 0
         
         if cmd in ("backtest", "bt"):
-            from src.backtest.engine import run_task
+            from src.backtest.engine import execute_task
             if not args:
-                print("Usage: backtest TASK_NAME (without .json, from tasks folder)")
+                print("Usage: backtest TASK_NAME [-recompute] [-profile] [-resume] (without .json, from tasks folder)")
                 continue
             task_name = args[0]
             try:
-                curve = run_task(task_name)
-                final = curve.iloc[-1]
-                print(f"Backtest done.")
+                result = execute_task(
+                    task_name,
+                    recompute="-recompute" in args[1:],
+                    profile=True if "-profile" in args[1:] else None,
+                    resume="-resume" in args[1:],
+                )
+                final = result.curve.iloc[-1]
+                print("Backtest done (cached result)." if result.cached else f"Backtest done, writing results to {result.run_dir}")
                 print(f"  Final equity: {final['equity']:.2f}")
                 print(f"  Cash: {final['cash']:.2f}")
                 print(f"  Position value: {final['position_value']:.2f}")
@@ -74,6 +80,31 @@ def interactive_loop() -> int:
                 print(f"Backtest failed: {e}")
             continue
 
+        if cmd in ("sweep", "sw"):
+            from src.backtest.sweep import run_sweep, summarize_workers
+            if not args:
+                print("Usage: sweep TASK_NAME [-processes N] [-recompute] [-resume] (grid from the task's \"sweep\" block)")
+                continue
+            task_name = args[0]
+            processes = None
+            if "-processes" in args[1:]:
+                pos = args.index("-processes")
+                try:
+                    processes = int(args[pos + 1])
+                except (IndexError, ValueError):
+                    print("Invalid -processes value, expected an integer")
+                    continue
+            try:
+                results = run_sweep(task_name, processes=processes, recompute="-recompute" in args[1:],
+                                    resume="-resume" in args[1:])
+                print(f"Sweep done: {len(results)} combinations in {results.attrs.get('wall_s', 0.0):.2f}s")
+                print(results.head(10).to_string(index=False))
+                print(summarize_workers(results).to_string(index=False))
+            except Exception as e:
+                logger.exception("Sweep failed: %s", e)
+                print(f"Sweep failed: {e}")
+            continue
+
         if cmd in ("config", "cfg"):
             logger.info("User requested config command (not implemented)")
             print("Config command is not implemented yet.")
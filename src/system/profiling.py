@@ -0,0 +1,176 @@
+"""Opt-in phase timers and counters for finding where a run spends its time.
+
+Profiling is off by default: `phase()` then returns a shared no-op context,
+`count()` returns immediately, and `instrument()` hands back the original
+callable, so hot loops pay nothing. Inside `profiling()` every call is
+recorded on the active `Profiler`, whose report can be saved as JSON
+(`profile.json`) next to an optional cProfile dump.
+
+    with profiling(cprofile=True) as prof:
+        ...
+    prof.write(run_dir / "profile.json")
+    prof.write_cprofile(run_dir / "profile.prof")
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+_ACTIVE: "Profiler | None" = None
+_NULL = nullcontext()
+
+
+class Profiler:
+    """Accumulates wall time per named phase and integer counters."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.stopped: float | None = None
+        self.cprofile: cProfile.Profile | None = None
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stat = self.phases.get(name)
+            if stat is None:
+                self.phases[name] = {"calls": 1, "total_s": seconds, "max_s": seconds}
+            else:
+                stat["calls"] += 1
+                stat["total_s"] += seconds
+                if seconds > stat["max_s"]:
+                    stat["max_s"] = seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        """Return `fn` timed under `name` on every call."""
+        add = self.add
+        clock = time.perf_counter
+
+        @functools.wraps(fn)
+        def timed_call(*args, **kwargs):
+            t0 = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                add(name, clock() - t0)
+
+        return timed_call
+
+    def report(self) -> Dict[str, Any]:
+        end = self.stopped if self.stopped is not None else time.perf_counter()
+        with self._lock:
+            phases = {
+                name: {**stat, "mean_s": stat["total_s"] / stat["calls"]}
+                for name, stat in sorted(self.phases.items(), key=lambda kv: -kv[1]["total_s"])
+            }
+            return {"wall_s": end - self.started, "phases": phases, "counters": dict(self.counters)}
+
+    def write(self, path: Path) -> Path:
+        path = Path(path)
+        with path.open('w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        logger.info("Saved profile report to %s", path)
+        return path
+
+    def write_cprofile(self, path: Path) -> Path | None:
+        """Dump cProfile stats (readable with `python -m pstats`) if collected."""
+        if self.cprofile is None:
+            return None
+        self.cprofile.dump_stats(str(path))
+        logger.info("Saved cProfile stats to %s", path)
+        return Path(path)
+
+
+def active() -> Profiler | None:
+    """The profiler currently collecting, or None when profiling is off."""
+    return _ACTIVE
+
+
+def phase(name: str):
+    """Context manager timing a block under `name` (no-op when off)."""
+    prof = _ACTIVE
+    return _NULL if prof is None else prof.phase(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    prof = _ACTIVE
+    if prof is not None:
+        prof.count(name, n)
+
+
+def instrument(name: str, fn: Callable) -> Callable:
+    """`fn` timed per call when profiling is on, else `fn` itself.
+
+    Resolve once before a loop so the per-iteration cost is zero when off.
+    """
+    prof = _ACTIVE
+    return fn if prof is None else prof.wrap(name, fn)
+
+
+def timed(name: str):
+    """Decorator: time each call of the function under `name` while profiling is on."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            prof = _ACTIVE
+            if prof is None:
+                return fn(*args, **kwargs)
+            with prof.phase(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def profiling(enabled: bool = True, cprofile: bool = False):
+    """Activate a Profiler for the block; yields it (or None when disabled).
+
+    cprofile: also run cProfile over the block (calling thread only); save it
+    afterwards with `Profiler.write_cprofile`.
+    """
+    global _ACTIVE
+    if not enabled:
+        yield None
+        return
+    prof = Profiler()
+    previous, _ACTIVE = _ACTIVE, prof
+    if cprofile:
+        prof.cprofile = cProfile.Profile()
+        prof.cprofile.enable()
+    try:
+        yield prof
+    finally:
+        if prof.cprofile is not None:
+            prof.cprofile.disable()
+        prof.stopped = time.perf_counter()
+        _ACTIVE = previous
+
+
+__all__ = ["Profiler", "active", "count", "instrument", "phase", "profiling", "timed"]
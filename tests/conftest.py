@@ -0,0 +1,18 @@
+import pytest
+
+from src.data.synthetic import generate_ohlcv
+
+
+@pytest.fixture
+def prices():
+    """Factory for deterministic random-walk price frames (see `generate_ohlcv`).
+
+    prices(n, seed=0, freq='B', start='2022-01-03', columns=('Close',)) keeps
+    only `columns`; pass columns=None for the full OHLCV frame.
+    """
+
+    def make(n=200, seed=0, freq='B', start='2022-01-03', columns=('Close',), start_price=10.0, volatility=0.02):
+        frame = generate_ohlcv(n, freq=freq, start=start, seed=seed, start_price=start_price, volatility=volatility)
+        return frame if columns is None else frame[list(columns)]
+
+    return make
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.portfolio.manager import ArrayPortfolioManager, RecordBuffer, run_backtest
+from src.strategy.yahan_strategies import MACDStrategy, SMAStrategy
+
+
+def test_record_buffer_grows_and_extends():
+    buf = RecordBuffer(np.dtype([('a', 'i8'), ('b', 'f8')]), capacity=2)
+    for i in range(5):
+        buf.append(i, i * 0.5)
+    buf.extend(a=np.array([10, 11]), b=np.array([1.0, 2.0]))
+    assert len(buf) == 7
+    assert list(buf.data['a']) == [0, 1, 2, 3, 4, 10, 11]
+    assert buf.data['b'][-1] == 2.0
+
+
+def test_array_portfolio_vector_orders():
+    pm = ArrayPortfolioManager(['A', 'B', 'C'], cash=1000.0, commission=0.01)
+    n = pm.apply_order_vector(np.array([2, 0, -1]), np.array([10.0, 5.0, np.nan]), bar=0)
+    assert n == 1
+    assert list(pm.positions) == [2, 0, 0]
+    assert pm.cash == pytest.approx(1000.0 - 20.0 - 0.2)
+    assert pm.snapshot().positions == {'A': 2}
+    trades = pm.fills_frame(pd.date_range('2020-01-01', periods=1))
+    assert list(trades.columns) == ['date', 'symbol', 'qty', 'price', 'fee', 'side']
+
+
+@pytest.mark.parametrize('make_strategy', [
+    lambda: SMAStrategy('ABC', short_window=3, long_window=12, qty=10),
+    lambda: MACDStrategy('ABC', fast=6, slow=13, signal=5, qty=10),
+])
+def test_compact_mode_matches_default(make_strategy, prices):
+    df = prices(200, seed=21)
+    curve, trades = run_backtest(make_strategy(), df, commission=0.001, slippage=0.001, initial_cash=5_000.0)
+    curve_c, trades_c = run_backtest(make_strategy(), df, commission=0.001, slippage=0.001, initial_cash=5_000.0, compact=True)
+    pd.testing.assert_frame_equal(curve, curve_c)
+    pd.testing.assert_frame_equal(trades, trades_c)
+
+
+class _Alternate:
+    """Buys on even bars and sells on odd ones, whatever the price."""
+
+    symbol = 'ABC'
+
+    def on_bar(self, date, bar):
+        self.n = getattr(self, 'n', -1) + 1
+        return {self.symbol: 3 if self.n % 2 == 0 else -2}
+
+
+def test_compact_mode_matches_default_on_nan_bar(prices):
+    df = prices(40, seed=21)
+    df.iloc[[10, 11, 25], 0] = np.nan
+    curve, trades = run_backtest(_Alternate(), df, commission=0.001, slippage=0.001, initial_cash=5_000.0)
+    curve_c, trades_c = run_backtest(_Alternate(), df, commission=0.001, slippage=0.001, initial_cash=5_000.0, compact=True)
+    pd.testing.assert_frame_equal(curve, curve_c)
+    pd.testing.assert_frame_equal(trades, trades_c)
+    # no fills at the NaN bars, and cash stays finite after them
+    assert len(trades) == len(df) - 3
+    assert np.isfinite(curve['cash']).all()
@@ -0,0 +1,72 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from src.backtest.artifacts import ArtifactWriter, format_trades, write_run_artifacts
+
+
+def _trades():
+    return pd.DataFrame({
+        'date': [pd.Timestamp('2022-01-03 15:00'), pd.Timestamp('2022-01-05')],
+        'symbol': ['ABC', 'ABC'],
+        'side': ['BUY', 'SELL'],
+        'qty': [10, 10],
+        'price': [10.123456, 11.0],
+        'fee': [0.104, 0.115],
+    })
+
+
+def test_format_trades_matches_row_by_row_output():
+    trades = _trades()
+    expected = [
+        f"{pd.to_datetime(r['date']).date()}: {r['side']} {r['symbol']} qty={r['qty']} price={r['price']:.4f} fee={r['fee']:.2f}"
+        for _, r in trades.iterrows()
+    ]
+    assert format_trades(trades).tolist() == expected
+
+
+def test_writer_reports_failures_and_keeps_running():
+    writer = ArtifactWriter(max_pending=2)
+
+    def boom():
+        raise OSError("disk full")
+
+    bad = writer.submit(boom)
+    good = writer.submit(lambda: 42)
+    assert good.result(timeout=5) == 42
+    with pytest.raises(OSError):
+        bad.result(timeout=5)
+    writer.close()
+
+
+def test_bounded_queue_blocks_submitter():
+    writer = ArtifactWriter(max_pending=1)
+    gate = threading.Event()
+    writer.submit(gate.wait)  # occupies the worker
+    writer.submit(lambda: None)  # fills the queue
+    third = threading.Thread(target=writer.submit, args=(lambda: None,))
+    third.start()
+    third.join(timeout=0.2)
+    assert third.is_alive()
+    gate.set()
+    third.join(timeout=5)
+    assert not third.is_alive()
+    writer.close()
+
+
+def test_write_run_artifacts(tmp_path):
+    run_dir = tmp_path / "run"
+    run_dir.mkdir()
+    curve = pd.DataFrame(
+        {'equity': [100.0, 101.0], 'cash': [100.0, 50.0], 'position_value': [0.0, 51.0]},
+        index=pd.date_range('2022-01-03', periods=2),
+    )
+    writer = ArtifactWriter()
+    handle = write_run_artifacts(run_dir, curve, _trades(), "ABC", {"symbol": "ABC", "final_equity": 101.0}, writer=writer)
+    assert handle.wait(timeout=30) == {}
+    assert handle.done()
+    assert (run_dir / "trades.txt").read_text(encoding='utf-8').splitlines()[0].startswith("2022-01-03: BUY ABC qty=10")
+    assert (run_dir / "equity_plot.png").stat().st_size > 0
+    assert (tmp_path / "leaderboard.csv").read_text(encoding='utf-8').startswith("symbol,final_equity")
+    writer.close()
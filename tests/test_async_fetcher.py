@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.data import async_fetcher, fetcher, ratelimit, storage
+from src.data.adapters import synthetic_adapter
+from src.data.exceptions import AdapterError
+from src.data.frame_cache import frame_cache
+from src.data.synthetic import random_walk_ohlcv
+
+FULL = random_walk_ohlcv(pd.date_range('2020-01-01', '2020-12-31', freq='B'), symbol='ABC', seed=11)
+
+
+class BlockingAdapter:
+    """Sync-only adapter: records the ranges and the thread each call ran on."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+
+    def fetch(self, symbol, start, end, interval='1d', adjusted=True, **kwargs):
+        self.calls.append((symbol, start, end, threading.current_thread().name))
+        if symbol in self.fail:
+            raise AdapterError(f'no such symbol {symbol}')
+        df = FULL
+        if start:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end:
+            df = df[df.index <= pd.Timestamp(end)]
+        return df
+
+
+@pytest.fixture
+def tmp_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'CACHE_DIR', str(tmp_path))
+    ratelimit.reset_rate_limiters()
+    with frame_cache() as cache:
+        yield cache
+    ratelimit.reset_rate_limiters()
+
+
+def test_sync_adapters_are_offloaded_to_threads(tmp_cache, monkeypatch):
+    adapter = BlockingAdapter()
+    monkeypatch.setattr(fetcher, 'select_adapter', lambda name: adapter)
+    df = asyncio.run(async_fetcher.get_history('ABC', '2020-03-02', '2020-06-30', source='fake'))
+    pd.testing.assert_frame_equal(df, FULL.loc['2020-03-02':'2020-06-30'], check_freq=False)
+    assert adapter.calls[0][3] != threading.main_thread().name
+
+
+def test_shares_the_cache_logic_with_the_sync_fetcher(tmp_cache, monkeypatch):
+    adapter = BlockingAdapter()
+    monkeypatch.setattr(fetcher, 'select_adapter', lambda name: adapter)
+    asyncio.run(async_fetcher.get_history('ABC', '2020-03-02', '2020-06-30', source='fake', memory_cache=False))
+    wide = asyncio.run(async_fetcher.get_history('ABC', '2020-01-02', '2020-09-30', source='fake', memory_cache=False))
+    assert [c[1:3] for c in adapter.calls[1:]] == [('2020-01-02', '2020-03-02'), ('2020-06-30', '2020-09-30')]
+    pd.testing.assert_frame_equal(wide, FULL.loc['2020-01-02':'2020-09-30'], check_freq=False)
+
+    # the sync fetcher reads what the coroutine cached
+    sync = fetcher.get_history('ABC', '2020-02-03', '2020-08-31', source='fake', memory_cache=False)
+    assert len(adapter.calls) == 3
+    pd.testing.assert_frame_equal(sync, wide.loc['2020-02-03':'2020-08-31'])
+
+
+def test_latency_overlaps_on_one_event_loop(tmp_cache):
+    symbols = ['S%d' % i for i in range(10)]
+    kwargs = dict(source='synthetic', cache=False, latency=0.2)
+    t0 = time.perf_counter()
+    results, errors = asyncio.run(async_fetcher.get_history_many(symbols, '2021-01-04', '2021-03-31', **kwargs))
+    elapsed = time.perf_counter() - t0
+    assert not errors and list(results) == symbols
+    assert elapsed < 1.0  # serial would take 2s
+    expected = synthetic_adapter.fetch('S3', '2021-01-04', '2021-03-31')
+    pd.testing.assert_frame_equal(results['S3'], expected)
+
+
+def test_many_collects_errors_per_symbol(tmp_cache, monkeypatch):
+    adapter = BlockingAdapter(fail={'BAD'})
+    monkeypatch.setattr(fetcher, 'select_adapter', lambda name: adapter)
+    results, errors = asyncio.run(async_fetcher.get_history_many(['A', 'BAD', 'B'], '2020-02-03', '2020-03-31', source='fake'))
+    assert sorted(results) == ['A', 'B']
+    assert list(errors) == ['BAD'] and isinstance(errors['BAD'], AdapterError)
+
+
+def test_async_token_bucket_does_not_block_the_loop():
+    bucket = ratelimit.TokenBucket(rate=20.0, burst=1)
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        waits = await asyncio.gather(bucket.acquire_async(), bucket.acquire_async(), ticker())
+        return waits[:2], ticks
+
+    waits, ticks = asyncio.run(main())
+    assert sorted(waits)[0] == 0.0 and sorted(waits)[1] == pytest.approx(0.05, abs=0.02)
+    # the waiting acquire yielded to the ticker instead of sleeping the thread
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.04
@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.portfolio.manager import run_backtest
+from src.strategy import backends, calc_lines as cl, loop_kernels
+from src.strategy.backends import get_backend, use_backend
+from src.strategy.expr import ExprStrategy
+from src.strategy.indicator_cache import indicator_cache
+from src.strategy.yahan_strategies import MACDStrategy, SMAStrategy
+
+ARRAY_BACKENDS = ['numpy'] + (['numba'] if backends.HAVE_NUMBA else [])
+
+
+def _close(n=1500, seed=4, flat=True):
+    rng = np.random.default_rng(seed)
+    x = 50.0 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    x[40:47] = np.nan
+    if flat:
+        x[n // 2:n // 2 + 30] = x[n // 2]
+    idx = pd.date_range('2021-01-01', periods=n, freq='h')
+    return pd.Series(x, index=idx, name='Close')
+
+
+# indicators the array backends reproduce exactly: shifts, extrema and the EWM recursion
+EXACT = {
+    'LAG': lambda s: cl.LAG(s, 3),
+    'DIFF': lambda s: cl.DIFF(s, 2),
+    'ROLLING_MAX': lambda s: cl.ROLLING_MAX(s, 10),
+    'ROLLING_MIN': lambda s: cl.ROLLING_MIN(s, 10),
+    'EMA': lambda s: cl.EMA(s, 12),
+    'RSI': lambda s: cl.RSI(s, 14),
+    'MACD': lambda s: cl.MACD(s, 12, 26, 9),
+}
+# window moments: exact under numba; under numpy checked against direct sums (test_numpy_windows_match_direct_sums)
+WINDOWED = {
+    'MA': lambda s: cl.MA(s, 20),
+    'MA1': lambda s: cl.MA(s, 1),
+    'STD': lambda s: cl.STD(s, 20),
+    'ZSCORE': lambda s: cl.ZSCORE(s, 20),
+    'BOLL': lambda s: cl.BOLL(s, 20, 2.0),
+}
+
+
+def _check(expected, actual, exact):
+    if exact:
+        assert type(actual) is type(expected)
+        if isinstance(expected, pd.DataFrame):
+            pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+        else:
+            pd.testing.assert_series_equal(actual, expected, check_exact=True)
+    elif isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-9, atol=1e-9)
+    else:
+        pd.testing.assert_series_equal(actual, expected, check_exact=False, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('backend', ARRAY_BACKENDS)
+@pytest.mark.parametrize('name', list(EXACT) + list(WINDOWED))
+def test_indicators_match_pandas(backend, name):
+    fn = EXACT.get(name) or WINDOWED[name]
+    exact = name in EXACT or backend == 'numba'
+    # pandas leaves rounding noise in a window that has just gone flat, where numpy is exactly 0
+    close = _close(flat=exact)
+    frame = pd.DataFrame({'a': close, 'b': 1.5 * close + 3.0}, index=close.index)
+    expected = fn(close)
+    with use_backend(backend):
+        actual = fn(close)
+        raw = fn(close.to_numpy())
+    _check(expected, actual, exact)
+    if isinstance(expected, pd.DataFrame):
+        assert isinstance(raw, dict) and list(raw) == list(expected.columns)
+        _check(expected, pd.DataFrame(raw, index=close.index), exact)
+    else:
+        assert isinstance(raw, np.ndarray)
+        _check(expected, pd.Series(raw, index=close.index, name='Close'), exact)
+        if name != 'RSI':
+            with use_backend(backend):
+                actual_frame = fn(frame)
+            _check(fn(frame), actual_frame, exact)
+
+
+def _direct(x, window):
+    """Trailing mean and sample std summed window by window, measured from each
+    window's minimum so a flat window is exactly zero (min_periods=1, NaNs skipped)."""
+    win = sliding_window_view(np.concatenate([np.full(window - 1, np.nan), x]), window)
+    base = np.fmin.reduce(win, axis=1)
+    dev = win - base[:, None]
+    count = (~np.isnan(win)).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        local = np.nansum(dev, axis=1) / count
+        std = np.sqrt(np.nansum((dev - local[:, None]) ** 2, axis=1) / (count - 1))
+    std[count < 2] = np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        zscore = (x - base - local) / np.where(std == 0, np.nan, std)
+    return local + base, std, zscore
+
+
+def _direct_boll(x, window, k):
+    mid, std, _ = _direct(x, window)
+    return {'mid': mid, 'upper': mid + k * std, 'lower': mid - k * std}
+
+
+DIRECT = {
+    'MA': lambda x: _direct(x, 20)[0],
+    'MA1': lambda x: _direct(x, 1)[0],
+    'STD': lambda x: _direct(x, 20)[1],
+    'ZSCORE': lambda x: _direct(x, 20)[2],
+    'BOLL': lambda x: _direct_boll(x, 20, 2.0),
+}
+
+
+def _check_direct(expected, actual, rtol, atol):
+    if isinstance(expected, dict):
+        assert list(actual) == list(expected)
+        for key in expected:
+            np.testing.assert_allclose(np.asarray(actual[key]), expected[key], rtol=rtol, atol=atol)
+    else:
+        np.testing.assert_allclose(np.asarray(actual), expected, rtol=rtol, atol=atol)
+
+
+@pytest.mark.parametrize('name', list(WINDOWED))
+def test_numpy_windows_match_direct_sums(name):
+    # flat run included: pandas' running variance leaves ~1e-6 there, numpy must be exactly 0
+    close = _close()
+    x = close.to_numpy()
+    expected = DIRECT[name](x)
+    with use_backend('numpy'):
+        raw = WINDOWED[name](x)
+        actual = WINDOWED[name](close)
+    _check_direct(expected, raw, 1e-10, 1e-12)
+    _check_direct(expected, actual, 1e-10, 1e-12)
+    if name == 'STD':
+        flat = slice(len(x) // 2 + 19, len(x) // 2 + 30)
+        assert (raw[flat] == 0.0).all() and (cl.STD(close, 20).iloc[flat] > 0.0).all()
+
+
+@pytest.mark.parametrize('level', [1e3, 1e6, 1e9])
+@pytest.mark.parametrize('window', [2, 3, 20])
+def test_numpy_windows_at_high_price_level(level, window):
+    # a high level moving in cents: sums of squares cancel unless the kernel stays local
+    rng = np.random.default_rng(11)
+    x = level + np.round(np.cumsum(rng.normal(0, 0.01, 3000)), 2)
+    x[500:505] = np.nan
+    x[1500:1540] = x[1500]
+    mean, std, zscore = _direct(x, window)
+    with use_backend('numpy'):
+        np.testing.assert_allclose(cl.MA(x, window), mean, rtol=1e-13)
+        np.testing.assert_allclose(cl.STD(x, window), std, rtol=1e-9)
+        np.testing.assert_allclose(cl.ZSCORE(x, window), zscore, rtol=1e-8, atol=1e-8)
+        assert (cl.STD(x, window)[1500 + window - 1:1540] == 0.0).all()
+
+
+@pytest.mark.parametrize('backend', ARRAY_BACKENDS)
+def test_atr_matches_pandas(backend):
+    close = _close()
+    high, low = close * 1.01, close * 0.985
+    expected = cl.ATR(high, low, close, 14)
+    with use_backend(backend):
+        actual = cl.ATR(high, low, close, 14)
+    _check(expected, actual, backend == 'numba')
+
+
+def test_ndarray_inputs_on_pandas_backend():
+    close = _close(240)
+    assert get_backend() == 'pandas'
+    np.testing.assert_array_equal(cl.MA(close.to_numpy(), 5), cl.MA(close, 5).to_numpy())
+    boll = cl.BOLL(close.to_numpy(), 10)
+    np.testing.assert_array_equal(boll['upper'], cl.BOLL(close, 10)['upper'].to_numpy())
+
+
+@pytest.mark.parametrize('window', [1, 2, 7, 50])
+def test_loop_kernels_are_bit_identical_to_pandas(window):
+    # run uncompiled when numba is absent: same algorithm, same rounding
+    x = _close(600).to_numpy().copy()
+    x[100:105] = -x[100:105]
+    s = pd.Series(x)
+    np.testing.assert_array_equal(loop_kernels.rolling_mean(x, window), s.rolling(window, min_periods=1).mean().to_numpy())
+    np.testing.assert_array_equal(loop_kernels.rolling_std(x, window), s.rolling(window, min_periods=1).std().to_numpy())
+    com = (window - 1) / 2
+    np.testing.assert_array_equal(loop_kernels.ewm_mean(x, com), s.ewm(com=com, adjust=False).mean().to_numpy())
+
+
+def test_backend_selection():
+    with pytest.raises(ValueError):
+        backends.set_backend('cuda')
+    with use_backend('numpy') as active:
+        assert active == get_backend() == 'numpy'
+    assert get_backend() == 'pandas'
+    if not backends.HAVE_NUMBA:
+        assert backends.resolve_backend('numba') == 'numpy'
+        assert 'numba' not in backends.available_backends()
+
+
+def test_indicator_cache_is_per_backend():
+    close = _close(300)
+    with indicator_cache() as cache:
+        cl.MA(close, 5)
+        with use_backend('numpy'):
+            cl.MA(close, 5)
+        cl.MA(close, 5)
+    assert cache.misses == 2 and cache.hits == 1
+
+
+@pytest.mark.parametrize('backend', ARRAY_BACKENDS)
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('make_strategy', [
+    lambda: SMAStrategy('ABC', short_window=5, long_window=20, qty=10),
+    lambda: MACDStrategy('ABC', fast=6, slow=15, signal=5, qty=10),
+    lambda: ExprStrategy('ABC', buy='crossabove(EMA(CLOSE, 5), MA(CLOSE, 15))', sell='RSI(CLOSE, 7) > 70', qty=10),
+])
+def test_backtest_identical_across_backends(make_strategy, compact, backend):
+    close = _close(400).ffill()
+    df = pd.DataFrame({'Close': close, 'Volume': np.arange(len(close))}, index=close.index)
+    ref_curve, ref_trades = run_backtest(make_strategy(), df, 0.001, 0.001, 10_000.0, compact=compact)
+    with use_backend(backend):
+        curve, trades = run_backtest(make_strategy(), df, 0.001, 0.001, 10_000.0, compact=compact)
+    pd.testing.assert_frame_equal(curve, ref_curve)
+    pd.testing.assert_frame_equal(trades, ref_trades)
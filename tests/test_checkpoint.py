@@ -0,0 +1,107 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from src.backtest.checkpoint import Checkpointer, CheckpointError
+from src.portfolio.manager import run_backtest
+from src.strategy.expr import ExprStrategy
+from src.strategy.support import TriggerSet
+from src.strategy.yahan_strategies import MACDStrategy, SMAStrategy
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _crashing(base, decide_only=False):
+    """Subclass of `base` that raises at the bar `crash_at` (a class attribute)."""
+
+    class Crashing(base):
+        crash_at = None
+
+        def _check(self, date):
+            if date == type(self).crash_at:
+                raise Interrupted
+
+        def on_bar(self, date, bar):
+            self._check(date)
+            return super().on_bar(date, bar)
+
+        def decide(self, date, history):
+            self._check(date)
+            return super().decide(date, history)
+
+    if decide_only:
+        Crashing.on_bar = None
+    return Crashing
+
+
+STRATEGIES = [
+    (SMAStrategy, dict(symbol='ABC', short_window=4, long_window=15, qty=10), False),
+    (SMAStrategy, dict(symbol='ABC', short_window=4, long_window=15, qty=10), True),
+    (MACDStrategy, dict(symbol='ABC', fast=5, slow=13, signal=4, qty=10), False),
+    (ExprStrategy, dict(symbol='ABC', buy='crossabove(EMA(CLOSE, 4), MA(CLOSE, 12))',
+                        sell='RSI(CLOSE, 6) > 70', qty=10), False),
+]
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('base, params, decide_only', STRATEGIES)
+def test_resume_matches_uninterrupted_run(tmp_path, base, params, decide_only, compact, prices):
+    df = prices(400, seed=9, freq='h', start='2020-01-01')
+    cls = _crashing(base, decide_only)
+    ref_curve, ref_trades = run_backtest(cls(**params), df, 0.001, 0.001, 10_000.0, compact=compact)
+
+    path = tmp_path / 'run.ckpt'
+    cls.crash_at = df.index[237]
+    try:
+        with pytest.raises(Interrupted):
+            run_backtest(cls(**params), df, 0.001, 0.001, 10_000.0, compact=compact,
+                         checkpoint=Checkpointer(path, every=50, seconds=None))
+    finally:
+        cls.crash_at = None
+    assert path.exists()
+
+    resumed = Checkpointer(path, every=50, seconds=None)
+    curve, trades = run_backtest(cls(**params), df, 0.001, 0.001, 10_000.0, compact=compact, checkpoint=resumed)
+    assert resumed.saves == 3  # bars 250, 300, 350 after resuming at 200
+    assert not path.exists()
+    pd.testing.assert_frame_equal(curve, ref_curve)
+    pd.testing.assert_frame_equal(trades, ref_trades)
+
+
+def test_checkpoint_ignored_for_other_data_or_when_not_resuming(tmp_path, prices):
+    df = prices(400, seed=9, freq='h', start='2020-01-01')
+    path = tmp_path / 'run.ckpt'
+    Checkpointer(path).save({'bar': 10, 'layout': 'loop', 'data': (5,), 'strategy': {}, 'portfolio': {}})
+    ref_curve, _ = run_backtest(SMAStrategy('ABC', 4, 15, 10), df, 0.0, 0.0, 10_000.0)
+    curve, _ = run_backtest(SMAStrategy('ABC', 4, 15, 10), df, 0.0, 0.0, 10_000.0, checkpoint=Checkpointer(path))
+    pd.testing.assert_frame_equal(curve, ref_curve)
+
+    Checkpointer(path).save({'bar': 10})
+    assert Checkpointer(path, resume=False).load() is None
+    path.write_bytes(b'not a pickle')
+    assert Checkpointer(path).load() is None
+
+
+def test_unpicklable_state_is_reported(tmp_path, prices):
+    strat = SMAStrategy('ABC', 4, 15, 10)
+    strat._lock = threading.Lock()
+    with pytest.raises(CheckpointError):
+        run_backtest(strat, prices(400, seed=9, freq='h', start='2020-01-01'), 0.0, 0.0, 10_000.0, checkpoint=Checkpointer(tmp_path / 'x.ckpt', every=10))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_trigger_set_state_round_trip():
+    triggers = TriggerSet()
+    triggers.always(lambda ctx: ctx['a'], lambda ctx: None)
+    triggers.always(lambda ctx: ctx['b'], lambda ctx: None)
+    triggers.run({'a': True, 'b': False})
+    other = TriggerSet()
+    other.always(lambda ctx: ctx['a'], lambda ctx: None)
+    other.always(lambda ctx: ctx['b'], lambda ctx: None)
+    other.load_state(triggers.state())
+    assert other.state() == [True, False]
+    with pytest.raises(ValueError):
+        TriggerSet().load_state([True])
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.portfolio.panel import PricePanel, run_panel_backtest, weight_orders
+from src.strategy.cross_sectional import MeanReversionStrategy, MomentumStrategy, top_n_mask
+
+
+def _panel(n=120, symbols=30, seed=2):
+    rng = np.random.default_rng(seed)
+    drift = np.linspace(-0.004, 0.004, symbols)  # symbol j trends with drift[j]
+    close = 10.0 * np.exp(np.cumsum(drift + rng.normal(0, 0.002, (n, symbols)), axis=0))
+    close[:15, 0] = np.nan  # late listing
+    dates = pd.date_range('2023-01-02', periods=n, freq='B')
+    return PricePanel(dates=dates, symbols=[f'S{j:02d}' for j in range(symbols)], fields={'Close': close})
+
+
+def test_top_n_mask_matches_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.normal(size=(50, 40))
+    scores[rng.random(scores.shape) < 0.3] = np.nan
+    scores[0, :] = np.nan
+    scores[1, :3] = [1.0, 2.0, 3.0]
+    scores[1, 3:] = np.nan
+    mask = top_n_mask(scores, 5)
+    for row, picked in zip(scores, mask):
+        finite = np.flatnonzero(np.isfinite(row))
+        expected = finite[np.argsort(-row[finite])[:5]]
+        assert set(np.flatnonzero(picked)) == set(expected)
+    assert not mask[0].any() and mask[1].sum() == 3
+
+
+def test_weight_orders_rounds_to_lots_and_holds_unpriced():
+    positions = np.array([0, 300, 200])
+    orders = weight_orders([0.5, 0.0, 0.5], positions, np.array([10.0, 5.0, np.nan]), 10_000.0, lot=100)
+    assert orders.tolist() == [500, -300, 0]
+
+
+def test_momentum_picks_strongest_trends_on_schedule():
+    panel = _panel()
+    strat = MomentumStrategy(window=20, top_n=5, rebalance=10)
+    strat.prepare(panel)
+    rows = sorted(strat._weights)
+    assert rows[0] == 20 and np.diff(rows).tolist() == [10] * (len(rows) - 1)
+    assert strat.target_weights(2, panel) is None
+    last = strat.target_weights(rows[-1], panel)
+    assert np.isclose(last.sum(), 1.0)
+    assert set(np.flatnonzero(last)) <= set(range(20, 30))
+
+
+def test_universe_restricted_to_symbols():
+    panel = _panel()
+    strat = MeanReversionStrategy(symbols=['S01', 'S02', 'S03'], window=5, top_n=2, rebalance=5)
+    strat.prepare(panel)
+    for weights in strat._weights.values():
+        assert set(np.flatnonzero(weights)) <= {1, 2, 3}
+        assert weights.sum() == pytest.approx(1.0)
+
+
+def test_panel_backtest_trades_target_weights():
+    panel = _panel()
+    strat = MomentumStrategy(window=20, top_n=5, rebalance=10, lot=100)
+    curve, trades = run_panel_backtest(strat, panel, commission=0.001, slippage=0.001, initial_cash=100_000.0)
+    assert len(curve) == len(panel.dates)
+    assert (trades['qty'] % 100 == 0).all()
+    rebalance_dates = {panel.dates[i] for i in strat._weights}
+    assert set(trades['date']) <= rebalance_dates
+    assert curve['cash'].min() > -1_000.0
+    # almost fully invested after the first rebalance
+    first = panel.dates[min(strat._weights)]
+    assert curve.loc[first, 'position_value'] > 0.9 * curve.loc[first, 'equity']
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.synthetic import generate_ohlcv
+from src.portfolio.manager import run_backtest, run_backtest_vectorized
+from src.strategy import calc_lines as cl
+from src.strategy.expr import ExprError, ExprGraph, ExprStrategy, compile_exprs, evaluate_programs
+from src.strategy.support import crossabove
+from src.strategy.yahan_strategies import SMAStrategy
+
+SMA_BUY = "crossabove(MA(CLOSE, short), MA(CLOSE, long))"
+SMA_SELL = "crossbelow(MA(CLOSE, short), MA(CLOSE, long))"
+
+
+def _frame(n=400, seed=5):
+    return generate_ohlcv(n, seed=seed)
+
+
+def test_shared_subexpressions_are_one_node():
+    graph = ExprGraph()
+    a = graph.compile("MA(CLOSE, 20) > MA(CLOSE, 5)")
+    b = graph.compile("MA(CLOSE, 5) < MA(CLOSE, window=20)")
+    assert a == b
+    n = len(graph)
+    graph.compile("MA(CLOSE, 5) + MA(CLOSE, 20)")
+    graph.compile("MA(CLOSE, 20) + MA(CLOSE, 5)")
+    assert len(graph) == n + 1
+    # defaults are applied before hashing
+    assert graph.compile("MACD(CLOSE).signal") == graph.compile("MACD(CLOSE, 12, 26, 9).signal")
+
+
+def test_vectorized_matches_calc_lines():
+    df = _frame()
+    close = df["Close"]
+    prog = compile_exprs({
+        "buy": "crossabove(MA(CLOSE, 5), MA(CLOSE, 20))",
+        "band": "CLOSE - BOLL(CLOSE, 20, 2).upper",
+        "hist": "MACD(CLOSE).hist",
+    })
+    out = prog.evaluate(df)
+    pd.testing.assert_series_equal(out["buy"], crossabove(cl.MA(close, 5), cl.MA(close, 20)))
+    pd.testing.assert_series_equal(out["band"], close - cl.BOLL(close, 20, 2)["upper"], check_names=False)
+    pd.testing.assert_series_equal(out["hist"], cl.MACD(close)["hist"], check_names=False)
+
+
+def test_stream_matches_vectorized():
+    df = _frame()
+    prog = compile_exprs({
+        "buy": "crossabove(MA(CLOSE, 5), EMA(CLOSE, 20)) and RSI(CLOSE) < 70",
+        "sell": "crossbelow(MA(CLOSE, 5), EMA(CLOSE, 20)) or ZSCORE(CLOSE, 10) > 2 or not (VOLUME > 0)",
+        "x": "(CLOSE - LAG(CLOSE, 3)) / DIFF(CLOSE, 2) + ATR(HIGH, LOW, CLOSE, 14) - ROLLING_MIN(LOW, 5) + STD(CLOSE, 7)",
+        "y": "-MACD(CLOSE, 6, 13, 5).signal * 2 + BOLL(CLOSE).lower - ROLLING_MAX(HIGH, 9)",
+    })
+    batch = prog.evaluate(df)
+    stream = prog.stream()
+    rows = [stream.update(row) for _, row in df.iterrows()]
+    for name, series in batch.items():
+        streamed = np.array([r[name] for r in rows], dtype=float)
+        np.testing.assert_array_equal(series.to_numpy(dtype=float), streamed)
+
+
+def test_bindings_constants_and_errors():
+    prog = compile_exprs({"s": "MA(CLOSE, w * 2) > 1 + 1"}, bindings={"w": 5})
+    node = prog.graph.nodes[prog.outputs["s"]]
+    assert node.op == "gt"
+    assert prog.graph.nodes[node.args[0]].params == (10,)
+    with pytest.raises(ExprError, match="Unknown name"):
+        compile_exprs({"s": "MA(CLOSE, n)"})
+    with pytest.raises(ExprError, match="several outputs"):
+        compile_exprs({"s": "MACD(CLOSE) > 0"})
+    with pytest.raises(ExprError, match="must be a constant"):
+        compile_exprs({"s": "MA(CLOSE, CLOSE)"})
+    with pytest.raises(ExprError, match="Unknown function"):
+        compile_exprs({"s": "__import__('os')"})
+    with pytest.raises(ExprError, match="Invalid expression"):
+        compile_exprs({"s": "MA(CLOSE,"})
+
+
+def test_evaluate_programs_shares_work():
+    df = _frame()
+    graph = ExprGraph()
+    programs = [compile_exprs({"buy": SMA_BUY, "sell": SMA_SELL}, {"short": s, "long": 20}, graph) for s in (5, 10)]
+    # CLOSE and MA(CLOSE, 20) are shared by both programs
+    union = graph.closure([i for p in programs for i in p.outputs.values()])
+    assert len(union) == sum(len(p.nodes) for p in programs) - 2
+    together = evaluate_programs(programs, df)
+    for prog, out in zip(programs, together):
+        for name, series in prog.evaluate(df).items():
+            pd.testing.assert_series_equal(out[name], series)
+
+
+@pytest.mark.parametrize("runner", ["loop", "vectorized"])
+def test_expr_strategy_matches_sma_strategy(runner):
+    df = _frame(n=300)[["Close"]]
+    run = run_backtest if runner == "loop" else run_backtest_vectorized
+    kwargs = dict(commission=0.001, slippage=0.001, initial_cash=10_000.0)
+    expected = run(SMAStrategy("SYN", short_window=5, long_window=20, qty=10), df, **kwargs)
+    got = run(ExprStrategy("SYN", buy=SMA_BUY, sell=SMA_SELL, qty=10, short=5, long=20), df, **kwargs)
+    pd.testing.assert_frame_equal(got[0], expected[0])
+    pd.testing.assert_frame_equal(got[1], expected[1])
+
+
+def test_expr_strategy_symbol_column_is_close():
+    df = _frame(n=200)[["Close"]].rename(columns={"Close": "ABC"})
+    strat = ExprStrategy("ABC", buy=SMA_BUY, sell=SMA_SELL, qty=1, short=3, long=8)
+    orders = strat.order_array(df)
+    assert (orders != 0).any()
+    stream_orders = [strat.on_bar(dt, row).get("ABC", 0) for dt, row in df.iterrows()]
+    assert stream_orders == orders.tolist()
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.strategy import calc_lines as cl
+from src.strategy.extrema import PanelRollingMax, PanelRollingMin, rolling_max, rolling_min
+
+WINDOWS = [1, 2, 3, 20, 250, 5000]
+
+
+def _matrix(n=1000, symbols=4, seed=3):
+    rng = np.random.default_rng(seed)
+    x = 100 + np.cumsum(rng.normal(0, 1, (n, symbols)), axis=0)
+    x[rng.random((n, symbols)) < 0.1] = np.nan
+    # a stretch longer than the smaller windows with nothing to report
+    x[40:80, 1] = np.nan
+    return x
+
+
+def _expected(x, window, how):
+    return getattr(pd.DataFrame(x).rolling(window, min_periods=1), how)().to_numpy()
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_batch_matches_pandas(window):
+    x = _matrix()
+    assert np.array_equal(rolling_max(x, window), _expected(x, window, "max"), equal_nan=True)
+    assert np.array_equal(rolling_min(x, window), _expected(x, window, "min"), equal_nan=True)
+    assert np.array_equal(rolling_max(x[:, 1], window), _expected(x, window, "max")[:, 1], equal_nan=True)
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_panel_updates_match_batch(window):
+    x = _matrix(n=600)
+    highs, lows = PanelRollingMax(window, 4), PanelRollingMin(window, 4)
+    for i, row in enumerate(x):
+        assert np.array_equal(highs.update(row), rolling_max(x[:i + 1], window)[-1], equal_nan=True)
+        lows.update(row)
+    assert np.array_equal(lows.value, rolling_min(x, window)[-1], equal_nan=True)
+
+
+def test_panel_extend_continues_state():
+    x = _matrix(n=300)
+    stream = PanelRollingMax(7, 4)
+    head = stream.extend(x[:101])
+    tail = stream.extend(x[101:])
+    assert np.array_equal(np.vstack([head, tail]), rolling_max(x, 7), equal_nan=True)
+
+
+def test_calc_lines_keeps_labels():
+    idx = pd.date_range("2024-01-01", periods=5, freq="D")
+    s = pd.Series([1, 5, 2, 3, 1], index=idx, name="A")
+    out = cl.ROLLING_MAX(s, 2)
+    assert out.name == "A" and out.index.equals(idx)
+    assert out.tolist() == [1.0, 5.0, 5.0, 3.0, 3.0]
+    frame = cl.ROLLING_MIN(pd.DataFrame({"A": s, "B": -s}), 3)
+    assert list(frame.columns) == ["A", "B"]
+    assert frame["B"].tolist() == [-1.0, -5.0, -5.0, -5.0, -3.0]
+
+
+def test_edge_cases():
+    assert rolling_max(np.array([]), 5).shape == (0,)
+    assert np.isnan(rolling_min(np.full(3, np.nan), 2)).all()
+    with pytest.raises(ValueError):
+        rolling_max(np.ones(3), 0)
+    with pytest.raises(ValueError):
+        PanelRollingMax(3, 2).update([1.0, 2.0, 3.0])
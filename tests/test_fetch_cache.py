@@ -0,0 +1,143 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.data import fetcher, storage
+from src.data.exceptions import DataNotFoundError
+from src.data.synthetic import random_walk_ohlcv
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+FULL = random_walk_ohlcv(pd.date_range('2019-07-01', '2020-12-31', freq='B'), symbol='ABC', seed=3)
+
+
+class RecordingAdapter:
+    """Serves slices of FULL and records every requested range."""
+
+    def __init__(self):
+        self.calls = []
+
+    def fetch(self, symbol, start, end, interval='1d', adjusted=True, **kwargs):
+        self.calls.append((start, end))
+        df = FULL
+        if start:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end:
+            df = df[df.index <= pd.Timestamp(end)]
+        return df
+
+
+@pytest.fixture
+def adapter(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'CACHE_DIR', str(tmp_path))
+    recorder = RecordingAdapter()
+    monkeypatch.setattr(fetcher, 'select_adapter', lambda name: recorder)
+    return recorder
+
+
+def _get(start, end, **kwargs):
+    return fetcher.get_history('ABC', start, end, source='fake', **kwargs)
+
+
+def _mtimes(tmp_path):
+    directory = tmp_path / 'ABC' / '1d'
+    return {p.name: p.stat().st_mtime_ns for p in directory.glob('*.parquet')}
+
+
+def test_fetches_only_missing_head_and_tail(adapter):
+    first = _get('2020-03-02', '2020-06-30')
+    pd.testing.assert_frame_equal(first, FULL.loc['2020-03-02':'2020-06-30'], check_freq=False)
+    assert storage.read_coverage('ABC', '1d') == (pd.Timestamp('2020-03-02'), pd.Timestamp('2020-06-30'))
+
+    assert len(_get('2020-04-01', '2020-05-29')) > 0
+    assert len(adapter.calls) == 1  # inside the covered range
+
+    wide = _get('2020-01-02', '2020-09-30')
+    assert adapter.calls[1:] == [('2020-01-02', '2020-03-02'), ('2020-06-30', '2020-09-30')]
+    pd.testing.assert_frame_equal(wide, FULL.loc['2020-01-02':'2020-09-30'], check_freq=False)
+    assert storage.read_coverage('ABC', '1d') == (pd.Timestamp('2020-01-02'), pd.Timestamp('2020-09-30'))
+
+
+def test_request_past_the_cache_bridges_the_gap(adapter):
+    _get('20200101', '20200131')
+    later = _get('20200601', '20200630')
+    assert adapter.calls[1] == ('20200131', '20200630')
+    assert len(later) == len(FULL.loc['2020-06-01':'2020-06-30'])
+    cached = storage.read_cached('ABC', interval='1d')
+    assert cached.index.is_unique and cached.index.is_monotonic_increasing
+    assert cached.index.min() == pd.Timestamp('2020-01-01') and cached.index.max() == pd.Timestamp('2020-06-30')
+
+
+def test_refresh_starts_from_last_cached_bar(adapter):
+    _get('2020-01-01', '2020-03-31')
+    _get('2020-01-01', '2020-03-31', refresh=True)
+    assert adapter.calls[1] == ('2020-03-31', '2020-03-31')
+
+
+def test_open_ended_request_is_covered_up_to_last_bar(adapter):
+    _get('2020-01-01', None)
+    assert storage.read_coverage('ABC', '1d')[1] == FULL.index.max()
+    _get('2020-01-01', None)
+    assert len(adapter.calls) == 1
+    _get('2020-01-01', None, refresh=True)
+    assert adapter.calls[1] == ('2020-12-31', None)
+
+
+def test_year_partitions_and_range_reads(adapter, tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'ROW_GROUP_SIZE', 20)
+    _get('2019-07-01', '2020-12-31')
+    assert storage.partition_years('ABC', '1d') == [2019, 2020]
+    assert pq.ParquetFile(tmp_path / 'ABC' / '1d' / '2020.parquet').num_row_groups > 1
+
+    opened = []
+    read_partition = storage._read_partition
+    monkeypatch.setattr(storage, '_read_partition', lambda pq_, path, *a: opened.append(os.path.basename(path)) or read_partition(pq_, path, *a))
+    df = storage.read_cached('ABC', '2020-05-04', '2020-05-29', interval='1d')
+    assert opened == ['2020.parquet']
+    pd.testing.assert_frame_equal(df, FULL.loc['2020-05-04':'2020-05-29'], check_freq=False)
+    both = storage.read_cached('ABC', '2019-12-02', '2020-01-31', interval='1d')
+    pd.testing.assert_frame_equal(both, FULL.loc['2019-12-02':'2020-01-31'], check_freq=False)
+
+
+def test_updates_rewrite_only_changed_partitions(adapter, tmp_path):
+    _get('2019-07-01', '2020-06-30')
+    before = _mtimes(tmp_path)
+    _get('2019-07-01', '2020-06-30', refresh=True)  # same bars again
+    assert _mtimes(tmp_path) == before
+    _get('2019-07-01', '2020-09-30')
+    after = _mtimes(tmp_path)
+    assert after['2019.parquet'] == before['2019.parquet']
+    assert after['2020.parquet'] != before['2020.parquet']
+
+
+def test_legacy_cache_is_read_then_migrated(adapter, tmp_path):
+    storage.write_cache('ABC', FULL.loc['2020-05-01':'2020-05-29'])
+    df = _get('2020-05-04', '2020-06-30')
+    assert adapter.calls == [('2020-05-29', '2020-06-30')]
+    assert df.index.max() == pd.Timestamp('2020-06-30')
+    assert not (tmp_path / 'ABC.parquet').exists()
+    assert storage.read_cached('ABC', interval='1d').index.min() == pd.Timestamp('2020-05-01')
+
+
+def test_legacy_cache_is_left_out_of_other_intervals(adapter, tmp_path):
+    daily = FULL.loc['2020-05-01':'2020-05-29']
+    storage.write_cache('ABC', daily)
+    storage.write_coverage('ABC', '2020-05-01', '2020-05-29')
+    assert storage.read_coverage('ABC', '1h') is None and storage.read_cached('ABC', interval='1h') is None
+    assert storage.last_cached_bar('ABC', '1h') is None
+
+    df = _get('2020-05-04', '2020-05-15', interval='1h')
+    assert adapter.calls == [('2020-05-04', '2020-05-15')]
+    pd.testing.assert_frame_equal(df, FULL.loc['2020-05-04':'2020-05-15'])
+    # the daily file was neither merged into the hourly partitions nor removed
+    assert (tmp_path / 'ABC.parquet').exists() and (tmp_path / 'ABC.meta.json').exists()
+    assert storage.read_coverage('ABC', '1h') == (pd.Timestamp('2020-05-04'), pd.Timestamp('2020-05-15'))
+    pd.testing.assert_frame_equal(storage.read_cached('ABC', interval='1h'), df, check_freq=False)
+    pd.testing.assert_frame_equal(storage.read_cached('ABC', interval='1d'), daily, check_freq=False)
+
+
+def test_empty_source_raises_without_cache(adapter, monkeypatch):
+    monkeypatch.setattr(adapter, 'fetch', lambda *a, **k: pd.DataFrame())
+    with pytest.raises(DataNotFoundError):
+        _get('2020-01-01', '2020-02-01')
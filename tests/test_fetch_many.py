@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.data import fetcher, ratelimit, storage
+from src.data.exceptions import AdapterError, RateLimitError
+from src.data.frame_cache import frame_cache
+from src.data.ratelimit import TokenBucket
+from src.data.synthetic import random_walk_ohlcv
+
+FULL = random_walk_ohlcv(pd.date_range('2020-01-01', '2020-06-30', freq='B'), symbol='ABC', seed=9)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class SlowAdapter:
+    """Sleeps per call, tracks how many calls overlap and fails on request."""
+
+    def __init__(self, fail=(), rate_limited=()):
+        self.fail = set(fail)
+        self.rate_limited = set(rate_limited)
+        self.lock = threading.Lock()
+        self.in_flight = self.peak = 0
+        self.calls = []
+
+    def fetch(self, symbol, start, end, interval='1d', adjusted=True, **kwargs):
+        with self.lock:
+            self.calls.append((symbol, time.monotonic()))
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            limited = symbol in self.rate_limited
+            self.rate_limited.discard(symbol)
+        try:
+            time.sleep(0.02)
+            if limited:
+                raise RateLimitError('slow down')
+            if symbol in self.fail:
+                raise AdapterError(f'no such symbol {symbol}')
+            return FULL.loc[start:end]
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def fake_source(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setitem(ratelimit.RATE_LIMITS, 'fake', (1000.0, 8))
+    ratelimit.reset_rate_limiters()
+    yield
+    ratelimit.reset_rate_limiters()
+
+
+def test_token_bucket_paces_and_backs_off():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0.0 and bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.5)
+
+    bucket.backoff(3.0)
+    bucket.backoff(1.0)  # a shorter backoff does not cut the pause
+    assert bucket.acquire() == pytest.approx(3.0)
+    # no burst right after a pause
+    assert bucket.acquire() == pytest.approx(0.5)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_many_symbols_run_concurrently_and_collect_errors(fake_source, monkeypatch):
+    adapter = SlowAdapter(fail={'BAD'})
+    monkeypatch.setattr(fetcher, 'select_adapter', lambda name: adapter)
+    symbols = ['S%d' % i for i in range(8)] + ['BAD', 'S0']
+    with frame_cache():
+        results, errors = fetcher.get_history_many(symbols, '2020-02-03', '2020-03-31', source='fake', max_workers=4)
+    assert sorted(results) == sorted('S%d' % i for i in range(8))
+    assert list(errors) == ['BAD'] and isinstance(errors['BAD'], AdapterError)
+    pd.testing.assert_frame_equal(results['S3'], FULL.loc['2020-02-03':'2020-03-31'])
+    assert 1 < adapter.peak <= 4
+    assert len(adapter.calls) == 9  # duplicates fetched once
+
+
+def test_rate_limit_pauses_every_worker(fake_source, monkeypatch):
+    adapter = SlowAdapter(rate_limited={'S0'})
+    monkeypatch.setattr(fetcher, 'select_adapter', lambda name: adapter)
+    symbols = ['S%d' % i for i in range(6)]
+    with frame_cache():
+        results, errors = fetcher.get_history_many(symbols, '2020-02-03', '2020-03-31', source='fake',
+                                                   max_workers=3, backoff_factor=0.2)
+    assert not errors and sorted(results) == symbols
+    limited_at = next(t for s, t in adapter.calls if s == 'S0')
+    # calls that started after the rate limit was hit waited out the shared pause
+    later = [t for _, t in adapter.calls if t > limited_at + 0.03]
+    assert later and min(later) >= limited_at + 0.2
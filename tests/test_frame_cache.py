@@ -0,0 +1,141 @@
+import pandas as pd
+import pytest
+
+from src.data import fetcher, storage
+from src.data.frame_cache import FrameCache, frame_cache
+from src.data.synthetic import random_walk_ohlcv
+
+FULL = random_walk_ohlcv(pd.date_range('2020-01-01', '2020-12-31', freq='B'), symbol='ABC', seed=5)
+
+
+class RecordingAdapter:
+    def __init__(self):
+        self.calls = []
+
+    def fetch(self, symbol, start, end, interval='1d', adjusted=True, **kwargs):
+        self.calls.append((symbol, start, end))
+        return FULL.loc[start:end]
+
+
+@pytest.fixture
+def adapter(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'CACHE_DIR', str(tmp_path))
+    recorder = RecordingAdapter()
+    monkeypatch.setattr(fetcher, 'select_adapter', lambda name: recorder)
+    return recorder
+
+
+def test_sub_ranges_are_sliced_from_memory(adapter, monkeypatch):
+    disk_reads = []
+    read_cached = fetcher.read_cached
+    monkeypatch.setattr(fetcher, 'read_cached', lambda *a, **k: disk_reads.append(a) or read_cached(*a, **k))
+    with frame_cache() as cache:
+        wide = fetcher.get_history('ABC', '2020-02-03', '2020-09-30', source='fake')
+        reads = len(disk_reads)
+        narrow = fetcher.get_history('ABC', '2020-04-01', '2020-04-30', source='fake')
+        pd.testing.assert_frame_equal(narrow, wide.loc['2020-04-01':'2020-04-30'])
+        assert len(disk_reads) == reads and len(adapter.calls) == 1
+        assert cache.hits == 1 and cache.misses == 1
+
+        # another adjustment and a range past the loaded one are misses
+        fetcher.get_history('ABC', '2020-04-01', '2020-04-30', source='fake', adjusted=False)
+        fetcher.get_history('ABC', '2020-08-03', '2020-11-30', source='fake')
+        assert cache.misses == 3 and len(disk_reads) > reads
+
+
+def test_overlapping_loads_widen_the_entry():
+    cache = FrameCache()
+    cache.put('k', FULL.loc['2020-02-03':'2020-05-29'], '2020-02-03', '2020-05-29')
+    cache.put('k', FULL.loc['2020-05-01':'2020-08-31'], '2020-05-01', '2020-08-31')
+    assert len(cache) == 1
+    pd.testing.assert_frame_equal(cache.get('k', '2020-03-02', '2020-07-31'), FULL.loc['2020-03-02':'2020-07-31'], check_freq=False)
+    assert cache.get('k', '2020-02-03', None) is None
+    # open loads are stored up to their last bar (see fetcher._remember)
+    cache.put('k', FULL.loc['2020-08-03':], '2020-08-03', FULL.index.max(), latest=True)
+    assert cache.get('k', '2020-02-03', '2020-12-31') is not None
+    assert len(cache.get('k', '2020-02-03', None)) == len(FULL.loc['2020-02-03':])
+    assert cache.get('k', '2020-02-03', '2021-06-30') is None
+    assert cache.get('k', '2020-01-02', '2020-03-31') is None
+    # widening the start keeps the flag of the range reaching the end
+    cache.put('k', FULL.loc['2020-01-02':'2020-03-31'], '2020-01-02', '2020-03-31')
+    assert cache.get('k', '2020-01-02', None) is not None
+
+
+class GrowingAdapter:
+    """Serves bars up to today, of which only those up to `published` exist yet."""
+
+    def __init__(self):
+        today = pd.Timestamp.now().normalize()
+        self.bars = random_walk_ohlcv(pd.bdate_range(end=today, periods=60), symbol='ABC', seed=6)
+        self.published = self.bars.index[-10]
+        self.calls = []
+
+    def fetch(self, symbol, start, end, interval='1d', adjusted=True, **kwargs):
+        self.calls.append((start, end))
+        return self.bars.loc[start:end].loc[:self.published]
+
+
+@pytest.mark.parametrize('days_ahead', [0, 7])
+def test_running_ranges_see_new_tail_bars(tmp_path, monkeypatch, days_ahead):
+    monkeypatch.setattr(storage, 'CACHE_DIR', str(tmp_path))
+    source = GrowingAdapter()
+    monkeypatch.setattr(fetcher, 'select_adapter', lambda name: source)
+    start = source.bars.index[0].strftime('%Y-%m-%d')
+    end = (pd.Timestamp.now().normalize() + pd.Timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+    with frame_cache() as cache:
+        first = fetcher.get_history('ABC', start, end, source='fake')
+        assert first.index[-1] == source.published
+        source.published = source.bars.index[-1]
+        second = fetcher.get_history('ABC', start, end, source='fake')
+        assert cache.hits == 0 and source.calls[-1][1] == end
+        pd.testing.assert_frame_equal(second, source.bars, check_freq=False)
+
+        # the entry covers up to the last bar loaded, and only that far
+        last = source.published.strftime('%Y-%m-%d')
+        pd.testing.assert_frame_equal(fetcher.get_history('ABC', start, last, source='fake'), second)
+        assert cache.hits == 1
+
+
+def test_repeated_open_ended_requests_hit_memory(adapter):
+    with frame_cache() as cache:
+        first = fetcher.get_history('ABC', '2020-02-03', None, source='fake')
+        again = fetcher.get_history('ABC', '2020-02-03', None, source='fake')
+        later = fetcher.get_history('ABC', '2020-06-01', None, source='fake')
+        assert len(adapter.calls) == 1 and cache.hits == 2
+        pd.testing.assert_frame_equal(again, first)
+        pd.testing.assert_frame_equal(later, first.loc['2020-06-01':])
+        # a range loaded up to a past end says nothing about later bars
+        fetcher.get_history('XYZ', '2020-02-03', '2020-06-30', source='fake')
+        fetcher.get_history('XYZ', '2020-02-03', None, source='fake')
+        assert cache.misses == 3
+
+
+def test_lru_eviction_and_memory_budget():
+    part = FULL.loc['2020-01-01':'2020-03-31']
+    cache = FrameCache(max_entries=2)
+    for name in 'abc':
+        cache.put(name, part, '2020-01-01', '2020-03-31')
+    assert cache.get('a', '2020-02-03', '2020-02-28') is None
+    assert cache.get('b', '2020-02-03', '2020-02-28') is not None
+    assert cache.evictions == 1
+
+    tight = FrameCache(max_bytes=int(part.memory_usage(index=True, deep=True).sum()) + 1)
+    tight.put('a', part, '2020-01-01', '2020-03-31')
+    tight.put('b', part, '2020-01-01', '2020-03-31')
+    assert len(tight) == 1 and tight.stats()['evictions'] == 1
+
+
+def test_returned_frames_are_detached(adapter):
+    with frame_cache():
+        first = fetcher.get_history('ABC', '2020-02-03', '2020-03-31', source='fake')
+        first['Close'] = 0.0
+        again = fetcher.get_history('ABC', '2020-02-03', '2020-03-31', source='fake')
+    assert (again['Close'] != 0.0).all()
+
+
+def test_refresh_and_disabled_cache_bypass_memory(adapter):
+    with frame_cache() as cache:
+        fetcher.get_history('ABC', '2020-02-03', '2020-03-31', source='fake')
+        fetcher.get_history('ABC', '2020-02-03', '2020-03-31', source='fake', memory_cache=False)
+        fetcher.get_history('ABC', '2020-02-03', '2020-03-31', source='fake', refresh=True)
+        assert cache.hits == 0 and cache.misses == 1
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.portfolio.history import HistoryView
+from src.portfolio.manager import run_backtest
+from src.strategy.yahan_strategies import BuyAndHoldStrategy, MACDStrategy, SMAStrategy
+
+
+class DecideOnly:
+    """Hide on_bar (and optionally the view opt-in) so the engine calls decide."""
+
+    def __init__(self, inner, view):
+        self.inner = inner
+        self.symbol = inner.symbol
+        self.lookback = getattr(inner, 'lookback', None)
+        self.history_view = view
+        self.seen = set()
+
+    def decide(self, date, history):
+        self.seen.add(type(history))
+        return self.inner.decide(date, history)
+
+
+def test_view_window_and_read_only(prices):
+    df = prices(10, seed=5, columns=('Close', 'Volume'))
+    view = HistoryView(df, lookback=4).seek(6)
+    assert len(view) == 4 and not view.empty
+    assert view.date == df.index[5]
+    assert np.array_equal(view['Close'], df['Close'].to_numpy()[2:6])
+    assert view.last('Volume') == df['Volume'].iloc[5]
+    assert 'Close' in view and 'Open' not in view and view.get('Open') is None
+    with pytest.raises(ValueError):
+        view['Close'][0] = 0.0
+    pd.testing.assert_frame_equal(view.to_frame(), df.iloc[2:6])
+    assert view.to_frame() is view.to_frame()
+    s = view.series('Close')
+    assert np.shares_memory(s.to_numpy(), view['Close'])
+    assert s.index.equals(df.index[2:6])
+    assert len(view.seek(2)) == 2 and len(HistoryView(df).seek(9)) == 9
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('make_strategy', [
+    lambda: SMAStrategy('ABC', short_window=4, long_window=12, qty=10),
+    lambda: MACDStrategy('ABC', fast=5, slow=13, signal=4, qty=10),
+    lambda: BuyAndHoldStrategy('ABC', initial_cash=5_000.0),
+])
+def test_view_matches_frame_history(make_strategy, compact, prices):
+    df = prices(200, seed=5, columns=('Close', 'Volume'))
+    framed, viewed = DecideOnly(make_strategy(), False), DecideOnly(make_strategy(), True)
+    curve_a, trades_a = run_backtest(framed, df, 0.001, 0.001, 5_000.0, compact=compact)
+    curve_b, trades_b = run_backtest(viewed, df, 0.001, 0.001, 5_000.0, compact=compact)
+
+    pd.testing.assert_frame_equal(curve_a, curve_b)
+    pd.testing.assert_frame_equal(trades_a, trades_b)
+    assert framed.seen == {pd.DataFrame} and viewed.seen == {HistoryView}
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('make_strategy', [
+    lambda: SMAStrategy('ABC', short_window=4, long_window=12, qty=10),
+    lambda: MACDStrategy('ABC', fast=5, slow=13, signal=4, qty=10),
+    lambda: BuyAndHoldStrategy('ABC', initial_cash=5_000.0),
+])
+def test_decide_option_passes_views_to_builtin_strategies(make_strategy, compact, prices):
+    df = prices(200, seed=5, columns=('Close', 'Volume'))
+    strategy, seen = make_strategy(), set()
+    decide = strategy.decide
+    strategy.decide = lambda date, history: seen.add(type(history)) or decide(date, history)
+    framed = make_strategy()
+    framed.history_view = False
+    curve_bar, trades_bar = run_backtest(make_strategy(), df, 0.001, 0.001, 5_000.0, compact=compact)
+    curve_view, trades_view = run_backtest(strategy, df, 0.001, 0.001, 5_000.0, compact=compact, decide=True)
+    curve_frame, trades_frame = run_backtest(framed, df, 0.001, 0.001, 5_000.0, compact=compact, decide=True)
+
+    assert seen == {HistoryView}
+    pd.testing.assert_frame_equal(curve_bar, curve_view)
+    pd.testing.assert_frame_equal(trades_bar, trades_view)
+    pd.testing.assert_frame_equal(curve_frame, curve_view)
+    pd.testing.assert_frame_equal(trades_frame, trades_view)
@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+
+from src.backtest.engine import resolve_engine
+from src.portfolio.manager import run_backtest, strategy_lookback
+from src.strategy.yahan_strategies import SMAStrategy, MACDStrategy, BuyAndHoldStrategy
+
+
+class DecideOnly:
+    """Hide on_bar so the engine falls back to decide(date, history)."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.symbol = inner.symbol
+
+    def decide(self, date, history):
+        return self.inner.decide(date, history)
+
+
+class Bounded(DecideOnly):
+    """Decide-only view that forwards `lookback` and records the history sizes seen."""
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self.lookback = inner.lookback
+        self.sizes = []
+
+    def decide(self, date, history):
+        self.sizes.append(len(history))
+        return super().decide(date, history)
+
+
+def _with_flat_stretch(df):
+    df.iloc[50:60, 0] = df.iloc[50, 0]  # flat stretch exercises equal-average ties
+    return df
+
+
+@pytest.mark.parametrize('make_strategy', [
+    lambda: SMAStrategy('ABC', short_window=3, long_window=10, qty=10),
+    lambda: MACDStrategy('ABC', fast=5, slow=13, signal=4, qty=10),
+    lambda: BuyAndHoldStrategy('ABC', initial_cash=5_000.0, commission=0.001, slippage=0.001),
+])
+def test_on_bar_matches_decide(make_strategy, prices):
+    df = _with_flat_stretch(prices(250, seed=3))
+    curve_bar, trades_bar = run_backtest(make_strategy(), df, commission=0.001, slippage=0.001, initial_cash=5_000.0)
+    curve_dec, trades_dec = run_backtest(DecideOnly(make_strategy()), df, commission=0.001, slippage=0.001, initial_cash=5_000.0)
+
+    pd.testing.assert_frame_equal(curve_bar, curve_dec)
+    assert not trades_bar.empty
+    pd.testing.assert_frame_equal(trades_bar, trades_dec)
+
+
+def test_on_bar_reads_symbol_column():
+    strat = SMAStrategy('ABC', short_window=2, long_window=3, qty=1)
+    orders = [strat.on_bar(None, {'ABC': px}) for px in [5.0, 4.0, 3.0, 6.0, 7.0]]
+    assert orders[3] == {'ABC': 1}
+
+
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('make_strategy', [
+    lambda: SMAStrategy('ABC', short_window=3, long_window=10, qty=10),
+    lambda: BuyAndHoldStrategy('ABC', initial_cash=5_000.0, commission=0.001, slippage=0.001),
+])
+def test_declared_lookback_bounds_history(make_strategy, compact, prices):
+    df = _with_flat_stretch(prices(250, seed=3))
+    bounded = Bounded(make_strategy())
+    curve_full, trades_full = run_backtest(DecideOnly(make_strategy()), df, 0.001, 0.001, 5_000.0, compact=compact)
+    curve_lb, trades_lb = run_backtest(bounded, df, 0.001, 0.001, 5_000.0, compact=compact)
+
+    pd.testing.assert_frame_equal(curve_full, curve_lb)
+    pd.testing.assert_frame_equal(trades_full, trades_lb)
+    assert max(bounded.sizes) == bounded.lookback
+
+
+def _record_history_sizes(strategy):
+    sizes = []
+    decide = strategy.decide
+
+    def recording(date, history):
+        sizes.append(len(history))
+        return decide(date, history)
+
+    strategy.decide = recording
+    return sizes
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_decide_option_bounds_history(compact, prices):
+    df = _with_flat_stretch(prices(250, seed=3))
+    make_strategy = lambda: SMAStrategy('ABC', short_window=3, long_window=10, qty=10)
+    strategy = make_strategy()
+    sizes = _record_history_sizes(strategy)
+    curve_bar, trades_bar = run_backtest(make_strategy(), df, 0.001, 0.001, 5_000.0, compact=compact)
+    curve_dec, trades_dec = run_backtest(strategy, df, 0.001, 0.001, 5_000.0, compact=compact, decide=True)
+
+    pd.testing.assert_frame_equal(curve_bar, curve_dec)
+    pd.testing.assert_frame_equal(trades_bar, trades_dec)
+    assert len(sizes) == len(df) and max(sizes) == strategy.lookback
+
+
+def test_engine_decide_option():
+    task = {'data': {'symbol': 'ABC'}, 'engine': {'decide': True}}
+    assert resolve_engine(task) == ('loop', {'decide': True})
+    task['engine']['mode'] = 'vectorized'
+    assert resolve_engine(task) == ('vectorized', {})
+
+
+def test_lookback_declarations():
+    assert SMAStrategy('ABC', short_window=3, long_window=10).lookback == 11
+    assert MACDStrategy('ABC').lookback is None
+    assert MACDStrategy('ABC', warmup=200).lookback == 200
+    assert strategy_lookback(type('S', (), {'lookback': lambda self: 5})()) == 5
+    with pytest.raises(ValueError):
+        strategy_lookback(type('S', (), {'lookback': 0})())
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.strategy import calc_lines as cl
+from src.strategy.indicator_cache import IndicatorCache, fingerprint, get_cache, indicator_cache
+
+
+def _close(n=500, seed=1):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-01", periods=n, freq="D")
+    return pd.Series(100 + np.cumsum(rng.normal(0, 1, n)), index=idx, name="Close")
+
+
+def test_disabled_by_default():
+    assert get_cache() is None
+    s = _close()
+    pd.testing.assert_series_equal(cl.MA(s, 10), s.rolling(10, min_periods=1).mean())
+
+
+def test_cached_results_match_uncached():
+    s = _close()
+    expected = {
+        "ma": cl.MA(s, 20), "zscore": cl.ZSCORE(s, 20), "macd": cl.MACD(s),
+        "boll": cl.BOLL(s, 20), "atr": cl.ATR(s + 1, s - 1, s, 14), "rsi": cl.RSI(s),
+    }
+    with indicator_cache():
+        for _ in range(2):
+            pd.testing.assert_series_equal(cl.MA(s, 20), expected["ma"])
+            pd.testing.assert_series_equal(cl.ZSCORE(s, 20), expected["zscore"])
+            pd.testing.assert_frame_equal(cl.MACD(s), expected["macd"])
+            pd.testing.assert_frame_equal(cl.BOLL(s, 20), expected["boll"])
+            pd.testing.assert_series_equal(cl.ATR(s + 1, s - 1, s, 14), expected["atr"])
+            pd.testing.assert_series_equal(cl.RSI(s), expected["rsi"])
+    assert get_cache() is None
+
+
+def test_derived_indicators_reuse_intermediates():
+    s = _close()
+    with indicator_cache() as cache:
+        cl.EMA(s, 12)
+        cl.MA(s, 20)
+        cl.STD(s, 20)
+        cl.MACD(s, 12, 26, 9)
+        cl.BOLL(s, 20)
+        by_name = cache.stats()["by_indicator"]
+    # MACD found EMA(12); BOLL found MA(20) and STD(20)
+    assert by_name["EMA"] == {"hits": 1, "misses": 3}
+    assert by_name["MA"]["hits"] == 1
+    assert by_name["STD"]["hits"] == 1
+
+
+def test_key_covers_values_index_and_params():
+    s = _close()
+    with indicator_cache() as cache:
+        cl.MA(s, 10)
+        cl.MA(s.copy(), 10)  # equal content, different object
+        assert cache.hits == 1
+        cl.MA(s, window=10)
+        assert cache.hits == 2
+        cl.MA(s, 11)
+        shifted = s.copy()
+        shifted.iloc[250] += 1.0
+        cl.MA(shifted, 10)
+        reindexed = s.set_axis(s.index + pd.Timedelta(days=1))
+        out = cl.MA(reindexed, 10)
+        assert cache.hits == 2
+        assert out.index.equals(reindexed.index)
+
+
+def test_returned_value_is_detached_from_cache():
+    s = _close()
+    with indicator_cache():
+        first = cl.MA(s, 5)
+        first.iloc[:] = 0.0
+        pd.testing.assert_series_equal(cl.MA(s, 5), s.rolling(5, min_periods=1).mean())
+        x = s.to_numpy()
+        arr = cl.MA(x, 3)
+        arr[:] = -1.0
+        boll = cl.BOLL(x, 10)
+        boll['mid'][:] = -1.0
+        np.testing.assert_array_equal(cl.MA(x, 3), s.rolling(3, min_periods=1).mean().to_numpy())
+        np.testing.assert_array_equal(cl.BOLL(x, 10)['mid'], s.rolling(10, min_periods=1).mean().to_numpy())
+
+
+def test_results_keep_their_labels():
+    s = _close().rename('a')
+    with indicator_cache() as cache:
+        assert cl.MA(s, 5).name == 'a'
+        assert cl.MA(s.rename('b'), 5).name == 'b'
+        frame = pd.DataFrame({'a': s, 'b': s})
+        assert list(cl.MA(frame.rename(columns={'b': 'c'}), 5).columns) == ['a', 'c']
+        assert list(cl.MA(frame, 5).columns) == ['a', 'b']
+    assert cache.hits == 0
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    s = _close(n=1000)
+    cache = IndicatorCache(max_entries=2)
+    with indicator_cache(cache=cache):
+        cl.MA(s, 1)
+        cl.MA(s, 2)
+        cl.MA(s, 1)  # refresh window 1
+        cl.MA(s, 3)  # evicts window 2
+        cl.MA(s, 1)
+        assert cache.hits == 2
+        cl.MA(s, 2)
+        assert cache.misses == 4
+    assert cache.evictions == 2
+
+    small = IndicatorCache(max_bytes=s.nbytes * 2)
+    with indicator_cache(cache=small):
+        for w in range(1, 5):
+            cl.MA(s, w)
+    stats = small.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= s.nbytes * 2
+    assert stats["evictions"] == 2
+
+
+def test_fingerprint_distinguishes_frames():
+    df = pd.DataFrame({"a": [1.0, 2.0], "b": [3.0, 4.0]})
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint(df) != fingerprint(df.rename(columns={"b": "c"}))
+    assert fingerprint(df["a"]) != fingerprint(df["b"])
+
+
+def test_panel_frame_input():
+    rng = np.random.default_rng(0)
+    panel = pd.DataFrame(rng.normal(size=(50, 3)).cumsum(axis=0), columns=["A", "B", "C"])
+    with indicator_cache() as cache:
+        first = cl.MA(panel, 5)
+        pd.testing.assert_frame_equal(cl.MA(panel, 5), first)
+    assert cache.hits == 1
+
+
+def test_sweep_workers_share_indicator_cache():
+    from src.backtest.sweep import sweep_on_data
+    from src.data.synthetic import generate_ohlcv
+
+    data = generate_ohlcv(400, seed=3)
+    strat = {"module": "src.strategy.yahan_strategies", "class": "SMAStrategy",
+             "params": {"symbol": "SYN", "qty": 10}}
+    grid = {"short_window": [5, 10], "long_window": [20, 30]}
+    port = {"cash": 100000.0}
+    with_cache = sweep_on_data(strat, port, data, grid, mode="vectorized", processes=1, indicators=True)
+    without = sweep_on_data(strat, port, data, grid, mode="vectorized", processes=1)
+    pd.testing.assert_series_equal(with_cache["final_equity"], without["final_equity"])
+    assert get_cache() is None
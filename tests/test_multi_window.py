@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.strategy import calc_lines as cl
+
+WINDOWS = [1, 2, 5, 20, 60, 3000]
+
+
+def _close(n=5000, seed=11, nans=True):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2015-01-01", periods=n, freq="h")
+    s = pd.Series(100 + np.cumsum(rng.normal(0, 1, n)), index=idx, name="Close")
+    if nans:
+        s.iloc[[0, 7, 8, 1500, n - 1]] = np.nan
+    return s
+
+
+@pytest.mark.parametrize("nans", [False, True])
+@pytest.mark.parametrize("multi, single, rtol", [
+    (cl.MA_MULTI, cl.MA, 1e-7),
+    (cl.STD_MULTI, cl.STD, 1e-7),
+    # z divides by the deviation, magnifying that error where it is tiny
+    (cl.ZSCORE_MULTI, cl.ZSCORE, 1e-3),
+])
+def test_multi_matches_single_window(multi, single, rtol, nans):
+    s = _close(nans=nans)
+    out = multi(s, WINDOWS)
+    assert list(out.columns) == WINDOWS
+    assert out.index.equals(s.index)
+    for w in WINDOWS:
+        # pandas' online variance carries its own rounding error on tiny deviations
+        pd.testing.assert_series_equal(out[w], single(s, w), check_names=False, rtol=rtol, atol=1e-6)
+
+
+def test_boll_multi_columns():
+    s = _close()
+    out = cl.BOLL_MULTI(s, [5, 20], k=1.5)
+    assert list(out.columns) == [(w, f) for w in (5, 20) for f in ("mid", "upper", "lower")]
+    for w in (5, 20):
+        pd.testing.assert_frame_equal(out[w], cl.BOLL(s, w, 1.5), check_names=False, rtol=1e-7, atol=1e-6)
+
+
+def test_flat_windows_and_short_series():
+    s = pd.Series([3.0, 3.0, 3.0, 4.0, np.nan, 4.0, 4.0])
+    std = cl.STD_MULTI(s, [2, 3])
+    assert std[2].tolist()[1:3] == [0.0, 0.0]
+    assert std[2].iloc[6] == 0.0
+    assert np.isnan(std[2].iloc[0])
+    assert np.isnan(cl.ZSCORE_MULTI(s, [2])[2].iloc[2])
+    assert cl.MA_MULTI(pd.Series([], dtype=float), [3]).shape == (0, 1)
+    pd.testing.assert_series_equal(cl.MA_MULTI(s.iloc[:2], [10])[10], cl.MA(s.iloc[:2], 10), check_names=False)
+
+
+def test_accuracy_on_long_random_walk():
+    # merged moments keep small deviations accurate far from the start
+    rng = np.random.default_rng(0)
+    v = 1000 + np.cumsum(rng.normal(0, 1, 200_000))
+    got = cl.STD_MULTI(pd.Series(v), [3, 50])[3].to_numpy()[2:]
+    exact = np.lib.stride_tricks.sliding_window_view(v, 3).std(axis=1, ddof=1)
+    assert np.quantile(np.abs(got - exact) / exact, 0.999) < 1e-8
+
+
+def _exact_std(v, w):
+    out = np.full(len(v), np.nan)
+    out[w - 1:] = np.lib.stride_tricks.sliding_window_view(v - v[0], w).std(axis=1, ddof=1)
+    return out
+
+
+@pytest.mark.parametrize("level, step", [(3e3, 0.01), (1e6, 0.01), (1e9, 0.01), (1e9, 1.0)])
+def test_accuracy_at_high_price_level(level, step):
+    # a level far above the in-window spread, with a jump and a flat run inside the blocks
+    rng = np.random.default_rng(2)
+    v = level + np.cumsum(rng.normal(0, step, 4000))
+    v[1000:] += 300 * step
+    v[2500:2540] = v[2500]
+    windows = [2, 3, 20, 250]
+    std = cl.STD_MULTI(v, windows)
+    z = cl.ZSCORE_MULTI(v, windows)
+    for k, w in enumerate(windows):
+        exact = _exact_std(v, w)
+        np.testing.assert_allclose(std[w - 1:, k], exact[w - 1:], rtol=1e-9, atol=0)
+        mean = np.convolve(v - v[0], np.ones(w) / w, mode="valid")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            exact_z = (v[w - 1:] - v[0] - mean) / np.where(exact[w - 1:] == 0, np.nan, exact[w - 1:])
+        np.testing.assert_allclose(z[w - 1:, k], exact_z, rtol=1e-6, atol=1e-6)
+    assert (std[2539, :3] == 0.0).all()
+
+
+def test_rejects_bad_windows():
+    s = _close(100, nans=False)
+    with pytest.raises(ValueError):
+        cl.MA_MULTI(s, [])
+    with pytest.raises(ValueError):
+        cl.STD_MULTI(s, [0, 5])
+    with pytest.raises(TypeError):
+        cl.MA_MULTI(s.to_frame(), [5])
+
+
+@pytest.mark.parametrize("multi", [cl.MA_MULTI, cl.STD_MULTI, cl.ZSCORE_MULTI, cl.BOLL_MULTI])
+def test_multi_accepts_arrays(multi):
+    s = _close(n=2000)
+    out = multi(s.to_numpy(), [3, 20])
+    assert isinstance(out, np.ndarray)
+    np.testing.assert_array_equal(out, multi(s, [3, 20]).to_numpy())
+    with pytest.raises(TypeError, match="single Series or 1-D array"):
+        multi(s.to_frame(), [3, 20])
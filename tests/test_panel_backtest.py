@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.portfolio.manager import run_backtest
+from src.portfolio.panel import align_panel, run_panel_backtest
+from src.strategy.yahan_strategies import PanelSMAStrategy, SMAStrategy
+
+
+def test_align_panel_outer_and_inner(prices):
+    frames = {'A': prices(10, seed=1, start='2021-01-01', columns=None), 'B': prices(10, seed=2, start='2021-01-06', columns=None)}
+    outer = align_panel(frames)
+    inner = align_panel(frames, how='inner')
+    assert outer.shape == (13, 2)
+    assert inner.shape == (7, 2)
+    assert np.isnan(outer['Close'][0, 1])
+    assert outer.mark_prices()[0, 1] == 0.0
+
+
+def test_panel_single_symbol_matches_loop_engine(prices):
+    df = prices(200, seed=5, start='2021-01-01', columns=None)
+    curve, trades = run_panel_backtest(PanelSMAStrategy(['A'], 5, 20, qty=10), {'A': df}, commission=0.001, slippage=0.001, initial_cash=10_000.0)
+    ref_curve, ref_trades = run_backtest(SMAStrategy('A', 5, 20, qty=10), df, commission=0.001, slippage=0.001, initial_cash=10_000.0)
+    pd.testing.assert_frame_equal(curve, ref_curve)
+    pd.testing.assert_frame_equal(trades, ref_trades)
+
+
+def test_panel_multi_symbol_accounting(prices):
+    frames = {
+        'A': prices(120, seed=1, start='2021-01-01', columns=None),
+        'B': prices(120, seed=2, start='2021-01-01', columns=None),
+        'C': prices(100, seed=3, start='2021-02-01', columns=None),
+    }
+    curve, trades = run_panel_backtest(PanelSMAStrategy(['A', 'B', 'C'], 3, 10, qty=5), frames, commission=0.0, slippage=0.0, initial_cash=10_000.0)
+    assert set(trades['symbol']) == {'A', 'B', 'C'}
+
+    # final equity equals cash plus marked positions recomputed from fills
+    panel = align_panel(frames)
+    last = panel.mark_prices()[-1]
+    pos = trades.groupby('symbol')['qty'].sum().reindex(panel.symbols, fill_value=0).to_numpy()
+    cash = 10_000.0 - float((trades['qty'] * trades['price']).sum())
+    assert curve['cash'].iloc[-1] == pytest.approx(cash)
+    assert curve['equity'].iloc[-1] == pytest.approx(cash + float(pos @ last))
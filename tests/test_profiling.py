@@ -0,0 +1,33 @@
+import json
+
+from src.portfolio.manager import run_backtest, run_backtest_vectorized
+from src.strategy.yahan_strategies import SMAStrategy
+from src.system import profiling
+
+
+def test_off_by_default_is_passthrough():
+    fn = len
+    assert profiling.active() is None
+    assert profiling.instrument('x', fn) is fn
+    with profiling.phase('x'):
+        profiling.count('x')
+
+
+def test_phases_and_counters_cover_the_loop(tmp_path, prices):
+    data = prices(80, seed=5)
+    with profiling.profiling(cprofile=True) as prof:
+        curve, trades = run_backtest(SMAStrategy('ABC', 3, 10, 5), data, commission=0.001, slippage=0.0)
+        run_backtest_vectorized(SMAStrategy('ABC', 3, 10, 5), data, commission=0.001, slippage=0.0)
+    assert profiling.active() is None
+
+    report = prof.report()
+    assert report['phases']['strategy.on_bar']['calls'] == len(data)
+    assert report['phases']['portfolio.apply_orders']['calls'] == len(data)
+    assert report['phases']['portfolio.run_backtest']['calls'] == 1
+    assert 'strategy.order_array' in report['phases']
+    assert report['counters']['portfolio.bars'] == 2 * len(data)
+    assert report['counters']['portfolio.fills'] == 2 * len(trades)
+
+    path = prof.write(tmp_path / 'profile.json')
+    assert json.loads(path.read_text())['counters'] == report['counters']
+    assert prof.write_cprofile(tmp_path / 'profile.prof').stat().st_size > 0
@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+
+from src.backtest import result_cache
+from src.backtest.result_cache import data_fingerprint, load_result, prune_cache, result_key, store_result
+from src.backtest.sweep import sweep_on_data
+
+STRAT_CFG = {
+    'module': 'src.strategy.yahan_strategies',
+    'class': 'SMAStrategy',
+    'params': {'symbol': 'ABC', 'short_window': 5, 'long_window': 20, 'qty': 10},
+}
+PORT_CFG = {'cash': 10_000.0, 'commission': 0.001, 'slippage': 0.001}
+
+
+def test_key_tracks_params_portfolio_and_data(prices):
+    fp = data_fingerprint(prices(120, seed=3))
+    base = result_key(STRAT_CFG, PORT_CFG, 'loop', {}, fp)
+    assert base == result_key(STRAT_CFG, dict(PORT_CFG), 'loop', {}, data_fingerprint(prices(120, seed=3)))
+    assert base != result_key({**STRAT_CFG, 'params': {**STRAT_CFG['params'], 'qty': 11}}, PORT_CFG, 'loop', {}, fp)
+    assert base != result_key(STRAT_CFG, {**PORT_CFG, 'commission': 0.002}, 'loop', {}, fp)
+    assert base != result_key(STRAT_CFG, PORT_CFG, 'vectorized', {}, fp)
+    changed = prices(120, seed=3)
+    changed.iloc[-1, 0] += 0.01
+    assert fp != data_fingerprint(changed)
+
+
+def test_store_and_load_round_trip(tmp_path):
+    curve = pd.DataFrame({'equity': [1.0, 2.0]}, index=pd.date_range('2022-01-01', periods=2))
+    trades = pd.DataFrame({'date': curve.index, 'qty': [1, -1]})
+    assert load_result('abc', tmp_path) is None
+    store_result('abc', curve, trades, cache_dir=tmp_path)
+    store_result('abc', curve, trades, cache_dir=tmp_path)  # overwrite in place
+    got_curve, got_trades = load_result('abc', tmp_path)
+    pd.testing.assert_frame_equal(got_curve, curve)
+    pd.testing.assert_frame_equal(got_trades, trades)
+
+
+def test_sweep_reuses_cached_combinations(tmp_path, prices):
+    grid = {'short_window': [3, 5]}
+    first = sweep_on_data(STRAT_CFG, PORT_CFG, prices(120, seed=3), grid, processes=1, cache_dir=tmp_path)
+    second = sweep_on_data(STRAT_CFG, PORT_CFG, prices(120, seed=3), grid, processes=1, cache_dir=tmp_path)
+    forced = sweep_on_data(STRAT_CFG, PORT_CFG, prices(120, seed=3), grid, processes=1, cache_dir=tmp_path, recompute=True)
+
+    assert not first['cached'].any() and second['cached'].all() and not forced['cached'].any()
+    pd.testing.assert_series_equal(first['final_equity'], second['final_equity'])
+
+
+def test_key_tracks_simulation_source(monkeypatch, prices):
+    fp = data_fingerprint(prices(120, seed=3))
+    base = result_key(STRAT_CFG, PORT_CFG, 'loop', {}, fp)
+    # an edit to calc_lines or the portfolio engines changes the package digest
+    monkeypatch.setattr(result_cache, '_package_digest', lambda package: 'edited' if package == 'src.portfolio' else None)
+    assert base != result_key(STRAT_CFG, PORT_CFG, 'loop', {}, fp)
+
+
+def test_prune_drops_least_recently_used(tmp_path):
+    curve = pd.DataFrame({'equity': [1.0, 2.0]}, index=pd.date_range('2022-01-01', periods=2))
+    for i, key in enumerate(['a', 'b', 'c']):
+        entry = store_result(key, curve, None, cache_dir=tmp_path)
+        os.utime(entry, (1_000 + i, 1_000 + i))
+    assert load_result('a', tmp_path) is not None  # a hit makes 'a' the most recent
+    assert prune_cache(tmp_path, max_entries=2) == 1
+    assert load_result('b', tmp_path) is None
+    assert load_result('a', tmp_path) is not None and load_result('c', tmp_path) is not None
+    assert prune_cache(tmp_path, max_bytes=0) == 2
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.strategy import calc_lines as cl
+from src.strategy import streaming as st
+
+
+def _series(n=600, seed=11):
+    rng = np.random.default_rng(seed)
+    x = 30.0 + np.cumsum(rng.normal(0, 1, n))
+    x[0] = np.nan           # leading gap
+    x[40:60] = x[40]        # constant window
+    x[100] = np.nan         # interior gaps
+    x[200:203] = np.nan
+    return x
+
+
+def _assert_same(out, ref):
+    np.testing.assert_allclose(np.asarray(out, dtype=float), np.asarray(ref, dtype=float), rtol=1e-12, atol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize('window', [1, 2, 3, 5, 20])
+@pytest.mark.parametrize('stream_cls, batch_fn', [
+    (st.StreamMA, cl.MA),
+    (st.StreamEMA, cl.EMA),
+    (st.StreamSTD, cl.STD),
+    (st.StreamZSCORE, cl.ZSCORE),
+    (st.StreamRSI, cl.RSI),
+    (st.StreamRollingMax, cl.ROLLING_MAX),
+    (st.StreamRollingMin, cl.ROLLING_MIN),
+])
+def test_stream_matches_batch(stream_cls, batch_fn, window):
+    x = _series()
+    ind = stream_cls(window)
+    out = [ind.update(v) for v in x]
+    _assert_same(out, batch_fn(pd.Series(x), window))
+    _assert_same([ind.value], [out[-1]])
+
+
+def test_stream_macd_and_boll_match_batch():
+    x = _series()
+    macd = st.StreamMACD(12, 26, 9)
+    boll = st.StreamBOLL(20, 2.0)
+    macd_out = pd.DataFrame([macd.update(v) for v in x])
+    boll_out = pd.DataFrame([boll.update(v) for v in x])
+    _assert_same(macd_out[['macd', 'signal', 'hist']], cl.MACD(pd.Series(x)))
+    _assert_same(boll_out[['mid', 'upper', 'lower']], cl.BOLL(pd.Series(x), 20, 2.0))
+
+
+def test_stream_atr_matches_batch():
+    x = _series()
+    rng = np.random.default_rng(2)
+    high = x + np.abs(rng.normal(0, 1, len(x)))
+    low = x - np.abs(rng.normal(0, 1, len(x)))
+    atr = st.StreamATR(14)
+    out = [atr.update(h, l, c) for h, l, c in zip(high, low, x)]
+    _assert_same(out, cl.ATR(pd.Series(high), pd.Series(low), pd.Series(x), 14))
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from src.backtest.sweep import expand_grid, summarize_workers, sweep_on_data
+
+STRAT_CFG = {
+    'module': 'src.strategy.yahan_strategies',
+    'class': 'SMAStrategy',
+    'params': {'symbol': 'ABC', 'short_window': 5, 'long_window': 20, 'qty': 10},
+}
+PORT_CFG = {'cash': 10_000.0, 'commission': 0.001, 'slippage': 0.001}
+
+
+def test_expand_grid_ranges_lists_and_scalars():
+    combos = expand_grid({'short_window': {'start': 3, 'stop': 7, 'step': 2}, 'long_window': [20, 30], 'qty': 5})
+    assert len(combos) == 6
+    assert combos[0] == {'short_window': 3, 'long_window': 20, 'qty': 5}
+    assert combos[-1] == {'short_window': 7, 'long_window': 30, 'qty': 5}
+
+
+def test_sweep_pool_matches_inline(prices):
+    grid = {'short_window': [3, 5], 'long_window': [10, 20]}
+    pooled = sweep_on_data(STRAT_CFG, PORT_CFG, prices(200, seed=9), grid, mode='vectorized', processes=2)
+    inline = sweep_on_data(STRAT_CFG, PORT_CFG, prices(200, seed=9), grid, mode='vectorized', processes=1)
+
+    assert len(pooled) == 4 and pooled['error'].isna().all()
+    cols = ['short_window', 'long_window', 'final_equity', 'n_trades']
+    pd.testing.assert_frame_equal(pooled[cols], inline[cols])
+
+    workers = summarize_workers(pooled)
+    assert workers['jobs'].sum() == 4
+
+
+def test_sweep_reports_failed_combination(prices):
+    results = sweep_on_data(STRAT_CFG, PORT_CFG, prices(200, seed=9), {'bogus_param': [1]}, processes=1)
+    assert results['error'].iloc[0].startswith('TypeError')
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.strategy.support import TriggerSet, crossabove, crossbelow
+
+
+def _series(n=300, seed=4):
+    rng = np.random.default_rng(seed)
+    a = pd.Series(np.cumsum(rng.normal(0, 1, n)))
+    b = a.rolling(10, min_periods=1).mean()
+    return a, b
+
+
+def _make_set(fired):
+    ts = TriggerSet()
+    ts.always(lambda ctx: crossabove(ctx["a"], ctx["b"]), lambda ctx: fired["up"].append(ctx["i"]), name="up")
+    ts.always(lambda ctx: crossbelow(ctx["a"], ctx["b"]), lambda ctx: fired["down"].append(ctx["i"]), name="down")
+    ts.always(lambda ctx: ctx["a"] > 0, lambda ctx: fired["positive"].append(ctx["i"]), name="positive")
+    return ts
+
+
+def test_run_batch_matches_per_bar_run():
+    a, b = _series()
+    fired = {"up": [], "down": [], "positive": []}
+    per_bar = _make_set(fired)
+    for i in range(len(a)):
+        per_bar.run({"a": a.iloc[:i + 1], "b": b.iloc[:i + 1], "i": i})
+
+    batch = _make_set({}).run_batch({"a": a, "b": b})
+    assert list(batch) == ["up", "down", "positive"]
+    for name, idx in batch.items():
+        assert idx.tolist() == fired[name]
+
+
+def test_run_batch_continues_edge_state():
+    a, b = _series()
+    whole = _make_set({}).run_batch({"a": a, "b": b})
+    ts = _make_set({})
+    head = ts.run_batch({"a": a.iloc[:150], "b": b.iloc[:150]})
+    tail = ts.run_batch({"a": a.iloc[150:], "b": b.iloc[150:]})
+    assert np.concatenate([head["positive"], tail["positive"] + 150]).tolist() == whole["positive"].tolist()
+    assert ts.run_batch({"a": a, "b": b}, reset=True)["positive"].tolist() == whole["positive"].tolist()
+
+
+def test_run_batch_falls_back_to_per_bar_for_scalar_conditions():
+    a, b = _series()
+    b = b.to_numpy()
+    fired = {"up": []}
+    per_bar = TriggerSet()
+    batch = TriggerSet()
+    for ts in (per_bar, batch):
+        ts.always(lambda ctx: bool(ctx["a"].iloc[-1] > ctx["b"][-1]), lambda ctx: fired["up"].append(ctx["i"]), name="up")
+    for i in range(len(a)):
+        per_bar.run({"a": a.iloc[:i + 1], "b": b[:i + 1], "i": i})
+    assert batch.run_batch({"a": a, "b": b, "i": None})["up"].tolist() == fired["up"]
+    assert batch.state() == per_bar.state()
+
+
+def test_run_batch_rejects_contexts_without_series_and_on_bar_actions():
+    ts = TriggerSet()
+    ts.always(lambda ctx: True, lambda ctx: None, name="scalar")
+    with pytest.raises(ValueError):
+        ts.run_batch({})
+    with pytest.raises(ValueError):
+        ts.run_batch({"a": np.zeros(3), "b": np.zeros(4)})
+    ts = TriggerSet()
+    ts.on_bar(lambda ctx: None)
+    with pytest.raises(ValueError):
+        ts.run_batch({})
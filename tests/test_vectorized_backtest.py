@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.portfolio.manager import run_backtest, run_backtest_vectorized
+from src.strategy.yahan_strategies import SMAStrategy, MACDStrategy, BuyAndHoldStrategy
+
+
+@pytest.mark.parametrize('make_strategy', [
+    lambda: SMAStrategy('ABC', short_window=5, long_window=20, qty=10),
+    lambda: MACDStrategy('ABC', fast=12, slow=26, signal=9, qty=10),
+    lambda: BuyAndHoldStrategy('ABC', initial_cash=10_000.0, commission=0.001, slippage=0.001),
+])
+def test_vectorized_matches_loop(make_strategy, prices):
+    df = prices(300, seed=7)
+    curve_loop, trades_loop = run_backtest(make_strategy(), df, commission=0.001, slippage=0.001, initial_cash=10_000.0)
+    curve_vec, trades_vec = run_backtest_vectorized(make_strategy(), df, commission=0.001, slippage=0.001, initial_cash=10_000.0)
+
+    pd.testing.assert_frame_equal(curve_loop, curve_vec, check_exact=True)
+    assert not trades_loop.empty
+    pd.testing.assert_frame_equal(trades_loop, trades_vec, check_exact=True)
+
+
+def test_vectorized_accepts_target_positions(prices):
+    class Targets:
+        symbol = 'ABC'
+
+        def target_positions(self, data):
+            return np.where(np.arange(len(data)) >= 2, 5, 0)
+
+    df = prices(n=5, seed=7)
+    curve, trades = run_backtest_vectorized(Targets(), df, commission=0.0, slippage=0.0, initial_cash=1000.0)
+    assert list(trades['qty']) == [5]
+    assert trades['date'].iloc[0] == df.index[2]
+    assert curve['position_value'].iloc[-1] == pytest.approx(5 * df['Close'].iloc[-1])
+
+
+def test_vectorized_rejects_decide_only_strategy(prices):
+    class DecideOnly:
+        symbol = 'ABC'
+
+        def decide(self, date, history):
+            return {}
+
+    with pytest.raises(TypeError):
+        run_backtest_vectorized(DecideOnly(), prices(n=5, seed=7), commission=0.0, slippage=0.0)